@@ -0,0 +1,45 @@
+"""
+Benchmark the arrears engine over a large portfolio.
+
+Every tenant moved in on 2020-01-01 and paid twelve months of 2020; as of
+mid-2021 each owes six months, so per-month detail is built for all of them
+(the worst case).
+
+Usage (from backend/):
+    python -m benchmarks.arrears [--tenants 100000]
+"""
+import argparse
+from datetime import date
+from sqlalchemy import update
+from benchmarks.common import reset_schema, bulk_portfolio, timed, QueryCounter
+from database import SessionLocal, engine
+from services import arrears
+import models
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenants", type=int, default=100000)
+    args = parser.parse_args()
+
+    reset_schema()
+    bulk_portfolio(args.tenants, tenants_per_house=1, payments_per_tenant=12)
+    with engine.begin() as conn:
+        conn.execute(update(models.Tenant).values(move_in_date=date(2020, 1, 1)))
+
+    as_of = date(2021, 6, 30)
+    db = SessionLocal()
+    try:
+        with QueryCounter() as qc:
+            result = arrears.report(db, as_of)
+        ms = timed(lambda: arrears.report(db, as_of), repeat=3)
+    finally:
+        db.close()
+
+    print(f"{result['tenants']} active tenants, {args.tenants * 12} payments, as of {as_of}")
+    print(f"  {result['tenants_in_arrears']} in arrears, KES {result['outstanding']:,.0f} outstanding")
+    print(f"  {ms:8.1f} ms   {qc.count} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Load benchmark: the API in sync mode (threadpool handlers) versus async mode
+(AsyncSession handlers), at N concurrent clients.
+
+Each mode runs in its own uvicorn process on the same seeded database; the
+only difference is the driver in DATABASE_URL. Clients issue a mix of
+small uncached reads (house and tenant detail, a tenant's payments, a
+payments page) and the script reports throughput and p50/p99 latency.
+
+Usage (from backend/):
+    python -m benchmarks.async_load [--clients 500] [--requests 10000] [--houses 500]
+
+Set DATABASE_URL to a scratch Postgres database (postgresql://...) for
+representative numbers; it is dropped and reseeded. By default a temporary
+SQLite file is used, where the single-writer file lock and the load client
+sharing the machine both flatten the difference.
+"""
+import argparse
+import asyncio
+import random
+import time
+from benchmarks.common import reset_schema, bulk_portfolio, free_port, start_server
+from database import SYNC_DATABASE_URL
+from utils.auth import create_access_token
+import models
+import httpx
+
+_ASYNC_DRIVER_FOR = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def _database_urls() -> dict:
+    backend = SYNC_DATABASE_URL.get_backend_name()
+    sync_url = SYNC_DATABASE_URL.render_as_string(hide_password=False)
+    async_url = SYNC_DATABASE_URL.set(drivername=f"{backend}+{_ASYNC_DRIVER_FOR[backend]}")
+    return {"sync": sync_url, "async": async_url.render_as_string(hide_password=False)}
+
+
+async def _load(port: int, token: str, clients: int, requests: int, tenant_ids: list, houses: int) -> dict:
+    paths = [
+        lambda: f"/api/houses/{random.randint(1, houses)}",
+        lambda: f"/api/tenants/{random.choice(tenant_ids)}",
+        lambda: f"/api/tenants/{random.choice(tenant_ids)}/payments?limit=10",
+        lambda: "/api/payments/?limit=20",
+    ]
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def client_loop(http: httpx.AsyncClient):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                response = await http.get(random.choice(paths)())
+                errors += response.status_code != 200
+            except httpx.TransportError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120,
+                                 headers={"Authorization": f"Bearer {token}"}) as http:
+        await http.get("/api/houses/1")  # warm up: admin cache, connection pool
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--houses", type=int, default=500)
+    args = parser.parse_args()
+
+    reset_schema()
+    bulk_portfolio(args.houses, tenants_per_house=2, payments_per_tenant=12)
+    from database import SessionLocal
+    db = SessionLocal()
+    db.add(models.Admin(username="bench", hashed_password="x"))
+    db.commit()
+    tenant_ids = [tid for (tid,) in db.query(models.Tenant.id).filter(models.Tenant.is_active == True)]
+    db.close()
+    token = create_access_token({"sub": "bench"})
+
+    print(f"{args.requests} requests, {args.clients} concurrent clients, {args.houses} houses "
+          f"({SYNC_DATABASE_URL.get_backend_name()})")
+    for mode, url in _database_urls().items():
+        port = free_port()
+        server = start_server(url, port, DB_POOL_SIZE="40", DB_MAX_OVERFLOW="20")
+        try:
+            r = asyncio.run(_load(port, token, args.clients, args.requests, tenant_ids, args.houses))
+        finally:
+            server.terminate()
+            server.wait()
+        print(f"  {mode:<6} {r['throughput']:8.0f} req/s   p50 {r['p50']:7.1f} ms   "
+              f"p99 {r['p99']:7.1f} ms   errors {r['errors']}")
+
+
+if __name__ == "__main__":
+    main()
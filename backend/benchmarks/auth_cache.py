@@ -0,0 +1,59 @@
+"""
+Benchmark get_current_admin under concurrent load, with and without the
+resolved-admin cache.
+
+Usage (from backend/):
+    python -m benchmarks.auth_cache [--requests 20000] [--concurrency 32]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import reset_schema, QueryCounter
+from database import SessionLocal
+from utils import auth
+import models
+
+
+def _one_request(token: str):
+    # Mirrors a request: a fresh session from get_db, then the auth dependency
+    db = SessionLocal()
+    try:
+        auth.get_current_admin(token=token, db=db)
+    finally:
+        db.close()
+
+
+def _run(token: str, requests: int, concurrency: int) -> tuple:
+    auth.invalidate_admin_cache()
+    with QueryCounter() as qc, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        list(pool.map(lambda _: _one_request(token), range(requests)))
+        elapsed = time.perf_counter() - start
+    return elapsed, qc.count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    reset_schema()
+    db = SessionLocal()
+    db.add(models.Admin(username="admin", hashed_password="x"))
+    db.commit()
+    db.close()
+    token = auth.create_access_token({"sub": "admin"})
+
+    print(f"{args.requests} authenticated requests, {args.concurrency} threads")
+    ttl = auth.ADMIN_CACHE_TTL_SECONDS
+    for label, cache_ttl in (("no cache", 0), ("ttl cache", ttl or 60)):
+        auth.ADMIN_CACHE_TTL_SECONDS = cache_ttl
+        elapsed, queries = _run(token, args.requests, args.concurrency)
+        print(f"  {label:<10} {elapsed * 1e6 / args.requests:8.1f} µs/request  "
+              f"{args.requests / elapsed:9.0f} req/s  {queries:6d} admin queries")
+    auth.ADMIN_CACHE_TTL_SECONDS = ttl
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite file unless DATABASE_URL is already
+set, so `python -m benchmarks.<name>` works from the backend folder with no
+setup. Import this module before `database` so the URL is in place first.
+"""
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+_TMP_DIR = tempfile.mkdtemp(prefix="rental-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+
+from sqlalchemy import insert, text  # noqa: E402
+from database import Base, engine  # noqa: E402
+import models  # noqa: E402
+
+
+def create_schema():
+    """Create the latest schema directly and mark it migrated (scratch databases only)."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) PRIMARY KEY)")
+        conn.exec_driver_sql("DELETE FROM alembic_version")
+        conn.execute(text("INSERT INTO alembic_version (version_num) VALUES (:v)"), {"v": models.SCHEMA_REVISION})
+
+
+def reset_schema():
+    Base.metadata.drop_all(bind=engine)
+    create_schema()
+
+
+def bulk_portfolio(houses: int, tenants_per_house: int, payments_per_tenant: int = 0, seed: int = 42):
+    """Insert a portfolio where each house has a history of moved-out tenants and one current tenant."""
+    rnd = random.Random(seed)
+    with engine.begin() as conn:
+        conn.execute(insert(models.House), [
+            {"id": h, "name": f"Unit {h:06d}", "house_type": rnd.choice(["bedsitter", "single_room"]),
+             "rent_amount": rnd.choice([5500, 8000, 8500]), "is_occupied": True, "is_active": True}
+            for h in range(1, houses + 1)
+        ])
+        tenant_rows, tenant_id = [], 0
+        for h in range(1, houses + 1):
+            for k in range(tenants_per_house):
+                tenant_id += 1
+                tenant_rows.append({
+                    "id": tenant_id, "full_name": f"Tenant {tenant_id}", "phone": f"07{tenant_id:08d}",
+                    "phone_normalized": f"2547{tenant_id:08d}",
+                    "house_id": h, "is_active": k == tenants_per_house - 1, "deposit_paid": 0.0,
+                })
+        conn.execute(insert(models.Tenant), tenant_rows)
+
+        if payments_per_tenant:
+            payment_rows = []
+            for t in tenant_rows:
+                for m in range(payments_per_tenant):
+                    year, month = 2020 + m // 12, m % 12 + 1
+                    payment_rows.append({
+                        "tenant_id": t["id"], "house_id": t["house_id"], "amount_paid": 5500.0,
+                        "payment_date": date(year, month, 1), "month_paid_for": f"{year}-{month:02d}",
+                        "payment_method": "mpesa", "email_sent": False,
+                    })
+            conn.execute(insert(models.Payment), payment_rows)
+
+
+def timed(fn, repeat: int = 5) -> float:
+    """Best-of-N wall time of fn() in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(database_url: str, port: int, **env) -> subprocess.Popen:
+    """Run the API under uvicorn on `port` and wait until /health answers."""
+    import httpx
+
+    env = dict(os.environ, DATABASE_URL=database_url, **env)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--no-access-log", "--timeout-keep-alive", "120"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+class QueryCounter:
+    """Counts SQL statements sent through the engine while active."""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+        event.remove(engine, "before_cursor_execute", self._on_execute)
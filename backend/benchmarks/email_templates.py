@@ -0,0 +1,191 @@
+"""
+Micro-benchmark: per-email render cost of the current templates (frame and
+footer prepared once) versus the previous renderer, which rebuilt the whole
+document and called date.today() for every email. The old code is kept below
+verbatim as the baseline; outputs are checked to be identical first.
+
+Usage (from backend/):
+    python -m benchmarks.email_templates [--emails 20000]
+"""
+import argparse
+import time
+from datetime import date
+from services import email_service
+
+
+# ── Baseline: the renderer before templates were precompiled ─────────────
+
+def _legacy_base_template(content: str) -> str:
+    return f"""
+<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <style>
+    body {{ font-family: Georgia, serif; background: #f5f0e8; margin: 0; padding: 0; }}
+    .wrapper {{ max-width: 580px; margin: 40px auto; }}
+    .header {{ background: linear-gradient(135deg, #1A1A24 0%, #22222F 100%); padding: 32px 40px; border-radius: 12px 12px 0 0; }}
+    .header h1 {{ color: #C5A028; margin: 0; font-size: 24px; letter-spacing: 2px; font-weight: 400; }}
+    .header p {{ color: #888; margin: 6px 0 0; font-size: 13px; letter-spacing: 1px; }}
+    .body {{ background: #ffffff; padding: 36px 40px; border-left: 1px solid #e0d8c8; border-right: 1px solid #e0d8c8; }}
+    .body h2 {{ color: #1A1A24; font-size: 20px; margin-top: 0; }}
+    .body p {{ color: #444; line-height: 1.7; font-size: 15px; }}
+    .amount-box {{ background: #f9f5ec; border-left: 4px solid #C5A028; padding: 16px 20px; margin: 20px 0; border-radius: 0 8px 8px 0; }}
+    .amount-box .label {{ color: #888; font-size: 12px; text-transform: uppercase; letter-spacing: 1px; }}
+    .amount-box .value {{ color: #1A1A24; font-size: 28px; font-weight: 700; margin-top: 4px; }}
+    .detail-row {{ display: flex; justify-content: space-between; padding: 10px 0; border-bottom: 1px solid #f0e8d8; }}
+    .detail-label {{ color: #888; font-size: 13px; }}
+    .detail-value {{ color: #1A1A24; font-size: 13px; font-weight: 600; }}
+    .footer {{ background: #1A1A24; padding: 20px 40px; border-radius: 0 0 12px 12px; text-align: center; }}
+    .footer p {{ color: #555570; font-size: 12px; margin: 0; }}
+  </style>
+</head>
+<body>
+  <div class="wrapper">
+    <div class="header">
+      <h1>MURITHI RENTALS</h1>
+      <p>PROPERTY MANAGEMENT · KISUMU</p>
+    </div>
+    <div class="body">
+      {content}
+    </div>
+    <div class="footer">
+      <p>© {date.today().year} Murithi Family Rentals · Meru, Kenya</p>
+      <p style="margin-top:6px;">This is an automated notification. Do not reply to this email.</p>
+    </div>
+  </div>
+</body>
+</html>
+"""
+
+
+def _legacy_confirmation(
+    tenant_name: str,
+    amount: float,
+    month_paid_for: str,
+    house_name: str,
+    payment_method: str,
+    reference_code: str = None,
+    payment_date=None,
+) -> tuple:
+    subject = f"✅ Payment Received — {house_name} · {month_paid_for}"
+    ref_row = f"""
+      <div class="detail-row">
+        <span class="detail-label">Reference</span>
+        <span class="detail-value" style="font-family:monospace;">{reference_code}</span>
+      </div>
+    """ if reference_code else ""
+
+    content = f"""
+      <h2>Payment Confirmed ✅</h2>
+      <p>Dear <strong>{tenant_name}</strong>,</p>
+      <p>We have received your rent payment. Here are your payment details:</p>
+      <div class="amount-box">
+        <div class="label">Amount Received</div>
+        <div class="value">KES {amount:,.0f}</div>
+      </div>
+      <div class="detail-row">
+        <span class="detail-label">Unit</span>
+        <span class="detail-value">{house_name}</span>
+      </div>
+      <div class="detail-row">
+        <span class="detail-label">Period</span>
+        <span class="detail-value">{month_paid_for}</span>
+      </div>
+      <div class="detail-row">
+        <span class="detail-label">Method</span>
+        <span class="detail-value">{payment_method.upper()}</span>
+      </div>
+      <div class="detail-row">
+        <span class="detail-label">Date</span>
+        <span class="detail-value">{payment_date or date.today()}</span>
+      </div>
+      {ref_row}
+      <p style="margin-top:24px;">Thank you for your prompt payment. Please keep this email as your receipt.</p>
+      <p>Best regards,<br><strong>Murithi Rentals Management</strong></p>
+    """
+    return subject, _legacy_base_template(content)
+
+
+def _legacy_reminder(
+    tenant_name: str,
+    amount: float,
+    month: str,
+    house_name: str,
+    days_overdue: int = 0,
+) -> tuple:
+    urgency = "⚠️ Friendly Reminder" if days_overdue <= 7 else "🔴 Overdue Notice"
+    subject = f"{urgency} — Rent Due · {house_name} · {month}"
+    message = (
+        "This is a friendly reminder that your rent payment is due."
+        if days_overdue <= 7
+        else f"Your rent payment is <strong>{days_overdue} days overdue</strong>. Please make payment as soon as possible."
+    )
+    content = f"""
+      <h2>Rent Payment Due</h2>
+      <p>Dear <strong>{tenant_name}</strong>,</p>
+      <p>{message}</p>
+      <div class="amount-box">
+        <div class="label">Amount Due</div>
+        <div class="value">KES {amount:,.0f}</div>
+      </div>
+      <div class="detail-row">
+        <span class="detail-label">Unit</span>
+        <span class="detail-value">{house_name}</span>
+      </div>
+      <div class="detail-row">
+        <span class="detail-label">Period</span>
+        <span class="detail-value">{month}</span>
+      </div>
+      <p style="margin-top:24px;">If you have already paid, please disregard this notice.</p>
+      <p>Thank you,<br><strong>Murithi Rentals Management</strong></p>
+    """
+    return subject, _legacy_base_template(content)
+
+
+_LEGACY = {"payment_confirmation": _legacy_confirmation, "payment_reminder": _legacy_reminder}
+
+
+def _payloads(kind: str, n: int) -> list:
+    if kind == "payment_confirmation":
+        return [dict(tenant_name=f"Tenant {i}", amount=5500 + i % 7 * 500, month_paid_for="2025-03",
+                     house_name=f"B{i % 40}", payment_method="mpesa", reference_code=f"QK{i:08d}",
+                     payment_date="2025-03-02") for i in range(n)]
+    return [dict(tenant_name=f"Tenant {i}", amount=5500 + i % 7 * 500, month="2025-03",
+                 house_name=f"B{i % 40}", days_overdue=i % 14) for i in range(n)]
+
+
+def _per_email_us(fn, payloads, chunk: int = 500) -> float:
+    # Render in worker-sized batches and drop the output, so timings measure
+    # rendering rather than holding thousands of documents in memory
+    start = time.perf_counter()
+    for i in range(0, len(payloads), chunk):
+        fn(payloads[i:i + chunk])
+    return (time.perf_counter() - start) * 1e6 / len(payloads)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--emails", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{args.emails} emails per kind (µs per email, best of 3)")
+    for kind, legacy in _LEGACY.items():
+        payloads = _payloads(kind, args.emails)
+        assert [legacy(**p) for p in payloads[:50]] == email_service.render_batch(kind, payloads[:50]), \
+            f"{kind}: precompiled output differs from the baseline"
+        runs = {
+            "before": lambda ps: [legacy(**p) for p in ps],
+            "render()": lambda ps: [email_service.render(kind, p) for p in ps],
+            "render_batch()": lambda ps: email_service.render_batch(kind, ps),
+        }
+        print(f"  {kind}")
+        baseline = None
+        for label, fn in runs.items():
+            cost = min(_per_email_us(fn, payloads) for _ in range(3))
+            baseline = baseline or cost
+            print(f"    {label:<20} {cost:7.2f} µs   {baseline / cost:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
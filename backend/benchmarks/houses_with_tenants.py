@@ -0,0 +1,53 @@
+"""
+Benchmark GET /api/houses/with-tenants: per-house lazy tenant walk vs one join.
+
+Usage (from backend/):
+    python -m benchmarks.houses_with_tenants [--houses 2000] [--history 8]
+"""
+import argparse
+from benchmarks.common import reset_schema, bulk_portfolio, timed, QueryCounter
+from database import SessionLocal
+from routers.houses import _houses_with_tenants
+import models
+
+
+def _lazy_walk(db):
+    """The previous implementation: load houses, then each house's full tenant history."""
+    houses = db.query(models.House).filter(models.House.is_active == True).order_by(models.House.name).all()
+    result = []
+    for h in houses:
+        active_tenant = next((t for t in h.tenants if t.is_active), None)
+        result.append({
+            "id": h.id,
+            "name": h.name,
+            "current_tenant": active_tenant.full_name if active_tenant else None,
+            "tenant_id": active_tenant.id if active_tenant else None,
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--houses", type=int, default=2000)
+    parser.add_argument("--history", type=int, default=8, help="tenants per house, including the current one")
+    args = parser.parse_args()
+
+    reset_schema()
+    bulk_portfolio(args.houses, args.history)
+    print(f"{args.houses} houses × {args.history} tenants each")
+
+    for label, fn in (("lazy walk", _lazy_walk), ("single join", _houses_with_tenants)):
+        def run():
+            db = SessionLocal()
+            try:
+                fn(db)
+            finally:
+                db.close()
+
+        with QueryCounter() as qc:
+            run()
+        print(f"  {label:<12} {timed(run):8.1f} ms  {qc.count:6d} queries")
+
+
+if __name__ == "__main__":
+    main()
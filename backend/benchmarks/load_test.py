@@ -0,0 +1,251 @@
+"""
+Load test: a fixed mix of dashboard, list, search and record-payment requests
+at a fixed concurrency, reporting p50/p95/p99 latency and throughput.
+
+The request sequence is drawn from --seed, so two runs against the same data
+send the same requests. Write a report with --output on one commit and pass
+it as --compare on another to print the change per endpoint.
+
+By default the API is started under uvicorn on DATABASE_URL (created if it
+has never been migrated). If that database has no houses yet, a synthetic portfolio is generated first
+(--houses/--tenants/--payments; for large sizes load it once with
+`python manage.py generate-data` and reuse it). A `loadtest` admin is
+created to log in with. Pass --url to drive a server that is already running
+instead, logging in with --username/--password.
+
+Usage (from backend/):
+    python -m benchmarks.load_test [--concurrency 20] [--requests 5000] [--output report.json]
+    python -m benchmarks.load_test --compare report.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import date, datetime, timezone
+import httpx
+from benchmarks.common import create_schema, free_port, start_server
+from database import SessionLocal, SYNC_DATABASE_URL, engine, schema_revision
+from services import synthetic_data
+from utils.auth import hash_password
+import models
+
+# Relative share of each endpoint in the request mix
+MIX = {
+    "dashboard": 15,
+    "houses_list": 10,
+    "payments_list": 25,
+    "tenant_payments": 15,
+    "tenant_search": 20,
+    "record_payment": 15,
+}
+USERNAME = PASSWORD = "loadtest"
+
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"]) != 0
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _prepare_local_database(args) -> dict:
+    """Ensure the local database has data and the load-test admin; returns its row counts."""
+    if schema_revision() is None:
+        create_schema()
+    db = SessionLocal()
+    try:
+        if not db.query(models.House.id).first():
+            print(f"🏗️  Empty database: generating {args.houses:,} houses, {args.tenants:,} tenants, "
+                  f"{args.payments:,} payments...")
+            synthetic_data.generate(engine, args.houses, args.tenants, args.payments, seed=args.seed)
+        admin = db.query(models.Admin).filter(models.Admin.username == USERNAME).first()
+        if not admin:
+            db.add(models.Admin(username=USERNAME, hashed_password=hash_password(PASSWORD)))
+            db.commit()
+        return {
+            "houses": db.query(models.House).count(),
+            "tenants": db.query(models.Tenant).count(),
+            "payments": db.query(models.Payment).count(),
+        }
+    finally:
+        db.close()
+
+
+def _request_plan(rnd: random.Random, count: int, houses: list, mix: dict) -> list:
+    """(endpoint, method, path, json body) for each request, in order."""
+    occupied = [h for h in houses if h["tenant_id"]]
+    surnames = sorted({h["current_tenant"].split()[-1] for h in occupied})
+    this_month = date.today().strftime("%Y-%m")
+    names, weights = zip(*mix.items())
+    plan = []
+    for name in rnd.choices(names, weights, k=count):
+        house = rnd.choice(occupied)
+        if name == "dashboard":
+            plan.append((name, "GET", "/api/payments/dashboard", None))
+        elif name == "houses_list":
+            plan.append((name, "GET", "/api/houses/", None))
+        elif name == "payments_list":
+            plan.append((name, "GET", "/api/payments/?limit=20", None))
+        elif name == "tenant_payments":
+            plan.append((name, "GET", f"/api/tenants/{house['tenant_id']}/payments?limit=10", None))
+        elif name == "tenant_search":
+            surname = rnd.choice(surnames)
+            plan.append((name, "GET", f"/api/tenants/search?q={surname[:rnd.randint(3, len(surname))]}", None))
+        elif name == "record_payment":
+            plan.append((name, "POST", "/api/payments/", {
+                "tenant_id": house["tenant_id"], "house_id": house["id"], "amount_paid": 500.0,
+                "payment_date": date.today().isoformat(), "month_paid_for": this_month,
+                "payment_method": "mpesa", "send_email": False,
+            }))
+    return plan
+
+
+def _percentile(ordered: list, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000 if ordered else 0.0
+
+
+def _summary(latencies: list, errors: int) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered), "errors": errors,
+        "p50_ms": round(_percentile(ordered, 0.50), 2),
+        "p95_ms": round(_percentile(ordered, 0.95), 2),
+        "p99_ms": round(_percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+    }
+
+
+async def _run(base_url: str, username: str, password: str, concurrency: int, requests: int,
+               warmup: int, seed: int, mix: dict) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        login = await http.post("/api/auth/login", data={"username": username, "password": password})
+        login.raise_for_status()
+        http.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        houses = (await http.get("/api/houses/with-tenants")).json()
+        plan = _request_plan(random.Random(seed), warmup + requests, houses, mix)
+
+        latencies = {name: [] for name in mix}
+        errors = {name: 0 for name in mix}
+        position = 0
+
+        async def worker(end: int, record: bool):
+            nonlocal position
+            while position < end:
+                index, position = position, position + 1
+                name, method, path, body = plan[index]
+                start = time.perf_counter()
+                try:
+                    response = await http.request(method, path, json=body)
+                    failed = response.status_code >= 400
+                except httpx.TransportError:
+                    failed = True
+                if record:
+                    latencies[name].append(time.perf_counter() - start)
+                    errors[name] += failed
+
+        # Warm-up requests fill caches and the connection pool; they are not recorded
+        await asyncio.gather(*(worker(warmup, record=False) for _ in range(concurrency)))
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(len(plan), record=True) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    all_latencies = [s for values in latencies.values() for s in values]
+    return {
+        "overall": {**_summary(all_latencies, sum(errors.values())),
+                    "seconds": round(elapsed, 2), "throughput_rps": round(len(all_latencies) / elapsed, 1)},
+        "endpoints": {name: _summary(latencies[name], errors[name]) for name in mix if latencies[name]},
+    }
+
+
+def _print_report(report: dict, baseline: dict = None):
+    def change(section: dict, base: dict, key: str) -> str:
+        if not base or not base.get(key):
+            return ""
+        delta = (section[key] - base[key]) / base[key]
+        return f" ({delta:+.0%})"
+
+    overall = report["overall"]
+    base_overall = baseline["overall"] if baseline else None
+    print(f"  {'endpoint':<16}{'requests':>9}{'errors':>7}{'p50 ms':>9}{'':7}{'p95 ms':>9}{'':7}{'p99 ms':>9}")
+    rows = [*report["endpoints"].items(), ("overall", overall)]
+    for name, section in rows:
+        base = base_overall if name == "overall" else (baseline or {}).get("endpoints", {}).get(name)
+        cells = "".join(f"{section[k]:>9.1f}{change(section, base, k):<7}" for k in ("p50_ms", "p95_ms", "p99_ms"))
+        print(f"  {name:<16}{section['requests']:>9}{section['errors']:>7}{cells}")
+    print(f"  throughput {overall['throughput_rps']:.0f} req/s{change(overall, base_overall, 'throughput_rps')}"
+          f" over {overall['seconds']:.1f}s")
+    if baseline:
+        print(f"  (changes against {baseline['meta']['commit']})")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="Drive this running server instead of starting one")
+    parser.add_argument("--username", default=USERNAME)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mix", help="Endpoint weights, e.g. tenant_search=1,record_payment=1")
+    parser.add_argument("--houses", type=int, default=500, help="Generated if the database is empty")
+    parser.add_argument("--tenants", type=int, default=5000)
+    parser.add_argument("--payments", type=int, default=100000)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--compare", help="Show changes against this earlier report")
+    args = parser.parse_args()
+
+    mix = MIX
+    if args.mix:
+        mix = {name: float(weight) for name, weight in (part.split("=") for part in args.mix.split(","))}
+        unknown = set(mix) - set(MIX)
+        if unknown:
+            parser.error(f"unknown endpoint(s) in --mix: {', '.join(sorted(unknown))}")
+
+    server, dataset = None, None
+    base_url = args.url
+    if base_url is None:
+        dataset = _prepare_local_database(args)
+        port = free_port()
+        server = start_server(SYNC_DATABASE_URL.render_as_string(hide_password=False), port)
+        base_url = f"http://127.0.0.1:{port}"
+
+    print(f"{args.requests} requests at concurrency {args.concurrency} against {base_url}"
+          + (f" ({dataset['houses']:,} houses, {dataset['tenants']:,} tenants, {dataset['payments']:,} payments)"
+             if dataset else ""))
+    try:
+        results = asyncio.run(_run(base_url, args.username, args.password, args.concurrency,
+                                   args.requests, args.warmup, args.seed, mix))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(), "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "url": args.url, "database": SYNC_DATABASE_URL.get_backend_name() if args.url is None else None,
+            "dataset": dataset, "concurrency": args.concurrency, "requests": args.requests,
+            "seed": args.seed, "mix": mix, "python": platform.python_version(),
+        },
+        **results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"  report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
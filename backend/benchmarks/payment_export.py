@@ -0,0 +1,47 @@
+"""
+Benchmark the streaming payment export: time to first chunk and peak Python
+memory while draining it, at two ledger sizes.
+
+Usage (from backend/):
+    python -m benchmarks.payment_export [--houses 500] [--months 48]
+"""
+import argparse
+import time
+import tracemalloc
+from benchmarks.common import reset_schema, bulk_portfolio
+from services.payment_export import iter_export
+
+
+def _drain(fmt: str) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    stream = iter_export(fmt)
+    next(stream)
+    first_chunk_ms = (time.perf_counter() - start) * 1000
+    size = 0
+    for chunk in stream:
+        size += len(chunk)
+    total_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_chunk_ms, total_ms, peak / 1024 / 1024, size / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--houses", type=int, default=500)
+    parser.add_argument("--months", type=int, default=48, help="payments per tenant at the largest size")
+    args = parser.parse_args()
+
+    for months in (args.months // 8, args.months):
+        reset_schema()
+        bulk_portfolio(args.houses, 1, months)
+        rows = args.houses * months
+        for fmt in ("csv", "ndjson"):
+            first, total, peak, size = _drain(fmt)
+            print(f"{rows:>9,} rows {fmt:<6} first chunk {first:6.1f} ms  "
+                  f"total {total:8.1f} ms  peak mem {peak:5.1f} MiB  output {size:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
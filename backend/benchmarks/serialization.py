@@ -0,0 +1,72 @@
+"""
+Benchmark serializing a large list_payments response, and its size on the wire.
+
+A 10,000-payment PaymentPage (each payment nesting its tenant and house) goes
+through the same steps as the route: response_model validation and encoding,
+then rendering by the standard library JSONResponse (before) and by
+ORJSONResponse, the app default (after). Rendered bodies are then compressed
+with the middleware's gzip and brotli settings.
+
+Usage (from backend/):
+    python -m benchmarks.serialization [--payments 10000]
+"""
+import argparse
+import asyncio
+import gzip
+import time
+import brotli
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy.orm import joinedload
+from benchmarks.common import reset_schema, bulk_portfolio, timed
+from database import SessionLocal
+from utils import compression
+import models
+import schemas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--payments", type=int, default=10000)
+    args = parser.parse_args()
+
+    reset_schema()
+    bulk_portfolio(args.payments // 12 + 1, tenants_per_house=1, payments_per_tenant=12)
+    db = SessionLocal()
+    payments = (
+        db.query(models.Payment)
+        .options(joinedload(models.Payment.tenant), joinedload(models.Payment.house))
+        .order_by(models.Payment.id)
+        .limit(args.payments)
+        .all()
+    )
+    db.close()
+    page = schemas.PaymentPage(items=payments, next_cursor=None)
+    field = create_response_field(name="response", type_=schemas.PaymentPage)
+
+    def encode():
+        return asyncio.run(serialize_response(field=field, response_content=page))
+
+    content = encode()
+    print(f"{len(payments)} payments in one list_payments page")
+    print(f"  validate + encode (response_model) {timed(encode):8.1f} ms")
+    bodies = {}
+    for label, cls in (("JSONResponse (before)", JSONResponse), ("ORJSONResponse (after)", ORJSONResponse)):
+        bodies[label] = cls(content).body
+        print(f"  render {label:<27} {timed(lambda: cls(content).body):8.1f} ms")
+
+    body = bodies["ORJSONResponse (after)"]
+    print(f"  bytes on the wire: identity {len(body):>10,}")
+    for label, compress in (
+        (f"gzip -{compression.GZIP_LEVEL}", lambda: gzip.compress(body, compresslevel=compression.GZIP_LEVEL)),
+        (f"brotli q{compression.BROTLI_QUALITY}", lambda: brotli.compress(body, quality=compression.BROTLI_QUALITY)),
+    ):
+        start = time.perf_counter()
+        size = len(compress())
+        ms = (time.perf_counter() - start) * 1000
+        print(f"                     {label:<9}{size:>10,}  ({size / len(body):.1%}, {ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
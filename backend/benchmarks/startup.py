@@ -0,0 +1,93 @@
+"""
+Benchmark cold start: how long a fresh worker takes to serve its first request.
+
+Each run starts a new process, so nothing is warm except the OS file cache.
+Three numbers are reported, each the median of --runs runs:
+
+  import main         interpreter start plus importing the app
+  startup check       the schema revision read a worker now does at boot,
+                      next to the create_all it used to do at import
+  first response      spawning uvicorn until GET /health answers
+
+Usage (from backend/):
+    python -m benchmarks.startup [--runs 5]
+
+Point DATABASE_URL at a migrated Postgres database to include real network
+round-trips in the schema numbers; by default a temporary SQLite file is used.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+from benchmarks.common import reset_schema, free_port
+from database import SYNC_DATABASE_URL
+
+_IMPORT = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+# Both run with a new engine, so the connection setup a booting worker pays is included
+_SCHEMA = """
+import time
+from database import Base, check_schema_revision, engine
+import models
+t = time.perf_counter(); check_schema_revision(models.SCHEMA_REVISION); check = time.perf_counter() - t
+engine.dispose()
+t = time.perf_counter(); Base.metadata.create_all(bind=engine); create_all = time.perf_counter() - t
+print(check, create_all)
+"""
+
+
+def _python(code: str, env: dict) -> list:
+    start = time.perf_counter()
+    out = subprocess.check_output([sys.executable, "-c", code], env=env, text=True)
+    return [time.perf_counter() - start, *map(float, out.split())]
+
+
+def _first_response(env: dict) -> float:
+    port = free_port()
+    client = httpx.Client(base_url=f"http://127.0.0.1:{port}")  # built up front; it loads TLS certificates
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"], env=env,
+    )
+    try:
+        while True:
+            try:
+                if client.get("/health").status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                if server.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.005)
+    finally:
+        client.close()
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    reset_schema()
+    env = dict(os.environ, DATABASE_URL=SYNC_DATABASE_URL.render_as_string(hide_password=False))
+    imports = [_python(_IMPORT, env) for _ in range(args.runs)]
+    schema = [_python(_SCHEMA, env) for _ in range(args.runs)]
+    ready = [_first_response(env) for _ in range(args.runs)]
+
+    def ms(values):
+        return f"{statistics.median(values) * 1000:8.1f} ms"
+
+    print(f"Cold start, median of {args.runs} runs ({SYNC_DATABASE_URL.get_backend_name()})")
+    print(f"  import main                    {ms([r[1] for r in imports])}"
+          f"   (whole process {ms([r[0] for r in imports]).strip()})")
+    print(f"  startup check (revision read)  {ms([r[1] for r in schema])}")
+    print(f"  create_all (before)            {ms([r[2] for r in schema])}")
+    print(f"  first response from uvicorn    {ms(ready)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark tenant search on a large tenants table.
+
+Tenants get random two-part names, unique Kenyan mobile numbers and ID
+numbers; each query shape the search supports (name fragment, short name
+prefix, phone in local and international form, ID number) is timed.
+
+Usage (from backend/):
+    python -m benchmarks.tenant_search [--tenants 100000]
+"""
+import argparse
+import random
+from sqlalchemy import insert
+from benchmarks.common import reset_schema, timed
+from database import SessionLocal, engine
+from services import tenant_search
+import models
+
+_FIRST = ["Mary", "John", "Grace", "Peter", "Faith", "James", "Mercy", "David", "Esther", "Joseph",
+          "Ann", "Brian", "Lucy", "Kevin", "Jane", "Samuel", "Ruth", "Dennis", "Alice", "Victor"]
+_LAST = ["Wanjiku", "Otieno", "Kamau", "Achieng", "Mwangi", "Njeri", "Kiprono", "Wambui", "Omondi",
+         "Chebet", "Mutua", "Nyambura", "Kariuki", "Atieno", "Korir", "Muthoni", "Odhiambo", "Wairimu"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenants", type=int, default=100000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    reset_schema()
+    with engine.begin() as conn:
+        conn.execute(insert(models.Tenant), [
+            {"id": i, "full_name": f"{rnd.choice(_FIRST)} {rnd.choice(_LAST)}{i}",
+             "phone": f"07{i:08d}", "phone_normalized": f"2547{i:08d}", "id_number": str(20000000 + i),
+             "is_active": True, "deposit_paid": 0.0}
+            for i in range(1, args.tenants + 1)
+        ])
+
+    target = args.tenants // 2
+    queries = {
+        "name fragment": "wanjiku4",
+        "short name prefix": "ma",
+        "phone 07…": f"07{target:08d}",
+        "phone +254…": f"+2547{target:08d}",
+        "ID number": str(20000000 + target),
+        "ID number fragment": str(20000000 + target)[:6],
+    }
+    db = SessionLocal()
+    try:
+        print(f"{args.tenants} tenants ({engine.dialect.name})")
+        for label, q in queries.items():
+            hits = tenant_search.search(db, q)
+            ms = timed(lambda: tenant_search.search(db, q), repeat=20)
+            print(f"  {label:<20} {q!r:<16} {len(hits):3d} results  {ms:7.2f} ms")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
+from utils.read_replica import ReplicaMonitor, reads_pinned_to_primary
+import asyncio
 import os
 
 load_dotenv()
@@ -11,15 +16,77 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env file")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+
+# An async driver in DATABASE_URL (postgresql+asyncpg://, sqlite+aiosqlite://)
+# switches the API to async route handlers on an AsyncSession. Scripts,
+# migrations and the email worker keep a sync engine on the same database.
+_SYNC_DRIVER_FOR = {"asyncpg": "psycopg2", "aiosqlite": "pysqlite", "psycopg_async": "psycopg"}
+
+
+def _sync_url(url):
+    if url.get_driver_name() not in _SYNC_DRIVER_FOR:
+        return url
+    return url.set(drivername=f"{url.get_backend_name()}+{_SYNC_DRIVER_FOR[url.get_driver_name()]}")
+
+
+_url = make_url(DATABASE_URL)
+ASYNC_MODE = _url.get_driver_name() in _SYNC_DRIVER_FOR
+SYNC_DATABASE_URL = _sync_url(_url)
+
+
+def _pool_args(url) -> dict:
+    sizes = {"pool_size": POOL_SIZE, "max_overflow": MAX_OVERFLOW}
+    if url.get_backend_name() != "sqlite":
+        return sizes
+    if url.database in (None, "", ":memory:"):
+        if url.get_driver_name() == "aiosqlite":
+            return {}
+        # One connection for every thread, so threadpool handlers all see the
+        # same in-memory database (the default pool gives each thread its own)
+        from sqlalchemy.pool import StaticPool
+        return {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+    if url.get_driver_name() == "aiosqlite":
+        # Defaults to NullPool: a new connection and worker thread per request
+        from sqlalchemy.pool import AsyncAdaptedQueuePool
+        return {"poolclass": AsyncAdaptedQueuePool, **sizes}
+    return sizes
+
+
+engine = create_engine(SYNC_DATABASE_URL, pool_pre_ping=True, **_pool_args(SYNC_DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_async_engine(_url, pool_pre_ping=True, **_pool_args(_url))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+# Optional read replica for the GET routes (see utils/read_replica.py). In
+# async mode it needs an async driver too.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+replica_engine = None
+ReplicaSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+replica_monitor = None
+if DATABASE_REPLICA_URL:
+    _replica_url = make_url(DATABASE_REPLICA_URL)
+    if (_replica_url.get_driver_name() in _SYNC_DRIVER_FOR) != ASYNC_MODE:
+        raise ValueError("DATABASE_REPLICA_URL must use an async driver exactly when DATABASE_URL does")
+    _sync_replica_url = _sync_url(_replica_url)
+    replica_engine = create_engine(_sync_replica_url, pool_pre_ping=True, **_pool_args(_sync_replica_url))
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine, info={"replica": True})
+    replica_monitor = ReplicaMonitor(engine, replica_engine)
+    if ASYNC_MODE:
+        async_replica_engine = create_async_engine(_replica_url, pool_pre_ping=True, **_pool_args(_replica_url))
+        AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, autoflush=False, info={"replica": True})
+
 Base = declarative_base()
 
 
@@ -30,3 +97,88 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency that provides an AsyncSession (async mode only)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def read_session():
+    """A session for read-only work: on the replica when one is configured and
+    usable, otherwise on the primary."""
+    if replica_monitor is None or reads_pinned_to_primary() or not replica_monitor.usable():
+        return SessionLocal()
+    db = ReplicaSessionLocal()
+    try:
+        db.connection()  # check out now, so a dead replica falls back instead of failing the request
+    except DBAPIError as e:
+        db.close()
+        replica_monitor.mark_down(e)
+        return SessionLocal()
+    return db
+
+
+def get_read_db():
+    """Dependency for read-only routes; see read_session."""
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """Async counterpart of get_read_db (async mode only)."""
+    if replica_monitor is not None and not reads_pinned_to_primary():
+        if replica_monitor.due():
+            await asyncio.to_thread(replica_monitor.check)
+        if replica_monitor.usable():
+            async with AsyncReplicaSessionLocal() as db:
+                try:
+                    await db.connection()
+                except DBAPIError as e:
+                    replica_monitor.mark_down(e)
+                else:
+                    yield db
+                    return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def is_replica(db) -> bool:
+    return db.info.get("replica", False)
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the migration revision this code expects."""
+
+
+def schema_revision() -> Optional[str]:
+    """The database's Alembic revision, or None if it has never been migrated."""
+    with engine.connect() as conn:
+        try:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+        except DBAPIError:
+            return None
+
+
+def check_schema_revision(expected: str):
+    """One query at startup in place of create_all's per-table checks and DDL."""
+    current = schema_revision()
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at revision {current or '(none)'}, this code expects {expected}. "
+            "Run: python manage.py migrate"
+        )
+
+
+def alembic_config():
+    """Alembic configuration for this backend, usable from any working directory."""
+    from alembic.config import Config
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    config = Config(os.path.join(here, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(here, "migrations"))
+    return config
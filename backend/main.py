@@ -1,14 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from database import engine, Base
+from fastapi.responses import ORJSONResponse
+from database import (
+    engine, async_engine, ASYNC_MODE, check_schema_revision,
+    replica_engine, async_replica_engine, replica_monitor,
+)
 from routers import auth, houses, tenants, payments
+from utils.response_cache import response_cache
+from utils.compression import CompressionMiddleware
+from utils import metrics, sql_profiler
+from utils.read_replica import ReadYourWritesMiddleware, HEADER as PRIMARY_UNTIL_HEADER
 from dotenv import load_dotenv
+import models
 import os
 
 load_dotenv()
 
-# Create all database tables
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables are created and altered only by `python manage.py migrate`; a
+    # booting worker just reads the schema revision (SCHEMA_CHECK=off skips it)
+    if os.getenv("SCHEMA_CHECK", "on") != "off":
+        check_schema_revision(models.SCHEMA_REVISION)
+    yield
+
 
 app = FastAPI(
     title="Murithi Rental Management API",
@@ -16,8 +33,13 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# Brotli / gzip for responses over COMPRESS_MIN_BYTES (payment and tenant lists)
+app.add_middleware(CompressionMiddleware, minimum_size=int(os.getenv("COMPRESS_MIN_BYTES", "1024")))
+
 # CORS — allow React frontend
 app.add_middleware(
     CORSMiddleware,
@@ -30,13 +52,42 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # ETag: the frontend's conditional GET cache; X-Primary-Until: read-your-writes
+    expose_headers=["ETag", PRIMARY_UNTIL_HEADER],
 )
 
-# Register all routers
+# GET routes read from DATABASE_REPLICA_URL when set; a client that just wrote
+# is sent to the primary for REPLICA_STICKY_SECONDS
+if replica_monitor is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+engines = {"sync": engine} if not ASYNC_MODE else {"sync": engine, "async": async_engine.sync_engine}
+if replica_engine is not None:
+    engines["replica"] = replica_engine
+if async_replica_engine is not None:
+    engines["replica_async"] = async_replica_engine.sync_engine
+
+# Per-request SQL profile of a sample of requests (SQL_PROFILE_SAMPLE_RATE, off by default)
+if sql_profiler.SAMPLE_RATE > 0:
+    sql_profiler.install(app, *engines.values())
+
+# Request / SQL / pool metrics, served at /metrics. Added last so it is the
+# outermost middleware and its latency includes compression and CORS
+metrics.instrument(app, **engines)
+
+# Register all routers (async variants when DATABASE_URL uses an async driver)
+if ASYNC_MODE:
+    from routers.aio import async_variant
+    houses_router, tenants_router, payments_router = (
+        async_variant(houses.router), async_variant(tenants.router), async_variant(payments.router)
+    )
+else:
+    houses_router, tenants_router, payments_router = houses.router, tenants.router, payments.router
+
 app.include_router(auth.router,     prefix="/api/auth",     tags=["🔐 Authentication"])
-app.include_router(houses.router,   prefix="/api/houses",   tags=["🏠 Houses"])
-app.include_router(tenants.router,  prefix="/api/tenants",  tags=["👤 Tenants"])
-app.include_router(payments.router, prefix="/api/payments", tags=["💰 Payments"])
+app.include_router(houses_router,   prefix="/api/houses",   tags=["🏠 Houses"])
+app.include_router(tenants_router,  prefix="/api/tenants",  tags=["👤 Tenants"])
+app.include_router(payments_router, prefix="/api/payments", tags=["💰 Payments"])
 
 
 @app.get("/", tags=["Root"])
@@ -52,3 +103,21 @@ def root():
 @app.get("/health", tags=["Root"])
 def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/health/cache", tags=["Root"])
+def cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/health/replica", tags=["Root"])
+def replica_stats():
+    if replica_monitor is None:
+        return {"configured": False}
+    replica_monitor.usable()  # refresh if due
+    return {"configured": True, **replica_monitor.stats()}
@@ -0,0 +1,186 @@
+"""
+Maintenance commands for the rental backend.
+Usage: python manage.py <command> [options]
+
+  migrate           Apply database migrations (the only step that runs DDL)
+  rollups verify    Compare the revenue rollup with raw payments and report drift
+  rollups rebuild   Recompute the revenue rollup from raw payments
+  explain           Check with EXPLAIN that the hot queries use their indexes
+  email-worker      Deliver queued emails from the outbox (runs until stopped)
+  generate-data     Bulk-load a synthetic portfolio for scale testing
+"""
+import argparse
+import sys
+from database import SessionLocal
+
+
+def cmd_migrate(args) -> int:
+    from database import alembic_config, schema_revision
+    import models
+
+    current = schema_revision()
+    if args.check:
+        if current == models.SCHEMA_REVISION:
+            print(f"✅ Database is at {current}")
+            return 0
+        print(f"⚠️  Database is at {current or '(none)'}, the code expects {models.SCHEMA_REVISION}")
+        print("   Run: python manage.py migrate")
+        return 1
+
+    from alembic import command
+    command.upgrade(alembic_config(), args.revision)
+    migrated = schema_revision()
+    if migrated == current:
+        print(f"✅ Database already at {migrated}")
+    else:
+        print(f"✅ Database migrated from {current or '(empty)'} to {migrated}")
+    return 0
+
+
+def cmd_rollups(args) -> int:
+    from services import revenue_rollup
+
+    db = SessionLocal()
+    try:
+        if args.action == "rebuild":
+            rows = revenue_rollup.rebuild(db)
+            print(f"✅ Revenue rollup rebuilt ({rows} rows)")
+            return 0
+
+        drift = revenue_rollup.verify(db)
+        if not drift:
+            print("✅ Revenue rollup matches payments")
+            return 0
+        print(f"⚠️  Revenue rollup drift on {len(drift)} key(s):")
+        for d in drift:
+            print(
+                f"   {d['month']} house={d['house_id']} method={d['payment_method']}: "
+                f"rollup={d['rollup'][0]:,.2f}/{d['rollup'][1]} "
+                f"actual={d['actual'][0]:,.2f}/{d['actual'][1]}"
+            )
+        print("   Run: python manage.py rollups rebuild")
+        return 1
+    finally:
+        db.close()
+
+
+def cmd_explain(args) -> int:
+    from services import query_plans
+
+    db = SessionLocal()
+    try:
+        results = query_plans.run_checks(db)
+    finally:
+        db.close()
+
+    failed = 0
+    for r in results:
+        mark = "✅" if r["ok"] else "❌"
+        print(f"{mark} {r['name']} → {r['index']}")
+        if not r["ok"] or args.verbose:
+            for line in r["plan"].splitlines():
+                print(f"      {line}")
+        failed += not r["ok"]
+    if failed:
+        print(f"\n⚠️  {failed} quer{'y' if failed == 1 else 'ies'} not using the expected index. "
+              "Is the database migrated? Run: python manage.py migrate")
+    return 1 if failed else 0
+
+
+def cmd_email_worker(args) -> int:
+    from services import email_worker
+    from services.email_transport import transport_from_env, EmailDeliveryError
+
+    try:
+        transport = transport_from_env()
+    except EmailDeliveryError as e:
+        print(f"❌ {e}")
+        return 1
+
+    rate_limit = email_worker.RATE_LIMIT if args.rate_limit is None else args.rate_limit
+    rate = f"{rate_limit:g}/s" if rate_limit > 0 else "unlimited"
+    print(f"📬 Email worker started ({type(transport).__name__}, concurrency={args.concurrency}, rate={rate})")
+    if args.metrics_port:
+        from prometheus_client import start_http_server
+        start_http_server(args.metrics_port)
+        print(f"📈 Metrics on http://0.0.0.0:{args.metrics_port}/metrics")
+    try:
+        totals = email_worker.run(
+            SessionLocal, transport,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            poll_interval=args.poll_interval,
+            once=args.once,
+            rate_limit=rate_limit,
+        )
+    except KeyboardInterrupt:
+        print("\n👋 Email worker stopped")
+        return 0
+    print(f"✅ Outbox drained: {totals['sent']} sent, {totals['retrying']} retrying, {totals['dead']} dead")
+    return 0
+
+
+def cmd_generate_data(args) -> int:
+    from database import engine
+    from services import synthetic_data
+
+    print(f"🏗️  Generating {args.houses:,} houses, {args.tenants:,} tenants, "
+          f"{args.payments:,} payments over {args.years} years (seed {args.seed})...")
+
+    def progress(table, rows):
+        print(f"   {table}: {rows:,}", end="\r" if table == "payments" else "\n", flush=True)
+
+    totals = synthetic_data.generate(
+        engine, args.houses, args.tenants, args.payments,
+        years=args.years, seed=args.seed, chunk_size=args.chunk_size, progress=progress,
+    )
+    print(f"\n✅ Inserted {totals['houses']:,} houses, {totals['tenants']:,} tenants and "
+          f"{totals['payments']:,} payments in {totals['seconds']:.0f}s "
+          f"(revenue rollup rebuilt, {totals['rollup_rows']:,} rows)")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Rental backend maintenance commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="Apply database migrations (alembic upgrade)")
+    migrate.add_argument("revision", nargs="?", default="head")
+    migrate.add_argument("--check", action="store_true",
+                         help="Only report whether the database is at the code's revision (exit 1 if not)")
+    migrate.set_defaults(func=cmd_migrate)
+
+    rollups = sub.add_parser("rollups", help="Verify or rebuild the revenue rollup table")
+    rollups.add_argument("action", choices=["verify", "rebuild"])
+    rollups.set_defaults(func=cmd_rollups)
+
+    explain = sub.add_parser("explain", help="Check that the hot queries use their indexes")
+    explain.add_argument("-v", "--verbose", action="store_true", help="Print every query plan")
+    explain.set_defaults(func=cmd_explain)
+
+    worker = sub.add_parser("email-worker", help="Deliver queued emails from the outbox")
+    worker.add_argument("--batch-size", type=int, default=50, help="Messages claimed per cycle")
+    worker.add_argument("--concurrency", type=int, default=8, help="Parallel sends per batch")
+    worker.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to wait when idle")
+    worker.add_argument("--rate-limit", type=float, default=None,
+                        help="Max sends per second across all threads (default EMAIL_RATE_LIMIT, 0 = unlimited)")
+    worker.add_argument("--once", action="store_true", help="Exit once the outbox is empty")
+    worker.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics (email_sends_total) on this port")
+    worker.set_defaults(func=cmd_email_worker)
+
+    generate = sub.add_parser("generate-data", help="Bulk-load a synthetic portfolio for scale testing")
+    generate.add_argument("--houses", type=int, default=1000)
+    generate.add_argument("--tenants", type=int, default=10000, help="Including moved-out tenants")
+    generate.add_argument("--payments", type=int, default=500000)
+    generate.add_argument("--years", type=int, default=5, help="Length of the payment history")
+    generate.add_argument("--seed", type=int, default=42)
+    generate.add_argument("--chunk-size", type=int, default=20000, help="Rows per insert batch")
+    generate.set_defaults(func=cmd_generate_data)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+from logging.config import fileConfig
+import re
+from alembic import context
+from database import Base, engine
+import models  # noqa: F401 — registers every table on Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Created by raw DDL (models.TENANT_SEARCH_DDL, migration 0005), not on the
+# metadata: without this, autogenerate and `alembic check` propose dropping the
+# FTS5 table and its shadow tables (tenant_search_data, _idx, ...) and the
+# trigram indexes
+_SEARCH_INDEXES = set(re.findall(
+    r"CREATE INDEX IF NOT EXISTS (\w+)",
+    " ".join(statement for statements in models.TENANT_SEARCH_DDL.values() for statement in statements),
+))
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name.startswith("tenant_search"):
+        return False
+    if type_ == "index" and name in _SEARCH_INDEXES:
+        return False
+    return True
+
+
+def run_migrations_offline():
+    """Emit SQL to stdout instead of running it (alembic upgrade --sql)."""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=engine.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite cannot ALTER most things in place; batch mode rebuilds the table
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,105 @@
+"""Baseline schema: houses, tenants, payments, admins
+
+Matches the tables previously created by Base.metadata.create_all. Databases
+that already have these tables should be stamped, not upgraded:
+    alembic stamp 0001_baseline
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "admins",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(length=100), nullable=False),
+        sa.Column("email", sa.String(length=200), nullable=True),
+        sa.Column("full_name", sa.String(length=200), nullable=True),
+        sa.Column("hashed_password", sa.String(length=255), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("email"),
+        sa.UniqueConstraint("username"),
+    )
+    op.create_index("ix_admins_id", "admins", ["id"])
+
+    op.create_table(
+        "houses",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("house_type", sa.String(length=50), nullable=False),
+        sa.Column("rent_amount", sa.Float(), nullable=False),
+        sa.Column("floor", sa.String(length=20), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("is_occupied", sa.Boolean(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_houses_id", "houses", ["id"])
+
+    op.create_table(
+        "tenants",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("full_name", sa.String(length=200), nullable=False),
+        sa.Column("id_number", sa.String(length=50), nullable=True),
+        sa.Column("phone", sa.String(length=20), nullable=False),
+        sa.Column("email", sa.String(length=200), nullable=True),
+        sa.Column("house_id", sa.Integer(), nullable=True),
+        sa.Column("move_in_date", sa.Date(), nullable=True),
+        sa.Column("move_out_date", sa.Date(), nullable=True),
+        sa.Column("emergency_contact_name", sa.String(length=200), nullable=True),
+        sa.Column("emergency_contact_phone", sa.String(length=20), nullable=True),
+        sa.Column("occupation", sa.String(length=100), nullable=True),
+        sa.Column("private_notes", sa.Text(), nullable=True),
+        sa.Column("deposit_paid", sa.Float(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["house_id"], ["houses.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("id_number"),
+    )
+    op.create_index("ix_tenants_id", "tenants", ["id"])
+
+    op.create_table(
+        "payments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tenant_id", sa.Integer(), nullable=False),
+        sa.Column("house_id", sa.Integer(), nullable=False),
+        sa.Column("amount_paid", sa.Float(), nullable=False),
+        sa.Column("payment_date", sa.Date(), nullable=False),
+        sa.Column("month_paid_for", sa.String(length=7), nullable=False),
+        sa.Column("payment_method", sa.String(length=20), nullable=False),
+        sa.Column("reference_code", sa.String(length=100), nullable=True),
+        sa.Column("notes", sa.Text(), nullable=True),
+        sa.Column("email_sent", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["house_id"], ["houses.id"]),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_payments_id", "payments", ["id"])
+
+
+def downgrade():
+    op.drop_index("ix_payments_id", table_name="payments")
+    op.drop_table("payments")
+    op.drop_index("ix_tenants_id", table_name="tenants")
+    op.drop_table("tenants")
+    op.drop_index("ix_houses_id", table_name="houses")
+    op.drop_table("houses")
+    op.drop_index("ix_admins_id", table_name="admins")
+    op.drop_table("admins")
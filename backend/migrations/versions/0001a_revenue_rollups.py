@@ -0,0 +1,67 @@
+"""Revenue rollups table, backfilled from the payment history
+
+Not part of the baseline: databases stamped at 0001_baseline predate it.
+The backfill is `python manage.py rollups rebuild` done once here, so the
+dashboard and payment writes find the table populated after an upgrade.
+
+Revision ID: 0001a_revenue_rollups
+Revises: 0001_baseline
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001a_revenue_rollups"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+# Table shapes as of this revision, independent of models.py
+_payments = sa.table(
+    "payments",
+    sa.column("house_id", sa.Integer),
+    sa.column("amount_paid", sa.Float),
+    sa.column("month_paid_for", sa.String),
+    sa.column("payment_method", sa.String),
+    sa.column("id", sa.Integer),
+)
+_rollups = sa.table(
+    "revenue_rollups",
+    sa.column("month", sa.String),
+    sa.column("house_id", sa.Integer),
+    sa.column("payment_method", sa.String),
+    sa.column("total_amount", sa.Float),
+    sa.column("payment_count", sa.Integer),
+)
+
+
+def upgrade():
+    # Databases created by create_all while the rollup existed but migrations
+    # did not already have the table; they still get the backfill
+    if not sa.inspect(op.get_bind()).has_table("revenue_rollups"):
+        op.create_table(
+            "revenue_rollups",
+            sa.Column("month", sa.String(length=7), nullable=False),
+            sa.Column("house_id", sa.Integer(), nullable=False),
+            sa.Column("payment_method", sa.String(length=20), nullable=False),
+            sa.Column("total_amount", sa.Float(), nullable=False),
+            sa.Column("payment_count", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["house_id"], ["houses.id"]),
+            sa.PrimaryKeyConstraint("month", "house_id", "payment_method"),
+        )
+
+    op.execute(_rollups.delete())
+    op.execute(_rollups.insert().from_select(
+        ["month", "house_id", "payment_method", "total_amount", "payment_count"],
+        sa.select(
+            _payments.c.month_paid_for,
+            _payments.c.house_id,
+            _payments.c.payment_method,
+            sa.func.sum(_payments.c.amount_paid),
+            sa.func.count(_payments.c.id),
+        ).group_by(_payments.c.month_paid_for, _payments.c.house_id, _payments.c.payment_method),
+    ))
+
+
+def downgrade():
+    op.drop_table("revenue_rollups")
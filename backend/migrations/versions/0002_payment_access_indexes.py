@@ -0,0 +1,52 @@
+"""Composite indexes for the payment access paths, partial indexes on is_active
+
+Revision ID: 0002_payment_access_indexes
+Revises: 0001a_revenue_rollups
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_payment_access_indexes"
+down_revision = "0001a_revenue_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY on Postgres so a large payments table stays writable while
+    # the indexes build; that needs to run outside the migration transaction.
+    with op.get_context().autocommit_block():
+        # Dashboard / reminders: "who paid for month X" and the overdue anti-join
+        op.create_index("ix_payments_month_tenant", "payments", ["month_paid_for", "tenant_id"],
+                        postgresql_concurrently=True)
+        # Per-house takings and list_payments?house_id=
+        op.create_index("ix_payments_house_month", "payments", ["house_id", "month_paid_for"],
+                        postgresql_concurrently=True)
+        # Keyset pagination of list_payments (created_at DESC, id DESC)
+        op.create_index("ix_payments_created_id", "payments", ["created_at", "id"],
+                        postgresql_concurrently=True)
+        # Keyset pagination of a tenant's own payments
+        op.create_index("ix_payments_tenant_created_id", "payments", ["tenant_id", "created_at", "id"],
+                        postgresql_concurrently=True)
+
+        # Only current tenants / live units are ever listed or counted
+        op.create_index(
+            "ix_tenants_active_house", "tenants", ["house_id"],
+            postgresql_where=sa.text("is_active"), sqlite_where=sa.text("is_active = 1"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_houses_active_name", "houses", ["name"],
+            postgresql_where=sa.text("is_active"), sqlite_where=sa.text("is_active = 1"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    op.drop_index("ix_houses_active_name", table_name="houses")
+    op.drop_index("ix_tenants_active_house", table_name="tenants")
+    op.drop_index("ix_payments_tenant_created_id", table_name="payments")
+    op.drop_index("ix_payments_created_id", table_name="payments")
+    op.drop_index("ix_payments_house_month", table_name="payments")
+    op.drop_index("ix_payments_month_tenant", table_name="payments")
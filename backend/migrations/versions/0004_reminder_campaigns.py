@@ -0,0 +1,39 @@
+"""Reminder campaigns tracked through the email outbox
+
+Revision ID: 0004_reminder_campaigns
+Revises: 0003_email_outbox
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_reminder_campaigns"
+down_revision = "0003_email_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "reminder_campaigns",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.String(length=7), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("last_run_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("month"),
+    )
+    with op.batch_alter_table("email_outbox") as batch:
+        batch.add_column(sa.Column("campaign_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_email_outbox_campaign_id", "reminder_campaigns", ["campaign_id"], ["id"], ondelete="CASCADE"
+        )
+        batch.create_index("ux_email_outbox_campaign_tenant", ["campaign_id", "tenant_id"], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table("email_outbox") as batch:
+        batch.drop_index("ux_email_outbox_campaign_tenant")
+        batch.drop_constraint("fk_email_outbox_campaign_id", type_="foreignkey")
+        batch.drop_column("campaign_id")
+    op.drop_table("reminder_campaigns")
@@ -0,0 +1,92 @@
+"""Normalized tenant phone and trigram indexes for tenant search
+
+Revision ID: 0005_tenant_search
+Revises: 0004_reminder_campaigns
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from utils.phone import normalize_phone
+
+revision = "0005_tenant_search"
+down_revision = "0004_reminder_campaigns"
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH = 5000
+
+_SQLITE_SEARCH = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tenant_search USING fts5("
+    "full_name, phone_normalized, id_number, content='tenants', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS tenants_search_insert AFTER INSERT ON tenants BEGIN "
+    "INSERT INTO tenant_search (rowid, full_name, phone_normalized, id_number) "
+    "VALUES (new.id, new.full_name, new.phone_normalized, new.id_number); END",
+    "CREATE TRIGGER IF NOT EXISTS tenants_search_delete AFTER DELETE ON tenants BEGIN "
+    "INSERT INTO tenant_search (tenant_search, rowid, full_name, phone_normalized, id_number) "
+    "VALUES ('delete', old.id, old.full_name, old.phone_normalized, old.id_number); END",
+    "CREATE TRIGGER IF NOT EXISTS tenants_search_update "
+    "AFTER UPDATE OF full_name, phone_normalized, id_number ON tenants BEGIN "
+    "INSERT INTO tenant_search (tenant_search, rowid, full_name, phone_normalized, id_number) "
+    "VALUES ('delete', old.id, old.full_name, old.phone_normalized, old.id_number); "
+    "INSERT INTO tenant_search (rowid, full_name, phone_normalized, id_number) "
+    "VALUES (new.id, new.full_name, new.phone_normalized, new.id_number); END",
+    "CREATE INDEX IF NOT EXISTS ix_tenants_name_lower ON tenants (lower(full_name))",
+    # Index the rows that existed before the triggers
+    "INSERT INTO tenant_search (tenant_search) VALUES ('rebuild')",
+]
+
+_POSTGRES_INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tenants_name_trgm ON tenants USING gin (lower(full_name) gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tenants_phone_trgm ON tenants USING gin (phone_normalized gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tenants_id_number_trgm ON tenants USING gin (id_number gin_trgm_ops)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tenants_name_prefix ON tenants (lower(full_name) text_pattern_ops)",
+]
+
+
+def _backfill_phone():
+    conn = op.get_bind()
+    tenants = sa.table("tenants", sa.column("id", sa.Integer), sa.column("phone", sa.String),
+                       sa.column("phone_normalized", sa.String))
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(tenants.c.id, tenants.c.phone).where(tenants.c.id > last_id)
+            .order_by(tenants.c.id).limit(_BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            tenants.update().where(tenants.c.id == sa.bindparam("tid")).values(phone_normalized=sa.bindparam("pn")),
+            [{"tid": r.id, "pn": normalize_phone(r.phone)} for r in rows],
+        )
+        last_id = rows[-1].id
+
+
+def upgrade():
+    with op.batch_alter_table("tenants") as batch:
+        batch.add_column(sa.Column("phone_normalized", sa.String(length=20), nullable=True))
+    _backfill_phone()
+
+    if op.get_bind().dialect.name == "sqlite":
+        for statement in _SQLITE_SEARCH:
+            op.execute(statement)
+    elif op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        # CONCURRENTLY keeps tenants writable while the indexes build
+        with op.get_context().autocommit_block():
+            for statement in _POSTGRES_INDEXES:
+                op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for name in ("tenants_search_insert", "tenants_search_delete", "tenants_search_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS tenant_search")
+        op.execute("DROP INDEX IF EXISTS ix_tenants_name_lower")
+    elif op.get_bind().dialect.name == "postgresql":
+        for name in ("ix_tenants_name_prefix", "ix_tenants_id_number_trgm", "ix_tenants_phone_trgm",
+                     "ix_tenants_name_trgm"):
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+    with op.batch_alter_table("tenants") as batch:
+        batch.drop_column("phone_normalized")
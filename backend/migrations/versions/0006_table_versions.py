@@ -0,0 +1,29 @@
+"""Per-table write versions for ETags
+
+Revision ID: 0006_table_versions
+Revises: 0005_tenant_search
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_table_versions"
+down_revision = "0005_tenant_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_versions = op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+    op.bulk_insert(table_versions, [
+        {"table_name": name, "version": 0} for name in ("houses", "tenants", "payments")
+    ])
+
+
+def downgrade():
+    op.drop_table("table_versions")
@@ -1,11 +1,26 @@
 from sqlalchemy import (
     Column, Integer, String, Float, Date, Boolean,
-    ForeignKey, DateTime, Text, Enum
+    ForeignKey, DateTime, Text, Enum, Index, JSON, text, event, DDL
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import relationship, validates, Session
 from sqlalchemy.sql import func
 from database import Base
+from utils.phone import normalize_phone
 import enum
+import logging
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# The latest migration in migrations/versions; the app refuses to start
+# against a database at any other revision. Bump it with each new migration.
+SCHEMA_REVISION = "0006_table_versions"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
 
 
 class HouseType(str, enum.Enum):
@@ -37,6 +52,11 @@ class House(Base):
     tenants = relationship("Tenant", back_populates="house")
     payments = relationship("Payment", back_populates="house")
 
+    __table_args__ = (
+        Index("ix_houses_active_name", "name",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
+
 
 class Tenant(Base):
     __tablename__ = "tenants"
@@ -45,6 +65,7 @@ class Tenant(Base):
     full_name = Column(String(200), nullable=False)
     id_number = Column(String(50), unique=True, nullable=True)
     phone = Column(String(20), nullable=False)
+    phone_normalized = Column(String(20), nullable=True)          # 2547XXXXXXXX, kept in step with phone
     email = Column(String(200), nullable=True)
     house_id = Column(Integer, ForeignKey("houses.id"), nullable=True)
     move_in_date = Column(Date, nullable=True)
@@ -63,6 +84,55 @@ class Tenant(Base):
     house = relationship("House", back_populates="tenants")
     payments = relationship("Payment", back_populates="tenant")
 
+    __table_args__ = (
+        Index("ix_tenants_active_house", "house_id",
+              postgresql_where=text("is_active"), sqlite_where=text("is_active = 1")),
+    )
+
+    @validates("phone")
+    def _normalize_phone(self, key, value):
+        self.phone_normalized = normalize_phone(value)
+        return value
+
+
+# Tenant search (services/tenant_search.py) needs trigram indexes, which can't
+# be declared portably: pg_trgm GIN indexes on Postgres, and on SQLite an FTS5
+# trigram table over tenants kept in sync by triggers. Mirrors migration 0005.
+TENANT_SEARCH_DDL = {
+    "postgresql": [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_tenants_name_trgm ON tenants USING gin (lower(full_name) gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_tenants_phone_trgm ON tenants USING gin (phone_normalized gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_tenants_id_number_trgm ON tenants USING gin (id_number gin_trgm_ops)",
+        # Queries shorter than a trigram fall back to a name prefix match
+        "CREATE INDEX IF NOT EXISTS ix_tenants_name_prefix ON tenants (lower(full_name) text_pattern_ops)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS tenant_search USING fts5("
+        "full_name, phone_normalized, id_number, content='tenants', content_rowid='id', tokenize='trigram')",
+        "CREATE TRIGGER IF NOT EXISTS tenants_search_insert AFTER INSERT ON tenants BEGIN "
+        "INSERT INTO tenant_search (rowid, full_name, phone_normalized, id_number) "
+        "VALUES (new.id, new.full_name, new.phone_normalized, new.id_number); END",
+        "CREATE TRIGGER IF NOT EXISTS tenants_search_delete AFTER DELETE ON tenants BEGIN "
+        "INSERT INTO tenant_search (tenant_search, rowid, full_name, phone_normalized, id_number) "
+        "VALUES ('delete', old.id, old.full_name, old.phone_normalized, old.id_number); END",
+        "CREATE TRIGGER IF NOT EXISTS tenants_search_update "
+        "AFTER UPDATE OF full_name, phone_normalized, id_number ON tenants BEGIN "
+        "INSERT INTO tenant_search (tenant_search, rowid, full_name, phone_normalized, id_number) "
+        "VALUES ('delete', old.id, old.full_name, old.phone_normalized, old.id_number); "
+        "INSERT INTO tenant_search (rowid, full_name, phone_normalized, id_number) "
+        "VALUES (new.id, new.full_name, new.phone_normalized, new.id_number); END",
+        "CREATE INDEX IF NOT EXISTS ix_tenants_name_lower ON tenants (lower(full_name))",
+    ],
+}
+
+for _dialect, _statements in TENANT_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(Tenant.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+# The FTS table outlives a dropped tenants table; drop it too so it can't go stale
+event.listen(Tenant.__table__, "before_drop",
+             DDL("DROP TABLE IF EXISTS tenant_search").execute_if(dialect="sqlite"))
+
 
 class Payment(Base):
     __tablename__ = "payments"
@@ -77,12 +147,25 @@ class Payment(Base):
     reference_code = Column(String(100), nullable=True)          # M-Pesa code / bank ref
     notes = Column(Text, nullable=True)
     email_sent = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # SQLite stores timestamps as text; keep bound values in the same format as
+    # CURRENT_TIMESTAMP so keyset cursors on (created_at, id) compare correctly.
+    created_at = Column(
+        DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"),
+        server_default=func.now(),
+    )
 
     # Relationships
     tenant = relationship("Tenant", back_populates="payments")
     house = relationship("House", back_populates="payments")
 
+    # Schema changes go through Alembic (migrations/); keep these in step with it
+    __table_args__ = (
+        Index("ix_payments_month_tenant", "month_paid_for", "tenant_id"),
+        Index("ix_payments_house_month", "house_id", "month_paid_for"),
+        Index("ix_payments_created_id", "created_at", "id"),
+        Index("ix_payments_tenant_created_id", "tenant_id", "created_at", "id"),
+    )
+
 
 class Admin(Base):
     __tablename__ = "admins"
@@ -94,3 +177,136 @@ class Admin(Base):
     hashed_password = Column(String(255), nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RevenueRollup(Base):
+    """Running totals of payments per (month, house, method).
+
+    Maintained in the same transaction as every payment write so that
+    revenue reports read a handful of rollup rows instead of scanning payments.
+    """
+    __tablename__ = "revenue_rollups"
+
+    month = Column(String(7), primary_key=True)                  # format: "2025-02"
+    house_id = Column(Integer, ForeignKey("houses.id"), primary_key=True)
+    payment_method = Column(String(20), primary_key=True)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    payment_count = Column(Integer, nullable=False, default=0)
+
+
+class EmailOutbox(Base):
+    """Emails waiting to be delivered by the outbox worker (manage.py email-worker).
+
+    Rows are written in the same transaction as the payment/tenant they belong
+    to, so an email is queued if and only if that change committed.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(40), nullable=False)                    # payment_confirmation | payment_reminder | welcome
+    to_email = Column(String(200), nullable=False)
+    payload = Column(JSON, nullable=False)                       # template arguments
+    status = Column(String(20), nullable=False, default="pending")  # pending | sending | sent | dead
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    payment_id = Column(Integer, ForeignKey("payments.id", ondelete="SET NULL"), nullable=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="SET NULL"), nullable=True)
+    campaign_id = Column(Integer, ForeignKey("reminder_campaigns.id", ondelete="CASCADE"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next", "status", "next_attempt_at"),
+        # One reminder per tenant per campaign; also serves the progress query
+        Index("ux_email_outbox_campaign_tenant", "campaign_id", "tenant_id", unique=True),
+    )
+
+
+class ReminderCampaign(Base):
+    """A run of rent reminders for one month. Its emails are the outbox rows
+    carrying its id, so progress is read straight from their statuses."""
+    __tablename__ = "reminder_campaigns"
+
+    id = Column(Integer, primary_key=True)
+    month = Column(String(7), unique=True, nullable=False)       # format: "2025-02"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class TableVersion(Base):
+    """A counter per table, incremented after every committed ORM write to it.
+    ETags (utils/etag.py) are derived from these, so they agree across worker
+    processes and restarts.
+
+    The increment runs in a short transaction of its own right after the
+    write commits. Bumping inside the write's transaction would hold the
+    counter row's lock until commit and serialize every writer to the table
+    (payments, tenants, houses and the outbox worker's email_sent updates).
+    The cost: if the process dies between the two commits, or the bump fails,
+    ETags for that table stay stale until its next write."""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+VERSIONED_TABLES = ("houses", "tenants", "payments")
+
+# Seed one row per table; mirrors migration 0006
+event.listen(TableVersion.__table__, "after_create", DDL(
+    "INSERT INTO table_versions (table_name, version) VALUES "
+    + ", ".join(f"('{name}', 0)" for name in VERSIONED_TABLES)
+))
+
+
+def _bump_versions(connection, tables):
+    connection.execute(
+        TableVersion.__table__.update()
+        .where(TableVersion.table_name.in_(sorted(tables)))
+        .values(version=TableVersion.version + 1)
+    )
+
+
+# session.info key: versioned tables written in the current transaction
+_WRITTEN = "versioned_tables_written"
+
+
+@event.listens_for(Session, "after_flush")
+def _version_flushed_tables(session, flush_context):
+    changed = [*session.new, *session.deleted]
+    changed += [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    tables = {obj.__table__.name for obj in changed} & set(VERSIONED_TABLES)
+    if tables:
+        session.info.setdefault(_WRITTEN, set()).update(tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _version_bulk_writes(state):
+    # query.update() / delete() and ORM bulk inserts bypass the flush
+    if (state.is_update or state.is_delete or state.is_insert) and state.bind_mapper is not None:
+        table = state.bind_mapper.local_table.name
+        if table in VERSIONED_TABLES:
+            state.session.info.setdefault(_WRITTEN, set()).add(table)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    tables = session.info.pop(_WRITTEN, None)
+    if not tables:
+        return
+    try:
+        with session.get_bind().begin() as connection:
+            _bump_versions(connection, tables)
+    except DBAPIError as e:
+        # The write itself is committed; failing the request now would invite a retry
+        logger.warning("Could not bump table versions for %s: %s", sorted(tables), e)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_tables(session, previous_transaction):
+    # A rolled-back savepoint keeps the outer transaction's tables: bumping
+    # too often only costs a cache miss
+    if previous_transaction.parent is None:
+        session.info.pop(_WRITTEN, None)
@@ -0,0 +1,77 @@
+"""
+Async variants of the house, tenant and payment routers, used when
+DATABASE_URL names an async driver (see database.ASYNC_MODE).
+
+Each route keeps its path, parameters and response model. A handler that
+takes a `db` session becomes a coroutine that takes an AsyncSession and runs
+the existing sync handler via AsyncSession.run_sync: the route logic lives in
+one place, and database I/O is awaited on the event loop instead of holding a
+threadpool thread.
+The response is serialized inside run_sync too, so lazy loads and expired
+attributes are resolved while the greenlet can still do I/O.
+"""
+import inspect
+from fastapi import APIRouter, Depends
+from fastapi.params import Depends as DependsParam
+from fastapi.responses import Response
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db, get_async_read_db, get_read_db
+from utils.auth import get_current_admin, get_current_admin_async
+
+
+def _async_endpoint(endpoint, response_model):
+    signature = inspect.signature(endpoint)
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    parameters = []
+    for param in signature.parameters.values():
+        if param.name == "db":
+            read_only = isinstance(param.default, DependsParam) and param.default.dependency is get_read_db
+            param = param.replace(
+                annotation=AsyncSession, default=Depends(get_async_read_db if read_only else get_async_db)
+            )
+        elif isinstance(param.default, DependsParam) and param.default.dependency is get_current_admin:
+            param = param.replace(default=Depends(get_current_admin_async))
+        parameters.append(param)
+
+    def call(session, kwargs):
+        result = endpoint(db=session, **kwargs)
+        if adapter is None or isinstance(result, Response):
+            return result
+        return adapter.validate_python(result, from_attributes=True)
+
+    async def handler(db: AsyncSession, **kwargs):
+        return await db.run_sync(call, kwargs)
+
+    handler.__name__ = endpoint.__name__
+    handler.__doc__ = endpoint.__doc__
+    handler.__signature__ = signature.replace(parameters=parameters)
+    handler.__dict__.update(endpoint.__dict__)  # e.g. query_budget
+    return handler
+
+
+def async_variant(router: APIRouter) -> APIRouter:
+    """Build an APIRouter with the same routes whose handlers run on an AsyncSession."""
+    variant = APIRouter()
+    for route in router.routes:
+        assert isinstance(route, APIRoute), f"{route.path}: only API routes can be made async"
+        endpoint = route.endpoint
+        # Routes without a request session (e.g. the streaming export, which
+        # opens its own) are registered unchanged
+        if "db" in inspect.signature(endpoint).parameters:
+            endpoint = _async_endpoint(endpoint, route.response_model)
+        variant.add_api_route(
+            route.path,
+            endpoint,
+            methods=list(route.methods),
+            response_model=route.response_model,
+            status_code=route.status_code,
+            summary=route.summary,
+            description=route.description,
+            response_description=route.response_description,
+            response_class=route.response_class,
+            name=route.name,
+        )
+    return variant
@@ -2,7 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from database import get_db
-from utils.auth import hash_password, verify_password, create_access_token, get_current_admin
+from utils.auth import hash_password, verify_password, create_access_token, get_current_admin, AdminIdentity
+from utils.query_budget import query_budget
 import models
 import schemas
 
@@ -10,6 +11,7 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=schemas.Token, summary="Register first admin")
+@query_budget(4)
 def register_admin(data: schemas.AdminCreate, db: Session = Depends(get_db)):
     """Register admin. Only works if no admin exists yet (first-time setup)."""
     existing = db.query(models.Admin).first()
@@ -40,6 +42,7 @@ def register_admin(data: schemas.AdminCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=schemas.Token, summary="Login admin")
+@query_budget(1)
 def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     admin = db.query(models.Admin).filter(models.Admin.username == form.username).first()
     if not admin or not verify_password(form.password, admin.hashed_password):
@@ -60,7 +63,8 @@ def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get
 
 
 @router.get("/me", summary="Get current admin info")
-def get_me(current_admin: models.Admin = Depends(get_current_admin)):
+@query_budget(1)
+def get_me(current_admin: AdminIdentity = Depends(get_current_admin)):
     return {
         "id": current_admin.id,
         "username": current_admin.username,
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List
-from database import get_db
-from utils.auth import get_current_admin
+from database import get_db, get_read_db, is_replica
+from utils.auth import AdminIdentity, get_current_admin
+from utils.response_cache import response_cache
+from utils.etag import conditional_get, table_versions
+from utils.query_budget import query_budget
 import models
 import schemas
 
@@ -10,48 +14,79 @@ router = APIRouter()
 
 
 @router.get("/", response_model=List[schemas.HouseOut], summary="List all houses")
+@query_budget(3)
 def list_houses(
+    request: Request,
+    response: Response,
     include_inactive: bool = False,
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
+    not_modified = conditional_get(request, response, table_versions(db, ("houses",)))
+    if not_modified:
+        return not_modified
     query = db.query(models.House)
     if not include_inactive:
         query = query.filter(models.House.is_active == True)
     return query.order_by(models.House.name).all()
 
 
+def _houses_with_tenants(db: Session) -> list:
+    # One row per active house, joined to its current tenant (lowest id among
+    # the active tenants, should there ever be more than one) — moved-out
+    # tenants are never loaded.
+    current = (
+        db.query(models.Tenant.house_id, func.min(models.Tenant.id).label("tenant_id"))
+        .filter(models.Tenant.is_active == True, models.Tenant.house_id.isnot(None))
+        .group_by(models.Tenant.house_id)
+        .subquery()
+    )
+    rows = (
+        db.query(
+            models.House.id,
+            models.House.name,
+            models.House.house_type,
+            models.House.rent_amount,
+            models.House.floor,
+            models.House.is_occupied,
+            models.House.is_active,
+            models.House.created_at,
+            models.Tenant.full_name.label("current_tenant"),
+            models.Tenant.id.label("tenant_id"),
+        )
+        .outerjoin(current, current.c.house_id == models.House.id)
+        .outerjoin(models.Tenant, models.Tenant.id == current.c.tenant_id)
+        .filter(models.House.is_active == True)
+        .order_by(models.House.name)
+        .all()
+    )
+    return [row._asdict() for row in rows]
+
+
 @router.get("/with-tenants", summary="List houses with current tenant info")
+@query_budget(3)
 def list_houses_with_tenants(
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
-    houses = db.query(models.House).filter(models.House.is_active == True).order_by(models.House.name).all()
-    result = []
-    for h in houses:
-        active_tenant = next(
-            (t for t in h.tenants if t.is_active), None
-        )
-        result.append({
-            "id": h.id,
-            "name": h.name,
-            "house_type": h.house_type,
-            "rent_amount": h.rent_amount,
-            "floor": h.floor,
-            "is_occupied": h.is_occupied,
-            "is_active": h.is_active,
-            "created_at": h.created_at,
-            "current_tenant": active_tenant.full_name if active_tenant else None,
-            "tenant_id": active_tenant.id if active_tenant else None,
-        })
-    return result
+    versions = table_versions(db, ("houses", "tenants"))
+    not_modified = conditional_get(request, response, versions)
+    if not_modified:
+        return not_modified
+    return response_cache.get_or_compute(
+        "houses.with_tenants", {}, ("houses", "tenants"), lambda: _houses_with_tenants(db),
+        store=not is_replica(db), versions=versions,
+    )
 
 
 @router.get("/{house_id}", response_model=schemas.HouseOut, summary="Get a single house")
+@query_budget(2)
 def get_house(
     house_id: int,
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     house = db.query(models.House).filter(models.House.id == house_id).first()
     if not house:
@@ -60,10 +95,11 @@ def get_house(
 
 
 @router.post("/", response_model=schemas.HouseOut, status_code=201, summary="Create a house")
+@query_budget(5)
 def create_house(
     data: schemas.HouseCreate,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     if db.query(models.House).filter(models.House.name == data.name).first():
         raise HTTPException(status_code=400, detail=f"House '{data.name}' already exists")
@@ -72,15 +108,17 @@ def create_house(
     db.add(house)
     db.commit()
     db.refresh(house)
+    response_cache.bump("houses")
     return house
 
 
 @router.put("/{house_id}", response_model=schemas.HouseOut, summary="Update a house")
+@query_budget(5)
 def update_house(
     house_id: int,
     data: schemas.HouseUpdate,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     house = db.query(models.House).filter(models.House.id == house_id).first()
     if not house:
@@ -90,14 +128,16 @@ def update_house(
         setattr(house, field, value)
     db.commit()
     db.refresh(house)
+    response_cache.bump("houses")
     return house
 
 
 @router.delete("/{house_id}", summary="Delete a house")
+@query_budget(6)
 def delete_house(
     house_id: int,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     house = db.query(models.House).filter(models.House.id == house_id).first()
     if not house:
@@ -106,4 +146,5 @@ def delete_house(
         raise HTTPException(status_code=400, detail="Cannot delete an occupied house. Remove the tenant first.")
     db.delete(house)
     db.commit()
+    response_cache.bump("houses")
     return {"message": f"House '{house.name}' deleted successfully"}
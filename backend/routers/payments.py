@@ -1,67 +1,111 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, case
+from typing import List, Optional
 from datetime import date, datetime
-from database import get_db
-from utils.auth import get_current_admin
-from services.email_service import send_payment_confirmation, send_payment_reminder
+from database import get_db, get_read_db, is_replica
+from utils.auth import AdminIdentity, get_current_admin
+from utils.response_cache import response_cache
+from utils.etag import conditional_get, table_versions
+from utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.query_budget import query_budget
+from services import revenue_rollup, payment_export, statement_import, email_outbox, reminder_campaigns, arrears
 import models
 import schemas
 
 router = APIRouter()
 
+# PaymentOut nests the tenant and house; load both in the same SELECT so that
+# serializing a list costs one query rather than two lazy loads per row.
+_PAYMENT_OUT_LOADS = (joinedload(models.Payment.tenant), joinedload(models.Payment.house))
 
-@router.get("/dashboard", response_model=schemas.DashboardStats, summary="Get dashboard statistics")
-def get_dashboard(
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
-):
+
+def _last_n_months(today: date, n: int) -> List[str]:
+    """Return the last n months (oldest first) as "YYYY-MM" strings, ending at today's month."""
+    months = []
+    for i in range(n - 1, -1, -1):
+        month_num = today.month - i
+        year = today.year
+        while month_num <= 0:
+            month_num += 12
+            year -= 1
+        months.append(f"{year}-{month_num:02d}")
+    return months
+
+
+def _dashboard_stats(db: Session) -> schemas.DashboardStats:
     today = date.today()
     current_month = today.strftime("%Y-%m")
+    window = _last_n_months(today, 7)
 
-    # Unit stats
-    total_units = db.query(models.House).filter(models.House.is_active == True).count()
-    occupied = db.query(models.House).filter(models.House.is_active == True, models.House.is_occupied == True).count()
+    # Unit stats — one aggregate over active houses
+    total_units, occupied = db.query(
+        func.count(models.House.id),
+        func.count(case((models.House.is_occupied == True, 1))),
+    ).filter(models.House.is_active == True).one()
     vacant = total_units - occupied
 
-    # Rent stats
-    occupied_houses = db.query(models.House).filter(models.House.is_active == True, models.House.is_occupied == True).all()
+    # Occupied houses with this month's takings — one GROUP BY house_id on the rollup
+    house_totals = (
+        db.query(
+            models.RevenueRollup.house_id.label("house_id"),
+            func.sum(models.RevenueRollup.total_amount).label("received"),
+        )
+        .filter(models.RevenueRollup.month == current_month)
+        .group_by(models.RevenueRollup.house_id)
+        .subquery()
+    )
+    occupied_houses = (
+        db.query(models.House.name, models.House.rent_amount, house_totals.c.received)
+        .outerjoin(house_totals, house_totals.c.house_id == models.House.id)
+        .filter(models.House.is_active == True, models.House.is_occupied == True)
+        .order_by(models.House.id)
+        .all()
+    )
     expected_rent = sum(h.rent_amount for h in occupied_houses)
 
-    received = db.query(func.sum(models.Payment.amount_paid)).filter(
-        models.Payment.month_paid_for == current_month
-    ).scalar() or 0.0
+    # Monthly revenue — last 7 months, one GROUP BY month on the rollup
+    revenue_by_month = dict(
+        db.query(models.RevenueRollup.month, func.sum(models.RevenueRollup.total_amount))
+        .filter(models.RevenueRollup.month.in_(window))
+        .group_by(models.RevenueRollup.month)
+        .all()
+    )
+    monthly_revenue = [
+        schemas.MonthlyRevenue(
+            month=datetime.strptime(month_str, "%Y-%m").strftime("%b"),
+            amount=revenue_by_month.get(month_str) or 0.0,
+        )
+        for month_str in window
+    ]
 
+    received = revenue_by_month.get(current_month) or 0.0
     outstanding = expected_rent - received
 
-    # Overdue tenants: active tenants who haven't paid this month
-    active_tenants = db.query(models.Tenant).filter(models.Tenant.is_active == True, models.Tenant.house_id.isnot(None)).all()
-    paid_tenant_ids_this_month = {
-        p.tenant_id for p in db.query(models.Payment).filter(models.Payment.month_paid_for == current_month).all()
-    }
-    overdue_count = sum(1 for t in active_tenants if t.id not in paid_tenant_ids_this_month)
-
-    # Monthly revenue — last 7 months
-    monthly_revenue = []
-    for i in range(6, -1, -1):
-        month_date = date(today.year, today.month, 1)
-        # Go back i months
-        month_num = today.month - i
-        year = today.year
-        while month_num <= 0:
-            month_num += 12
-            year -= 1
-        month_str = f"{year}-{month_num:02d}"
-        month_label = datetime.strptime(month_str, "%Y-%m").strftime("%b")
-        total = db.query(func.sum(models.Payment.amount_paid)).filter(
-            models.Payment.month_paid_for == month_str
-        ).scalar() or 0.0
-        monthly_revenue.append(schemas.MonthlyRevenue(month=month_label, amount=total))
+    # Overdue tenants: active tenants with no payment this month (anti-join)
+    paid_this_month = (
+        db.query(models.Payment.id)
+        .filter(
+            models.Payment.tenant_id == models.Tenant.id,
+            models.Payment.month_paid_for == current_month,
+        )
+        .exists()
+    )
+    overdue_count = (
+        db.query(func.count(models.Tenant.id))
+        .filter(
+            models.Tenant.is_active == True,
+            models.Tenant.house_id.isnot(None),
+            ~paid_this_month,
+        )
+        .scalar()
+    )
 
     # Recent payments (last 6)
     recent_raw = (
         db.query(models.Payment)
+        .options(*_PAYMENT_OUT_LOADS)
         .order_by(models.Payment.created_at.desc())
         .limit(6)
         .all()
@@ -79,13 +123,10 @@ def get_dashboard(
     ]
 
     # Top houses by revenue this month
-    top_houses = []
-    for h in occupied_houses:
-        house_total = db.query(func.sum(models.Payment.amount_paid)).filter(
-            models.Payment.house_id == h.id,
-            models.Payment.month_paid_for == current_month,
-        ).scalar() or 0.0
-        top_houses.append({"name": h.name, "expected": h.rent_amount, "received": house_total})
+    top_houses = [
+        {"name": h.name, "expected": h.rent_amount, "received": h.received or 0.0}
+        for h in occupied_houses
+    ]
     top_houses.sort(key=lambda x: x["received"], reverse=True)
 
     return schemas.DashboardStats(
@@ -103,42 +144,115 @@ def get_dashboard(
     )
 
 
-@router.get("/", response_model=List[schemas.PaymentOut], summary="List all payments")
+@router.get("/dashboard", response_model=schemas.DashboardStats, summary="Get dashboard statistics")
+@query_budget(7)
+def get_dashboard(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
+):
+    today = date.today().isoformat()  # the current month and overdue count move with the date
+    versions = table_versions(db, ("houses", "tenants", "payments"))
+    not_modified = conditional_get(request, response, versions, today)
+    if not_modified:
+        return not_modified
+    return response_cache.get_or_compute(
+        "payments.dashboard", {"today": today}, ("houses", "tenants", "payments"),
+        lambda: _dashboard_stats(db), store=not is_replica(db), versions=versions,
+    )
+
+
+@router.get("/", response_model=schemas.PaymentPage, summary="List payments (newest first, paginated)")
+@query_budget(3)
 def list_payments(
+    request: Request,
+    response: Response,
     month: str = None,
     tenant_id: int = None,
     house_id: int = None,
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
-    query = db.query(models.Payment)
+    """Pass the returned `next_cursor` back as `cursor` to fetch the following page."""
+    not_modified = conditional_get(request, response, table_versions(db, ("payments", "tenants", "houses")))
+    if not_modified:
+        return not_modified
+    query = db.query(models.Payment).options(*_PAYMENT_OUT_LOADS)
     if month:
         query = query.filter(models.Payment.month_paid_for == month)
     if tenant_id:
         query = query.filter(models.Payment.tenant_id == tenant_id)
     if house_id:
         query = query.filter(models.Payment.house_id == house_id)
-    return query.order_by(models.Payment.created_at.desc()).all()
+    items, next_cursor = paginate(query, models.Payment.created_at, models.Payment.id, cursor, limit)
+    return schemas.PaymentPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/export", summary="Stream the payment ledger as CSV or NDJSON")
+@query_budget(2)
+def export_payments(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    _: AdminIdentity = Depends(get_current_admin),
+):
+    """Export payments whose payment_date falls within [from, to], oldest first."""
+    filename = f"payments_{date_from or 'start'}_{date_to or 'end'}.{format}"
+    return StreamingResponse(
+        payment_export.iter_export(format, date_from, date_to),
+        media_type=payment_export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/arrears", response_model=schemas.ArrearsReport, summary="Outstanding rent per tenant and month")
+@query_budget(5)
+def get_arrears(
+    as_of: Optional[date] = Query(None, description="Balance date (default today)"),
+    limit: int = Query(100, ge=1, le=100000, description="Tenants listed, largest balance first"),
+    include_settled: bool = Query(False, description="Also list tenants who owe nothing"),
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
+):
+    """Rent expected since each active tenant moved in, against every payment
+    recorded by `as_of`; totals cover all tenants, `items` the top balances."""
+    as_of = as_of or date.today()
+    return response_cache.get_or_compute(
+        "payments.arrears",
+        {"as_of": as_of.isoformat(), "limit": limit, "include_settled": include_settled},
+        ("houses", "tenants", "payments"),
+        lambda: arrears.report(db, as_of, limit, include_settled),
+        store=not is_replica(db),
+    )
 
 
 @router.get("/{payment_id}", response_model=schemas.PaymentOut, summary="Get a single payment")
+@query_budget(2)
 def get_payment(
     payment_id: int,
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
-    payment = db.query(models.Payment).filter(models.Payment.id == payment_id).first()
+    payment = (
+        db.query(models.Payment)
+        .options(*_PAYMENT_OUT_LOADS)
+        .filter(models.Payment.id == payment_id)
+        .first()
+    )
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
     return payment
 
 
 @router.post("/", response_model=schemas.PaymentOut, status_code=201, summary="Record a payment")
+@query_budget(10)
 def record_payment(
     data: schemas.PaymentCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     # Validate tenant
     tenant = db.query(models.Tenant).filter(models.Tenant.id == data.tenant_id).first()
@@ -162,97 +276,121 @@ def record_payment(
         email_sent=False,
     )
     db.add(payment)
+    revenue_rollup.add_payment(db, payment)
+
+    # Queue the receipt in the same transaction; the outbox worker delivers it
+    # and sets email_sent once it has actually gone out.
+    if data.send_email and tenant.email:
+        db.flush()
+        email_outbox.enqueue_payment_confirmation(db, payment, tenant.full_name, tenant.email, house.name)
+
     db.commit()
     db.refresh(payment)
+    response_cache.bump("payments")
+    return payment
 
-    # Send confirmation email in background
-    if data.send_email and tenant.email:
-        background_tasks.add_task(
-            send_payment_confirmation,
-            tenant_email=tenant.email,
-            tenant_name=tenant.full_name,
-            amount=data.amount_paid,
-            month_paid_for=data.month_paid_for,
-            house_name=house.name,
-            payment_method=data.payment_method,
-            reference_code=data.reference_code,
-            payment_date=data.payment_date,
+
+@router.post("/import", response_model=schemas.StatementImportReport, summary="Import payments from a statement CSV")
+@query_budget(9)
+def import_payments(
+    file: UploadFile = File(..., description="M-Pesa or bank statement exported as CSV"),
+    payment_method: str = Form("mpesa"),
+    month_paid_for: Optional[str] = Form(None, description="Override month for every row (YYYY-MM)"),
+    send_email: bool = Form(True),
+    dry_run: bool = Form(False, description="Match and validate only; nothing is written"),
+    db: Session = Depends(get_db),
+    _: AdminIdentity = Depends(get_current_admin),
+):
+    """Match statement rows to tenants by account reference (ID number or unit name)
+    or phone, skip reference codes already recorded, and insert the rest in batches."""
+    try:
+        report = statement_import.import_statement(
+            db,
+            file.file.read(),
+            payment_method=payment_method,
+            month_paid_for=month_paid_for,
+            send_email=send_email,
+            dry_run=dry_run,
         )
-        payment.email_sent = True
-        db.commit()
+    except statement_import.StatementError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return payment
+    if report["counts"].get("imported"):
+        response_cache.bump("payments")
+    return report
 
 
 @router.put("/{payment_id}", response_model=schemas.PaymentOut, summary="Update a payment")
+@query_budget(9)
 def update_payment(
     payment_id: int,
     data: schemas.PaymentUpdate,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     payment = db.query(models.Payment).filter(models.Payment.id == payment_id).first()
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
+    revenue_rollup.remove_payment(
+        db, payment.month_paid_for, payment.house_id, payment.payment_method, payment.amount_paid
+    )
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(payment, field, value)
+    revenue_rollup.add_payment(db, payment)
     db.commit()
     db.refresh(payment)
+    response_cache.bump("payments")
     return payment
 
 
 @router.delete("/{payment_id}", summary="Delete a payment")
+@query_budget(5)
 def delete_payment(
     payment_id: int,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     payment = db.query(models.Payment).filter(models.Payment.id == payment_id).first()
     if not payment:
         raise HTTPException(status_code=404, detail="Payment not found")
+    revenue_rollup.remove_payment(
+        db, payment.month_paid_for, payment.house_id, payment.payment_method, payment.amount_paid
+    )
     db.delete(payment)
     db.commit()
+    response_cache.bump("payments")
     return {"message": "Payment deleted"}
 
 
-@router.post("/send-reminders", summary="Send payment reminders to all unpaid tenants")
+@router.post("/send-reminders", response_model=schemas.ReminderCampaignRun,
+             summary="Queue payment reminders to all unpaid tenants")
+@query_budget(12)
 def send_reminders(
-    month: str,
-    background_tasks: BackgroundTasks,
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
-    """Send email reminders to all tenants who haven't paid for the given month."""
-    paid_tenant_ids = {
-        p.tenant_id for p in db.query(models.Payment).filter(models.Payment.month_paid_for == month).all()
+    """Run the reminder campaign for a month. Safe to repeat: tenants already
+    reminded are skipped and only failed sends are retried."""
+    result = reminder_campaigns.run(db, month)
+    report = reminder_campaigns.progress(db, result["campaign"])
+    return {
+        **report,
+        "message": f"Reminders queued for {result['queued']} tenants",
+        "queued": result["queued"],
+        "requeued": result["requeued"],
     }
 
-    active_tenants = (
-        db.query(models.Tenant)
-        .filter(models.Tenant.is_active == True, models.Tenant.house_id.isnot(None))
-        .all()
-    )
-
-    sent_count = 0
-    skipped_count = 0
-
-    for tenant in active_tenants:
-        if tenant.id not in paid_tenant_ids and tenant.email and tenant.house:
-            background_tasks.add_task(
-                send_payment_reminder,
-                tenant_email=tenant.email,
-                tenant_name=tenant.full_name,
-                amount=tenant.house.rent_amount,
-                month=month,
-                house_name=tenant.house.name,
-            )
-            sent_count += 1
-        else:
-            skipped_count += 1
 
-    return {
-        "message": f"Reminders queued for {sent_count} tenants",
-        "sent": sent_count,
-        "skipped": skipped_count,
-        "month": month,
-    }
+@router.get("/send-reminders/{campaign_id}", response_model=schemas.ReminderCampaignOut,
+            summary="Delivery progress of a reminder campaign")
+@query_budget(3)
+def get_reminder_campaign(
+    campaign_id: int,
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
+):
+    campaign = db.query(models.ReminderCampaign).filter(models.ReminderCampaign.id == campaign_id).first()
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Reminder campaign not found")
+    return reminder_campaigns.progress(db, campaign)
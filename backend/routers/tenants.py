@@ -1,45 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
-from typing import List
-from database import get_db
-from utils.auth import get_current_admin
-from services.email_service import send_welcome_email
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func
+from typing import List, Optional
+from database import get_db, get_read_db, is_replica
+from utils.auth import AdminIdentity, get_current_admin
+from utils.response_cache import response_cache
+from utils.etag import conditional_get, table_versions
+from utils.pagination import paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.query_budget import query_budget
+from services import email_outbox, tenant_search
 import models
 import schemas
 
 router = APIRouter()
 
 
+def _list_tenants(db: Session, active_only: bool) -> List[schemas.TenantOut]:
+    # TenantOut nests the house; join it in rather than lazy-loading per tenant
+    query = db.query(models.Tenant).options(joinedload(models.Tenant.house))
+    if active_only:
+        query = query.filter(models.Tenant.is_active == True)
+    return [schemas.TenantOut.model_validate(t) for t in query.order_by(models.Tenant.full_name).all()]
+
+
 @router.get("/", response_model=List[schemas.TenantOut], summary="List all tenants")
+@query_budget(3)
 def list_tenants(
+    request: Request,
+    response: Response,
     active_only: bool = True,
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
-    query = db.query(models.Tenant)
-    if active_only:
-        query = query.filter(models.Tenant.is_active == True)
-    return query.order_by(models.Tenant.full_name).all()
+    versions = table_versions(db, ("tenants", "houses"))
+    not_modified = conditional_get(request, response, versions)
+    if not_modified:
+        return not_modified
+    return response_cache.get_or_compute(
+        "tenants.list", {"active_only": active_only}, ("tenants", "houses"),
+        lambda: _list_tenants(db, active_only), store=not is_replica(db), versions=versions,
+    )
+
+
+@router.get("/search", response_model=List[schemas.TenantOut], summary="Search tenants by name, phone or ID number")
+@query_budget(2)
+def search_tenants(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(tenant_search.DEFAULT_RESULTS, ge=1, le=tenant_search.MAX_RESULTS),
+    active_only: bool = True,
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
+):
+    return tenant_search.search(db, q, limit, active_only)
 
 
 @router.get("/{tenant_id}", response_model=schemas.TenantOut, summary="Get tenant details (private)")
+@query_budget(2)
 def get_tenant(
     tenant_id: int,
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
-    tenant = db.query(models.Tenant).filter(models.Tenant.id == tenant_id).first()
+    tenant = (
+        db.query(models.Tenant)
+        .options(joinedload(models.Tenant.house))
+        .filter(models.Tenant.id == tenant_id)
+        .first()
+    )
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     return tenant
 
 
 @router.post("/", response_model=schemas.TenantOut, status_code=201, summary="Add a tenant")
+@query_budget(8)
 def create_tenant(
     data: schemas.TenantCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     # Check ID number uniqueness
     if data.id_number:
@@ -62,29 +100,33 @@ def create_tenant(
     if house:
         house.is_occupied = True
 
-    db.commit()
-    db.refresh(tenant)
-
-    # Send welcome email in background
+    # Queue the welcome email with the tenant, in the same transaction
     if tenant.email and house:
-        background_tasks.add_task(
-            send_welcome_email,
-            tenant_email=tenant.email,
-            tenant_name=tenant.full_name,
-            house_name=house.name,
-            rent_amount=house.rent_amount,
-            move_in_date=tenant.move_in_date,
+        db.flush()
+        email_outbox.enqueue(
+            db, "welcome", tenant.email,
+            dict(
+                tenant_name=tenant.full_name,
+                house_name=house.name,
+                rent_amount=house.rent_amount,
+                move_in_date=tenant.move_in_date,
+            ),
+            tenant_id=tenant.id,
         )
 
+    db.commit()
+    db.refresh(tenant)
+    response_cache.bump("tenants", "houses")
     return tenant
 
 
 @router.put("/{tenant_id}", response_model=schemas.TenantOut, summary="Update tenant info")
+@query_budget(9)
 def update_tenant(
     tenant_id: int,
     data: schemas.TenantUpdate,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     tenant = db.query(models.Tenant).filter(models.Tenant.id == tenant_id).first()
     if not tenant:
@@ -110,14 +152,16 @@ def update_tenant(
 
     db.commit()
     db.refresh(tenant)
+    response_cache.bump("tenants", "houses")
     return tenant
 
 
 @router.delete("/{tenant_id}", summary="Remove (deactivate) a tenant")
+@query_budget(7)
 def remove_tenant(
     tenant_id: int,
     db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
     tenant = db.query(models.Tenant).filter(models.Tenant.id == tenant_id).first()
     if not tenant:
@@ -132,24 +176,65 @@ def remove_tenant(
             house.is_occupied = False
 
     db.commit()
+    response_cache.bump("tenants", "houses")
     return {"message": f"Tenant '{tenant.full_name}' removed successfully"}
 
 
-@router.get("/{tenant_id}/payments", summary="Get all payments for a tenant")
+def _payment_summary(db: Session, tenant_id: int) -> dict:
+    # One GROUP BY over the tenant's payments; years and the grand total are
+    # rolled up from the (at most a dozen a year) month rows
+    rows = (
+        db.query(
+            models.Payment.month_paid_for,
+            func.sum(models.Payment.amount_paid),
+            func.count(models.Payment.id),
+        )
+        .filter(models.Payment.tenant_id == tenant_id)
+        .group_by(models.Payment.month_paid_for)
+        .order_by(models.Payment.month_paid_for.desc())
+        .all()
+    )
+    by_month = [{"period": month, "total_paid": total or 0.0, "payment_count": count} for month, total, count in rows]
+    by_year = {}
+    for m in by_month:
+        year = by_year.setdefault(m["period"][:4], {"period": m["period"][:4], "total_paid": 0.0, "payment_count": 0})
+        year["total_paid"] += m["total_paid"]
+        year["payment_count"] += m["payment_count"]
+    return {
+        "total_paid": sum(m["total_paid"] for m in by_month),
+        "payment_count": sum(m["payment_count"] for m in by_month),
+        "by_year": list(by_year.values()),
+        "by_month": by_month,
+    }
+
+
+@router.get("/{tenant_id}/payments", response_model=schemas.TenantPaymentHistory,
+            summary="Payment history for a tenant: totals per year and month, plus a page of payments")
+@query_budget(4)
 def get_tenant_payments(
     tenant_id: int,
-    db: Session = Depends(get_db),
-    _: models.Admin = Depends(get_current_admin),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    summary_only: bool = False,
+    db: Session = Depends(get_read_db),
+    _: AdminIdentity = Depends(get_current_admin),
 ):
-    tenant = db.query(models.Tenant).filter(models.Tenant.id == tenant_id).first()
+    tenant = (
+        db.query(models.Tenant)
+        .options(joinedload(models.Tenant.house))
+        .filter(models.Tenant.id == tenant_id)
+        .first()
+    )
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    payments = db.query(models.Payment).filter(models.Payment.tenant_id == tenant_id).order_by(models.Payment.created_at.desc()).all()
-    total_paid = sum(p.amount_paid for p in payments)
-    return {
+    history = {
         "tenant": tenant.full_name,
         "house": tenant.house.name if tenant.house else None,
-        "total_paid": total_paid,
-        "payment_count": len(payments),
-        "payments": payments,
+        **_payment_summary(db, tenant_id),
     }
+    if not summary_only:
+        query = db.query(models.Payment).filter(models.Payment.tenant_id == tenant_id)
+        history["payments"], history["next_cursor"] = paginate(
+            query, models.Payment.created_at, models.Payment.id, cursor, limit
+        )
+    return history
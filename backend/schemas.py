@@ -151,7 +151,8 @@ class PaymentUpdate(BaseModel):
     notes: Optional[str] = None
 
 
-class PaymentOut(BaseModel):
+class PaymentRecord(BaseModel):
+    """A payment row without its tenant and house."""
     id: int
     tenant_id: int
     house_id: int
@@ -163,13 +164,109 @@ class PaymentOut(BaseModel):
     notes: Optional[str]
     email_sent: bool
     created_at: datetime
-    tenant: Optional[TenantPublic] = None
-    house: Optional[HouseOut] = None
 
     class Config:
         from_attributes = True
 
 
+class PaymentOut(PaymentRecord):
+    tenant: Optional[TenantPublic] = None
+    house: Optional[HouseOut] = None
+
+
+class PaymentPage(BaseModel):
+    items: List[PaymentOut]
+    next_cursor: Optional[str] = None
+
+
+class PaymentPeriodSummary(BaseModel):
+    period: str                       # "2025" or "2025-02" (month paid for)
+    total_paid: float
+    payment_count: int
+
+
+class TenantPaymentHistory(BaseModel):
+    tenant: str
+    house: Optional[str] = None
+    total_paid: float
+    payment_count: int
+    by_year: List[PaymentPeriodSummary]   # newest first
+    by_month: List[PaymentPeriodSummary]  # newest first
+    payments: Optional[List[PaymentRecord]] = None  # omitted with summary_only
+    next_cursor: Optional[str] = None
+
+
+class StatementImportRow(BaseModel):
+    row: int
+    status: str                       # imported | matched | duplicate | unmatched | skipped | invalid
+    reference_code: Optional[str] = None
+    amount: Optional[float] = None
+    matched_by: Optional[str] = None  # account | phone
+    tenant_id: Optional[int] = None
+    tenant_name: Optional[str] = None
+    house_name: Optional[str] = None
+    month_paid_for: Optional[str] = None
+    payment_id: Optional[int] = None
+    message: Optional[str] = None
+
+
+class StatementImportReport(BaseModel):
+    dry_run: bool
+    total_rows: int
+    counts: dict
+    emails_queued: int
+    rows: List[StatementImportRow]
+
+
+class ReminderCampaignOut(BaseModel):
+    id: int
+    month: str
+    created_at: Optional[datetime] = None
+    last_run_at: Optional[datetime] = None
+    total: int
+    sent: int
+    failed: int
+    pending: int
+    retrying: int                     # pending after at least one failed attempt
+
+
+class ReminderCampaignRun(ReminderCampaignOut):
+    message: str
+    queued: int                       # new recipients added by this run
+    requeued: int                     # failed sends retried by this run
+
+
+class ArrearsMonth(BaseModel):
+    month: str
+    due: float
+    paid: float                       # recorded for the month plus credit applied
+    outstanding: float
+
+
+class TenantArrears(BaseModel):
+    tenant_id: int
+    tenant_name: str
+    house_name: str
+    rent_amount: float
+    months_billed: int
+    expected: float
+    paid: float
+    balance: float
+    months_in_arrears: int
+    oldest_unpaid_month: Optional[str] = None
+    months: List[ArrearsMonth]
+
+
+class ArrearsReport(BaseModel):
+    as_of: date
+    tenants: int
+    tenants_in_arrears: int
+    expected: float
+    paid: float
+    outstanding: float
+    items: List[TenantArrears]
+
+
 # ─── Dashboard Schemas ────────────────────────────────────────────────
 
 class MonthlyRevenue(BaseModel):
@@ -1,13 +1,12 @@
 """
-Run this ONCE after setting up the database to seed initial data.
-Usage: python seed.py
+Run this ONCE after migrating the database to seed initial data.
+Usage: python manage.py migrate && python seed.py
 """
-from database import SessionLocal, engine, Base
+import sys
+from database import SessionLocal, SchemaOutOfDate, check_schema_revision
 import models
 from utils.auth import hash_password
 
-Base.metadata.create_all(bind=engine)
-
 db = SessionLocal()
 
 def seed():
@@ -56,5 +55,10 @@ def seed():
     print("   Run: uvicorn main:app --reload")
 
 if __name__ == "__main__":
+    try:
+        check_schema_revision(models.SCHEMA_REVISION)
+    except SchemaOutOfDate as e:
+        print(f"❌ {e}")
+        sys.exit(1)
     seed()
     db.close()
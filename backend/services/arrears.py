@@ -0,0 +1,214 @@
+"""
+Arrears engine: what every active tenant owes, month by month, as of a date.
+
+Rent is billed in full for each month from the move-in month (or the month
+the tenant was added, when no move-in date was recorded) to the as-of month,
+or the move-out month if earlier, at the house's current rent. Payments
+recorded by the as-of date count against the balance, except those for a
+month after it (paid in advance). Within the breakdown a payment settles the
+month it was recorded for (month_paid_for); anything paid beyond a month's
+rent, or for a month before the tenancy started, is credit that settles the
+oldest unpaid months first. Payments for months after the move-out month are
+left out of both the totals and the breakdown.
+
+Balances come from one pass: active tenants and per-tenant payment totals
+are read as two streams ordered by tenant id and merged, so the database
+sees two queries however many tenants there are. Names and the
+month-by-month breakdown are then loaded only for the tenants being
+returned.
+"""
+import heapq
+from datetime import date
+from typing import Iterator, Optional
+from sqlalchemy import Integer, cast, extract, func, or_, select
+from sqlalchemy.orm import Session
+import models
+
+CHUNK_ROWS = 10000
+_IN_CHUNK = 900  # stay under SQLite's bound-parameter limit
+_TOLERANCE = 0.005
+
+
+def _month_index(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+
+def _month_label(index: int) -> str:
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+def _month_index_sql(column):
+    return extract("year", column) * 12 + extract("month", column) - 1
+
+
+def _month_string_index_sql(column):
+    # For "YYYY-MM" columns such as month_paid_for
+    return cast(func.substr(column, 1, 4), Integer) * 12 + cast(func.substr(column, 6, 2), Integer) - 1
+
+
+def _counted_payments(as_of: date):
+    """Payments that count towards a balance: recorded by as_of, for a month no
+    later than the as-of month or the tenant's move-out month."""
+    P, T = models.Payment, models.Tenant
+    return (
+        P.payment_date <= as_of,
+        P.month_paid_for <= as_of.strftime("%Y-%m"),
+        or_(T.move_out_date.is_(None),
+            _month_string_index_sql(P.month_paid_for) <= _month_index_sql(T.move_out_date)),
+    )
+
+
+def _tenants():
+    # Month indexes come from SQL so no dates are parsed per row
+    T, H = models.Tenant, models.House
+    return (
+        select(
+            T.id,
+            _month_index_sql(func.coalesce(T.move_in_date, T.created_at)),
+            _month_index_sql(T.move_out_date),
+            H.rent_amount,
+        )
+        .join(H, H.id == T.house_id)
+        .where(T.is_active == True)
+        .order_by(T.id)
+    )
+
+
+def _paid_by_tenant(as_of: date):
+    P, T = models.Payment, models.Tenant
+    return (
+        select(P.tenant_id, func.sum(P.amount_paid))
+        .join(T, T.id == P.tenant_id)
+        .where(*_counted_payments(as_of))
+        .group_by(P.tenant_id)
+        .order_by(P.tenant_id)
+    )
+
+
+def _stream(db: Session, stmt):
+    result = db.connection().execute(stmt.execution_options(stream_results=True, yield_per=CHUNK_ROWS))
+    for partition in result.partitions():
+        yield from partition
+
+
+def _balances(db: Session, as_of: date) -> Iterator[tuple]:
+    """Yield (tenant_id, rent, first_month, last_month, expected, paid, balance)
+    for every active tenant with a house, in tenant id order."""
+    as_of_index = _month_index(as_of.year, as_of.month)
+    paid_rows = _stream(db, _paid_by_tenant(as_of))
+    pending = next(paid_rows, None)
+    for tenant_id, first, move_out, rent in _stream(db, _tenants()):
+        # Both streams are ordered by tenant id; totals for tenants missing
+        # from the tenant stream (moved out) are skipped
+        while pending is not None and pending[0] < tenant_id:
+            pending = next(paid_rows, None)
+        paid = (pending[1] or 0.0) if pending is not None and pending[0] == tenant_id else 0.0
+        if first is None:
+            first = as_of_index + 1
+        last = as_of_index if move_out is None else min(as_of_index, move_out)
+        expected = rent * max(last - first + 1, 0)
+        yield tenant_id, rent, int(first), int(last), expected, paid, expected - paid
+
+
+def _chunked_rows(db: Session, tenant_ids: list, build):
+    for i in range(0, len(tenant_ids), _IN_CHUNK):
+        yield from db.execute(build(tenant_ids[i:i + _IN_CHUNK]))
+
+
+def _details(db: Session, tenant_ids: list, as_of: date) -> tuple:
+    """Names and {month_index: amount paid} for the given tenants."""
+    T, H, P = models.Tenant, models.House, models.Payment
+    names = {
+        tenant_id: (full_name, house_name)
+        for tenant_id, full_name, house_name in _chunked_rows(db, tenant_ids, lambda ids: (
+            select(T.id, T.full_name, H.name).join(H, H.id == T.house_id).where(T.id.in_(ids))
+        ))
+    }
+    monthly = {}
+    for tenant_id, month, amount in _chunked_rows(db, tenant_ids, lambda ids: (
+        select(P.tenant_id, P.month_paid_for, func.sum(P.amount_paid))
+        .join(T, T.id == P.tenant_id)
+        .where(P.tenant_id.in_(ids), *_counted_payments(as_of))
+        .group_by(P.tenant_id, P.month_paid_for)
+    )):
+        index = _month_index(int(month[:4]), int(month[5:7]))
+        monthly.setdefault(tenant_id, {})[index] = amount or 0.0
+    return names, monthly
+
+
+def _breakdown(first: int, last: int, rent: float, paid_by_month: dict) -> list:
+    """The unpaid months, oldest first, after applying credit."""
+    credit = 0.0
+    for index, amount in paid_by_month.items():
+        if index < first:
+            credit += amount
+        elif index <= last and amount > rent:
+            credit += amount - rent
+
+    months = []
+    for index in range(first, last + 1):
+        outstanding = rent - min(paid_by_month.get(index, 0.0), rent)
+        applied = min(credit, outstanding)
+        credit -= applied
+        outstanding -= applied
+        if outstanding > _TOLERANCE:
+            months.append({
+                "month": _month_label(index),
+                "due": rent,
+                "paid": round(rent - outstanding, 2),  # recorded for the month plus credit applied
+                "outstanding": round(outstanding, 2),
+            })
+    return months
+
+
+def report(db: Session, as_of: date, limit: Optional[int] = 100, include_settled: bool = False) -> dict:
+    """Totals over all active tenants plus the `limit` largest balances, with their breakdown."""
+    tenants = in_arrears = 0
+    expected_total = paid_total = outstanding_total = 0.0
+    listed = []
+    for row in _balances(db, as_of):
+        balance = row[6]
+        tenants += 1
+        expected_total += row[4]
+        paid_total += row[5]
+        if balance > _TOLERANCE:
+            in_arrears += 1
+            outstanding_total += balance
+            listed.append(row)
+        elif include_settled:
+            listed.append(row)
+
+    by_balance = lambda r: (max(r[6], 0.0), -r[0])
+    if limit is not None and len(listed) > limit:
+        listed = heapq.nlargest(limit, listed, key=by_balance)
+    else:
+        listed.sort(key=by_balance, reverse=True)
+
+    names, monthly = _details(db, [r[0] for r in listed], as_of)
+    items = []
+    for tenant_id, rent, first, last, expected, paid, balance in listed:
+        owing = balance > _TOLERANCE
+        months = _breakdown(first, last, rent, monthly.get(tenant_id, {})) if owing else []
+        items.append({
+            "tenant_id": tenant_id,
+            "tenant_name": names[tenant_id][0],
+            "house_name": names[tenant_id][1],
+            "rent_amount": rent,
+            "months_billed": max(last - first + 1, 0),
+            "expected": expected,
+            "paid": paid,
+            "balance": round(balance, 2) if owing else 0.0,
+            "months_in_arrears": len(months),
+            "oldest_unpaid_month": months[0]["month"] if months else None,
+            "months": months,
+        })
+
+    return {
+        "as_of": as_of,
+        "tenants": tenants,
+        "tenants_in_arrears": in_arrears,
+        "expected": round(expected_total, 2),
+        "paid": round(paid_total, 2),
+        "outstanding": round(outstanding_total, 2),
+        "items": items,
+    }
@@ -0,0 +1,52 @@
+"""
+Queue emails in the outbox table within the caller's transaction.
+
+Nothing here commits: the row becomes visible to the worker exactly when the
+payment or tenant it belongs to commits, and disappears with it on rollback.
+"""
+from datetime import date
+from typing import Optional
+from sqlalchemy.orm import Session
+import models
+
+
+def _jsonable(payload: dict) -> dict:
+    return {k: v.isoformat() if isinstance(v, date) else v for k, v in payload.items()}
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    to_email: str,
+    payload: dict,
+    payment_id: Optional[int] = None,
+    tenant_id: Optional[int] = None,
+) -> models.EmailOutbox:
+    message = models.EmailOutbox(
+        kind=kind,
+        to_email=to_email,
+        payload=_jsonable(payload),
+        payment_id=payment_id,
+        tenant_id=tenant_id,
+    )
+    db.add(message)
+    return message
+
+
+def enqueue_payment_confirmation(db: Session, payment: models.Payment, tenant_name: str,
+                                 tenant_email: str, house_name: str) -> models.EmailOutbox:
+    """Queue a receipt for a flushed payment (payment.id must be set)."""
+    return enqueue(
+        db, "payment_confirmation", tenant_email,
+        dict(
+            tenant_name=tenant_name,
+            amount=payment.amount_paid,
+            month_paid_for=payment.month_paid_for,
+            house_name=house_name,
+            payment_method=payment.payment_method,
+            reference_code=payment.reference_code,
+            payment_date=payment.payment_date,
+        ),
+        payment_id=payment.id,
+        tenant_id=payment.tenant_id,
+    )
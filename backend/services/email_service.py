@@ -1,55 +1,40 @@
-import resend
-import os
-from datetime import date
-from dotenv import load_dotenv
-
-load_dotenv()
-
-resend.api_key = os.getenv("RESEND_API_KEY", "")
-
-
-def _send_email(to_email: str, subject: str, html_body: str) -> bool:
-    if not resend.api_key:
-        print(f"[EMAIL] Skipped — RESEND_API_KEY not set. Would send to: {to_email}")
-        return False
-    try:
-        params = {
-            "from": f"{os.getenv('EMAIL_FROM_NAME', 'Kamau Rentals')} <onboarding@resend.dev>",
-            "to": [to_email],
-            "subject": subject,
-            "html": html_body,
-        }
-        resend.Emails.send(params)
-        print(f"[EMAIL] Sent '{subject}' → {to_email}")
-        return True
-    except Exception as e:
-        print(f"[EMAIL] Failed to send to {to_email}: {e}")
-        return False
-
-
-def _base_template(content: str) -> str:
-    return f"""
+"""
+Email templates. Routes never send mail directly: they queue a row in the
+email outbox (services/email_outbox.py) and the outbox worker renders it with
+`render()` / `render_batch()` and delivers it through a transport
+(services/email_transport.py).
+
+The page frame (doctype, inline CSS, header) and the footer are prepared once
+as constants; each email is then built with a single f-string that splices
+its content between them. The footer's year is only recomputed when the
+year rolls over.
+"""
+import time
+from datetime import date, datetime
+from typing import Iterable, List
+
+_FRAME_HEAD = """
 <!DOCTYPE html>
 <html>
 <head>
   <meta charset="UTF-8">
   <style>
-    body {{ font-family: Georgia, serif; background: #f5f0e8; margin: 0; padding: 0; }}
-    .wrapper {{ max-width: 580px; margin: 40px auto; }}
-    .header {{ background: linear-gradient(135deg, #1A1A24 0%, #22222F 100%); padding: 32px 40px; border-radius: 12px 12px 0 0; }}
-    .header h1 {{ color: #C5A028; margin: 0; font-size: 24px; letter-spacing: 2px; font-weight: 400; }}
-    .header p {{ color: #888; margin: 6px 0 0; font-size: 13px; letter-spacing: 1px; }}
-    .body {{ background: #ffffff; padding: 36px 40px; border-left: 1px solid #e0d8c8; border-right: 1px solid #e0d8c8; }}
-    .body h2 {{ color: #1A1A24; font-size: 20px; margin-top: 0; }}
-    .body p {{ color: #444; line-height: 1.7; font-size: 15px; }}
-    .amount-box {{ background: #f9f5ec; border-left: 4px solid #C5A028; padding: 16px 20px; margin: 20px 0; border-radius: 0 8px 8px 0; }}
-    .amount-box .label {{ color: #888; font-size: 12px; text-transform: uppercase; letter-spacing: 1px; }}
-    .amount-box .value {{ color: #1A1A24; font-size: 28px; font-weight: 700; margin-top: 4px; }}
-    .detail-row {{ display: flex; justify-content: space-between; padding: 10px 0; border-bottom: 1px solid #f0e8d8; }}
-    .detail-label {{ color: #888; font-size: 13px; }}
-    .detail-value {{ color: #1A1A24; font-size: 13px; font-weight: 600; }}
-    .footer {{ background: #1A1A24; padding: 20px 40px; border-radius: 0 0 12px 12px; text-align: center; }}
-    .footer p {{ color: #555570; font-size: 12px; margin: 0; }}
+    body { font-family: Georgia, serif; background: #f5f0e8; margin: 0; padding: 0; }
+    .wrapper { max-width: 580px; margin: 40px auto; }
+    .header { background: linear-gradient(135deg, #1A1A24 0%, #22222F 100%); padding: 32px 40px; border-radius: 12px 12px 0 0; }
+    .header h1 { color: #C5A028; margin: 0; font-size: 24px; letter-spacing: 2px; font-weight: 400; }
+    .header p { color: #888; margin: 6px 0 0; font-size: 13px; letter-spacing: 1px; }
+    .body { background: #ffffff; padding: 36px 40px; border-left: 1px solid #e0d8c8; border-right: 1px solid #e0d8c8; }
+    .body h2 { color: #1A1A24; font-size: 20px; margin-top: 0; }
+    .body p { color: #444; line-height: 1.7; font-size: 15px; }
+    .amount-box { background: #f9f5ec; border-left: 4px solid #C5A028; padding: 16px 20px; margin: 20px 0; border-radius: 0 8px 8px 0; }
+    .amount-box .label { color: #888; font-size: 12px; text-transform: uppercase; letter-spacing: 1px; }
+    .amount-box .value { color: #1A1A24; font-size: 28px; font-weight: 700; margin-top: 4px; }
+    .detail-row { display: flex; justify-content: space-between; padding: 10px 0; border-bottom: 1px solid #f0e8d8; }
+    .detail-label { color: #888; font-size: 13px; }
+    .detail-value { color: #1A1A24; font-size: 13px; font-weight: 600; }
+    .footer { background: #1A1A24; padding: 20px 40px; border-radius: 0 0 12px 12px; text-align: center; }
+    .footer p { color: #555570; font-size: 12px; margin: 0; }
   </style>
 </head>
 <body>
@@ -59,10 +44,12 @@ def _base_template(content: str) -> str:
       <p>PROPERTY MANAGEMENT · KISUMU</p>
     </div>
     <div class="body">
-      {content}
+      """
+
+_FRAME_FOOT = """
     </div>
     <div class="footer">
-      <p>© {date.today().year} Murithi Family Rentals · Meru, Kenya</p>
+      <p>© {year} Murithi Family Rentals · Meru, Kenya</p>
       <p style="margin-top:6px;">This is an automated notification. Do not reply to this email.</p>
     </div>
   </div>
@@ -70,9 +57,20 @@ def _base_template(content: str) -> str:
 </html>
 """
 
+_footer_cache = {"html": "", "until": 0.0}
+
+
+def _footer() -> str:
+    """The footer with the current year filled in, cached until next New Year."""
+    now = time.time()
+    if now >= _footer_cache["until"]:
+        year = date.today().year
+        _footer_cache["html"] = _FRAME_FOOT.replace("{year}", str(year))
+        _footer_cache["until"] = datetime(year + 1, 1, 1).timestamp()
+    return _footer_cache["html"]
 
-def send_payment_confirmation(
-    tenant_email: str,
+
+def render_payment_confirmation(
     tenant_name: str,
     amount: float,
     month_paid_for: str,
@@ -80,7 +78,9 @@ def send_payment_confirmation(
     payment_method: str,
     reference_code: str = None,
     payment_date=None,
-) -> bool:
+    *,
+    footer: str = None,
+) -> tuple:
     subject = f"✅ Payment Received — {house_name} · {month_paid_for}"
     ref_row = f"""
       <div class="detail-row">
@@ -89,7 +89,7 @@ def send_payment_confirmation(
       </div>
     """ if reference_code else ""
 
-    content = f"""
+    return subject, f"""{_FRAME_HEAD}
       <h2>Payment Confirmed ✅</h2>
       <p>Dear <strong>{tenant_name}</strong>,</p>
       <p>We have received your rent payment. Here are your payment details:</p>
@@ -116,18 +116,18 @@ def send_payment_confirmation(
       {ref_row}
       <p style="margin-top:24px;">Thank you for your prompt payment. Please keep this email as your receipt.</p>
       <p>Best regards,<br><strong>Murithi Rentals Management</strong></p>
-    """
-    return _send_email(tenant_email, subject, _base_template(content))
+    {footer or _footer()}"""
 
 
-def send_payment_reminder(
-    tenant_email: str,
+def render_payment_reminder(
     tenant_name: str,
     amount: float,
     month: str,
     house_name: str,
     days_overdue: int = 0,
-) -> bool:
+    *,
+    footer: str = None,
+) -> tuple:
     urgency = "⚠️ Friendly Reminder" if days_overdue <= 7 else "🔴 Overdue Notice"
     subject = f"{urgency} — Rent Due · {house_name} · {month}"
     message = (
@@ -135,7 +135,7 @@ def send_payment_reminder(
         if days_overdue <= 7
         else f"Your rent payment is <strong>{days_overdue} days overdue</strong>. Please make payment as soon as possible."
     )
-    content = f"""
+    return subject, f"""{_FRAME_HEAD}
       <h2>Rent Payment Due</h2>
       <p>Dear <strong>{tenant_name}</strong>,</p>
       <p>{message}</p>
@@ -153,19 +153,19 @@ def send_payment_reminder(
       </div>
       <p style="margin-top:24px;">If you have already paid, please disregard this notice.</p>
       <p>Thank you,<br><strong>Murithi Rentals Management</strong></p>
-    """
-    return _send_email(tenant_email, subject, _base_template(content))
+    {footer or _footer()}"""
 
 
-def send_welcome_email(
-    tenant_email: str,
+def render_welcome_email(
     tenant_name: str,
     house_name: str,
     rent_amount: float,
     move_in_date,
-) -> bool:
+    *,
+    footer: str = None,
+) -> tuple:
     subject = f"Welcome to Murithi Rentals — {house_name}"
-    content = f"""
+    return subject, f"""{_FRAME_HEAD}
       <h2>Welcome to Your New Home 🏠</h2>
       <p>Dear <strong>{tenant_name}</strong>,</p>
       <p>We are pleased to welcome you to Murithi Rentals. Your tenancy has been set up successfully.</p>
@@ -183,6 +183,22 @@ def send_welcome_email(
       </div>
       <p style="margin-top:24px;">Rent is due on the <strong>1st of every month</strong>.</p>
       <p>Warm regards,<br><strong>Murithi Rentals Management</strong></p>
-    """
-    return _send_email(tenant_email, subject, _base_template(content))
+    {footer or _footer()}"""
+
+
+RENDERERS = {
+    "payment_confirmation": render_payment_confirmation,
+    "payment_reminder": render_payment_reminder,
+    "welcome": render_welcome_email,
+}
+
+
+def render(kind: str, payload: dict) -> tuple:
+    """Render a queued email. Returns (subject, html)."""
+    return RENDERERS[kind](**payload)
+
 
+def render_batch(kind: str, payloads: Iterable[dict]) -> List[tuple]:
+    """Render many emails of one kind. Returns [(subject, html), ...] in order."""
+    renderer, footer = RENDERERS[kind], _footer()
+    return [renderer(**payload, footer=footer) for payload in payloads]
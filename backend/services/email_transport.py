@@ -0,0 +1,49 @@
+"""
+Pluggable delivery backends for the email outbox worker.
+
+A transport has a single method, `send(to_email, subject, html)`, which
+returns on success and raises on failure. EMAIL_TRANSPORT picks the backend:
+"resend" (default, needs RESEND_API_KEY) or "log" (prints instead of sending,
+for local development).
+"""
+import os
+
+
+class EmailDeliveryError(Exception):
+    pass
+
+
+class ResendTransport:
+    def __init__(self, api_key: str, from_address: str):
+        import resend  # imported here so the web app never loads the client
+
+        if not api_key:
+            raise EmailDeliveryError("RESEND_API_KEY is not set")
+        resend.api_key = api_key
+        self._emails = resend.Emails
+        self.from_address = from_address
+
+    def send(self, to_email: str, subject: str, html: str):
+        self._emails.send({
+            "from": self.from_address,
+            "to": [to_email],
+            "subject": subject,
+            "html": html,
+        })
+
+
+class LogTransport:
+    """Prints what would have been sent. Counts as delivered."""
+
+    def send(self, to_email: str, subject: str, html: str):
+        print(f"[EMAIL] (log transport) '{subject}' → {to_email}")
+
+
+def transport_from_env():
+    kind = os.getenv("EMAIL_TRANSPORT", "resend").lower()
+    if kind == "log":
+        return LogTransport()
+    if kind == "resend":
+        from_name = os.getenv("EMAIL_FROM_NAME", "Kamau Rentals")
+        return ResendTransport(os.getenv("RESEND_API_KEY", ""), f"{from_name} <onboarding@resend.dev>")
+    raise EmailDeliveryError(f"Unknown EMAIL_TRANSPORT '{kind}' (expected resend or log)")
@@ -0,0 +1,204 @@
+"""
+Outbox worker: drains email_outbox in batches, delivering with bounded
+concurrency and retrying failures with exponential backoff.
+
+Each cycle claims up to `batch_size` due rows (FOR UPDATE SKIP LOCKED on
+Postgres, so several workers can run side by side), marks them `sending`,
+delivers them on a thread pool (at most `concurrency` at once and, if set,
+no more than `rate_limit` sends per second) and records the outcome:
+
+  delivered      → status "sent", sent_at set, payment.email_sent = True
+  failed         → attempts += 1, back to "pending" after a backoff delay
+  out of retries → status "dead" (left in the table for inspection)
+
+Rows stuck in `sending` longer than LOCK_TIMEOUT (worker crashed mid-batch)
+are reclaimed on a later cycle. The crashed try counts as an attempt, so a
+message that kills the worker every time still ends up `dead`.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Optional
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from services.email_service import render, render_batch
+from utils.metrics import EMAIL_SENDS
+import models
+
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = float(os.getenv("EMAIL_BACKOFF_BASE_SECONDS", "30"))
+BACKOFF_MAX_SECONDS = float(os.getenv("EMAIL_BACKOFF_MAX_SECONDS", str(6 * 3600)))
+RATE_LIMIT = float(os.getenv("EMAIL_RATE_LIMIT", "0"))   # sends per second, 0 = unlimited
+LOCK_TIMEOUT = timedelta(minutes=10)
+
+_Outbox = models.EmailOutbox
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """Delay before the next try after `attempts` failures: base · 2^(attempts-1), capped."""
+    seconds = BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, BACKOFF_MAX_SECONDS))
+
+
+class RateLimiter:
+    """Spaces calls at least 1/per_second apart across all sender threads."""
+
+    def __init__(self, per_second: float):
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def claim_batch(db: Session, batch_size: int) -> list:
+    """Lock up to batch_size due messages for this worker and return their data."""
+    now = models.utcnow()
+    rows = (
+        db.query(_Outbox)
+        .filter(or_(
+            and_(_Outbox.status == "pending", _Outbox.next_attempt_at <= now),
+            and_(_Outbox.status == "sending", _Outbox.locked_at < now - LOCK_TIMEOUT),
+        ))
+        .order_by(_Outbox.next_attempt_at, _Outbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    claimed = []
+    for row in rows:
+        if row.status == "sending":  # stale: the worker died rendering or sending it
+            row.attempts += 1
+            row.last_error = "worker stopped while sending (lock timed out)"
+            if row.attempts >= MAX_ATTEMPTS:
+                row.status = "dead"
+                row.locked_at = None
+                continue
+        row.status = "sending"
+        row.locked_at = now
+        claimed.append({
+            "id": row.id,
+            "kind": row.kind,
+            "to_email": row.to_email,
+            "payload": row.payload,
+            "attempts": row.attempts,
+            "payment_id": row.payment_id,
+        })
+    db.commit()
+    return claimed
+
+
+def _render_all(batch: list) -> list:
+    """Render a claimed batch, one render_batch call per kind. Returns the
+    (subject, html) for each message, or the error text if it can't render."""
+    by_kind = {}
+    for i, message in enumerate(batch):
+        by_kind.setdefault(message["kind"], []).append(i)
+    rendered = [None] * len(batch)
+    for kind, indexes in by_kind.items():
+        try:
+            for i, email in zip(indexes, render_batch(kind, [batch[i]["payload"] for i in indexes])):
+                rendered[i] = email
+        except Exception:  # a bad payload: render one by one so only it fails
+            for i in indexes:
+                try:
+                    rendered[i] = render(kind, batch[i]["payload"])
+                except Exception as e:
+                    rendered[i] = f"{type(e).__name__}: {e}"[:1000]
+    return rendered
+
+
+def _deliver(transport, message: dict, email, limiter: Optional[RateLimiter] = None) -> Optional[str]:
+    """Send one rendered message. Returns None on success, else the error text."""
+    if isinstance(email, str):  # render error
+        EMAIL_SENDS.labels(message["kind"], "failed").inc()
+        return email
+    try:
+        if limiter:
+            limiter.wait()
+        transport.send(message["to_email"], *email)
+    except Exception as e:  # any transport failure is retried
+        EMAIL_SENDS.labels(message["kind"], "failed").inc()
+        return f"{type(e).__name__}: {e}"[:1000]
+    EMAIL_SENDS.labels(message["kind"], "sent").inc()
+    return None
+
+
+def record_results(db: Session, batch: list, errors: list) -> dict:
+    now = models.utcnow()
+    sent_ids = [m["id"] for m, err in zip(batch, errors) if err is None]
+    stats = {"sent": len(sent_ids), "retrying": 0, "dead": 0}
+
+    if sent_ids:
+        db.query(_Outbox).filter(_Outbox.id.in_(sent_ids)).update(
+            {_Outbox.status: "sent", _Outbox.sent_at: now, _Outbox.locked_at: None, _Outbox.last_error: None},
+            synchronize_session=False,
+        )
+        payment_ids = [m["payment_id"] for m, err in zip(batch, errors) if err is None and m["payment_id"]]
+        if payment_ids:
+            db.query(models.Payment).filter(models.Payment.id.in_(payment_ids)).update(
+                {models.Payment.email_sent: True}, synchronize_session=False
+            )
+
+    for message, err in zip(batch, errors):
+        if err is None:
+            continue
+        attempts = message["attempts"] + 1
+        if attempts >= MAX_ATTEMPTS:
+            values = {_Outbox.status: "dead"}
+            stats["dead"] += 1
+        else:
+            values = {_Outbox.status: "pending", _Outbox.next_attempt_at: now + backoff_delay(attempts)}
+            stats["retrying"] += 1
+        values.update({_Outbox.attempts: attempts, _Outbox.last_error: err, _Outbox.locked_at: None})
+        db.query(_Outbox).filter(_Outbox.id == message["id"]).update(values, synchronize_session=False)
+
+    db.commit()
+    return stats
+
+
+def drain_once(session_factory: Callable[[], Session], transport, executor: ThreadPoolExecutor,
+               batch_size: int = 50, limiter: Optional[RateLimiter] = None) -> dict:
+    """Claim, deliver and record one batch. Returns counts (claimed/sent/retrying/dead)."""
+    db = session_factory()
+    try:
+        batch = claim_batch(db, batch_size)
+        if not batch:
+            return {"claimed": 0, "sent": 0, "retrying": 0, "dead": 0}
+        rendered = _render_all(batch)
+        errors = list(executor.map(lambda m, email: _deliver(transport, m, email, limiter), batch, rendered))
+        stats = record_results(db, batch, errors)
+        stats["claimed"] = len(batch)
+        return stats
+    finally:
+        db.close()
+
+
+def run(session_factory: Callable[[], Session], transport, batch_size: int = 50, concurrency: int = 8,
+        poll_interval: float = 2.0, once: bool = False, should_stop: Callable[[], bool] = lambda: False,
+        rate_limit: float = RATE_LIMIT) -> dict:
+    """Drain the outbox until it is empty (once=True) or forever, polling when idle."""
+    totals = {"claimed": 0, "sent": 0, "retrying": 0, "dead": 0}
+    limiter = RateLimiter(rate_limit) if rate_limit > 0 else None
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="email") as executor:
+        while not should_stop():
+            stats = drain_once(session_factory, transport, executor, batch_size, limiter)
+            for key in totals:
+                totals[key] += stats[key]
+            if stats["claimed"]:
+                print(f"[EMAIL] batch: {stats['sent']} sent, {stats['retrying']} retrying, {stats['dead']} dead")
+                continue
+            if once:
+                break
+            time.sleep(poll_interval)
+    return totals
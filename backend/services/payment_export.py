@@ -0,0 +1,89 @@
+"""
+Streaming export of the payment ledger as CSV or NDJSON.
+
+Rows are read through a server-side cursor in fixed-size partitions and
+encoded chunk by chunk, so memory stays flat however many payments match and
+the first bytes go out as soon as the first partition arrives.
+"""
+import csv
+import io
+import json
+from datetime import date
+from typing import Iterator, Optional
+from sqlalchemy import select
+from database import read_session
+import models
+
+CHUNK_ROWS = 1000
+
+COLUMNS = (
+    "id", "payment_date", "month_paid_for", "tenant_id", "tenant_name",
+    "house_id", "house_name", "amount_paid", "payment_method",
+    "reference_code", "notes", "email_sent", "created_at",
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _statement(date_from: Optional[date], date_to: Optional[date]):
+    P = models.Payment
+    stmt = (
+        select(
+            P.id, P.payment_date, P.month_paid_for, P.tenant_id,
+            models.Tenant.full_name.label("tenant_name"),
+            P.house_id,
+            models.House.name.label("house_name"),
+            P.amount_paid, P.payment_method, P.reference_code, P.notes,
+            P.email_sent, P.created_at,
+        )
+        .join(models.Tenant, models.Tenant.id == P.tenant_id)
+        .join(models.House, models.House.id == P.house_id)
+        .order_by(P.payment_date, P.id)
+    )
+    if date_from:
+        stmt = stmt.where(P.payment_date >= date_from)
+    if date_to:
+        stmt = stmt.where(P.payment_date <= date_to)
+    return stmt
+
+
+def _encode_csv(rows, header: bool) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(COLUMNS)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(COLUMNS, row)), default=str, ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def iter_export(fmt: str, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Iterator[bytes]:
+    """Yield the encoded export in chunks of CHUNK_ROWS payments.
+
+    Opens its own session (on the read replica, if usable): the response body
+    is produced after the request's session has already been closed.
+    """
+    db = read_session()
+    try:
+        if fmt == "csv":
+            # Header first so clients see bytes before the query returns
+            yield _encode_csv((), header=True).encode()
+        result = db.execute(
+            _statement(date_from, date_to).execution_options(stream_results=True, yield_per=CHUNK_ROWS)
+        )
+        for partition in result.partitions():
+            if fmt == "csv":
+                yield _encode_csv(partition, header=False).encode()
+            else:
+                yield _encode_ndjson(partition).encode()
+    finally:
+        db.close()
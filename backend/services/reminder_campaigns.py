@@ -0,0 +1,137 @@
+"""
+Rent reminder campaigns.
+
+A campaign is one month's reminders. Running it queues an outbox email for
+every active tenant who has an email, has not paid for the month and is not
+already in the campaign, found with a single anti-join. Running it again only
+adds tenants who became due since and re-queues failed sends, so nobody gets
+the same reminder twice. Delivery (with its concurrency and rate limits) is
+the outbox worker's job; progress is read from the outbox rows.
+"""
+from sqlalchemy import exists, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import models
+
+_Outbox = models.EmailOutbox
+
+
+def get_or_create(db: Session, month: str) -> models.ReminderCampaign:
+    campaign = db.query(models.ReminderCampaign).filter(models.ReminderCampaign.month == month).first()
+    if campaign:
+        return campaign
+    try:
+        with db.begin_nested():
+            campaign = models.ReminderCampaign(month=month)
+            db.add(campaign)
+    except IntegrityError:  # created by a concurrent request
+        campaign = db.query(models.ReminderCampaign).filter(models.ReminderCampaign.month == month).one()
+    return campaign
+
+
+def _paid_for_month(month: str, tenant_id_col):
+    return exists().where(
+        models.Payment.tenant_id == tenant_id_col,
+        models.Payment.month_paid_for == month,
+    )
+
+
+def _recipients(db: Session, campaign: models.ReminderCampaign):
+    T, H = models.Tenant, models.House
+    already_in_campaign = exists().where(_Outbox.campaign_id == campaign.id, _Outbox.tenant_id == T.id)
+    return (
+        db.query(T.id, T.full_name, T.email, H.name.label("house_name"), H.rent_amount)
+        .join(H, H.id == T.house_id)
+        .filter(
+            T.is_active == True,
+            T.email.isnot(None),
+            T.email != "",
+            ~_paid_for_month(campaign.month, T.id),
+            ~already_in_campaign,
+        )
+        .order_by(T.id)
+        .all()
+    )
+
+
+def _queue(db: Session, campaign: models.ReminderCampaign, now) -> list:
+    rows = [
+        dict(
+            kind="payment_reminder",
+            to_email=r.email,
+            payload=dict(tenant_name=r.full_name, amount=r.rent_amount, month=campaign.month,
+                         house_name=r.house_name),
+            status="pending",
+            attempts=0,
+            next_attempt_at=now,
+            tenant_id=r.id,
+            campaign_id=campaign.id,
+        )
+        for r in _recipients(db, campaign)
+    ]
+    if rows:
+        db.execute(insert(_Outbox), rows)
+    return rows
+
+
+def run(db: Session, month: str) -> dict:
+    """Queue this month's reminders. Returns the campaign and how many were queued/re-queued."""
+    campaign = get_or_create(db, month)
+    now = models.utcnow()
+
+    # Failed sends get another go, unless the tenant has paid in the meantime
+    requeued = (
+        db.query(_Outbox)
+        .filter(
+            _Outbox.campaign_id == campaign.id,
+            _Outbox.status == "dead",
+            ~_paid_for_month(month, _Outbox.tenant_id),
+        )
+        .update(
+            {_Outbox.status: "pending", _Outbox.attempts: 0, _Outbox.next_attempt_at: now,
+             _Outbox.last_error: None},
+            synchronize_session=False,
+        )
+    )
+
+    try:
+        with db.begin_nested():
+            rows = _queue(db, campaign, now)
+    except IntegrityError:
+        # A concurrent run for this month queued some of the same tenants
+        # first (ux_email_outbox_campaign_tenant); they are in the campaign
+        # now, so the recomputed recipients leave them out
+        rows = _queue(db, campaign, now)
+
+    campaign.last_run_at = now
+    db.commit()
+    return {"campaign": campaign, "queued": len(rows), "requeued": requeued}
+
+
+def progress(db: Session, campaign: models.ReminderCampaign) -> dict:
+    """Delivery counts for a campaign, straight from its outbox rows."""
+    counts = {"sent": 0, "failed": 0, "pending": 0, "retrying": 0}
+    retried = _Outbox.attempts > 0
+    rows = (
+        db.query(_Outbox.status, retried, func.count(_Outbox.id))
+        .filter(_Outbox.campaign_id == campaign.id)
+        .group_by(_Outbox.status, retried)
+        .all()
+    )
+    for status, retried, n in rows:
+        if status == "sent":
+            counts["sent"] += n
+        elif status == "dead":
+            counts["failed"] += n
+        else:  # pending or sending
+            counts["pending"] += n
+            if retried:
+                counts["retrying"] += n
+    counts["total"] = sum(counts[k] for k in ("sent", "failed", "pending"))
+    return {
+        "id": campaign.id,
+        "month": campaign.month,
+        "created_at": campaign.created_at,
+        "last_run_at": campaign.last_run_at,
+        **counts,
+    }
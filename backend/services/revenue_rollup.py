@@ -0,0 +1,129 @@
+from sqlalchemy import func, delete, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+import models
+
+_Rollup = models.RevenueRollup
+_TOLERANCE = 0.005
+
+
+def _upsert(db: Session, month: str, house_id: int, payment_method: str, amount: float, count: int):
+    """Add amount/count to one rollup row, creating it if needed, in a single statement."""
+    dialect = db.get_bind().dialect.name
+    values = dict(
+        month=month,
+        house_id=house_id,
+        payment_method=payment_method,
+        total_amount=amount,
+        payment_count=count,
+    )
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (pg_insert if dialect == "postgresql" else sqlite_insert)(_Rollup).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_Rollup.month, _Rollup.house_id, _Rollup.payment_method],
+            set_={
+                "total_amount": _Rollup.total_amount + stmt.excluded.total_amount,
+                "payment_count": _Rollup.payment_count + stmt.excluded.payment_count,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    # Generic fallback: update, then insert when the row did not exist yet
+    updated = db.query(_Rollup).filter(
+        _Rollup.month == month,
+        _Rollup.house_id == house_id,
+        _Rollup.payment_method == payment_method,
+    ).update(
+        {
+            _Rollup.total_amount: _Rollup.total_amount + amount,
+            _Rollup.payment_count: _Rollup.payment_count + count,
+        },
+        synchronize_session=False,
+    )
+    if not updated:
+        db.execute(insert(_Rollup).values(**values))
+
+
+def add_payment(db: Session, payment: models.Payment):
+    """Count a new payment into the rollup. Call before committing the payment."""
+    _upsert(db, payment.month_paid_for, payment.house_id, payment.payment_method, payment.amount_paid, 1)
+
+
+def add_payments(db: Session, payments: list):
+    """Count a batch of new payments in, with one upsert per distinct rollup key."""
+    deltas = {}
+    for p in payments:
+        key = (p.month_paid_for, p.house_id, p.payment_method)
+        total, count = deltas.get(key, (0.0, 0))
+        deltas[key] = (total + p.amount_paid, count + 1)
+    for (month, house_id, payment_method), (total, count) in deltas.items():
+        _upsert(db, month, house_id, payment_method, total, count)
+
+
+def remove_payment(db: Session, month: str, house_id: int, payment_method: str, amount: float):
+    """Take a payment's previous values back out of the rollup."""
+    _upsert(db, month, house_id, payment_method, -amount, -1)
+
+
+def _actual_totals(db: Session) -> dict:
+    rows = (
+        db.query(
+            models.Payment.month_paid_for,
+            models.Payment.house_id,
+            models.Payment.payment_method,
+            func.sum(models.Payment.amount_paid),
+            func.count(models.Payment.id),
+        )
+        .group_by(models.Payment.month_paid_for, models.Payment.house_id, models.Payment.payment_method)
+        .all()
+    )
+    return {(m, h, pm): (total or 0.0, count) for m, h, pm, total, count in rows}
+
+
+def verify(db: Session) -> list:
+    """Compare the rollup against raw payments.
+
+    Returns a list of drifted keys as dicts with the rollup and actual
+    (total, count) pairs. Zero rows left behind by deletes are ignored.
+    """
+    actual = _actual_totals(db)
+    stored = {
+        (r.month, r.house_id, r.payment_method): (r.total_amount, r.payment_count)
+        for r in db.query(_Rollup).all()
+        if r.payment_count or abs(r.total_amount) > _TOLERANCE
+    }
+    drift = []
+    for key in sorted(set(actual) | set(stored), key=str):
+        expected = actual.get(key, (0.0, 0))
+        got = stored.get(key, (0.0, 0))
+        if got[1] != expected[1] or abs(got[0] - expected[0]) > _TOLERANCE:
+            drift.append({
+                "month": key[0],
+                "house_id": key[1],
+                "payment_method": key[2],
+                "rollup": got,
+                "actual": expected,
+            })
+    return drift
+
+
+def rebuild(db: Session) -> int:
+    """Recompute the whole rollup from raw payments. Returns the number of rows written."""
+    db.execute(delete(_Rollup))
+    source = select(
+        models.Payment.month_paid_for,
+        models.Payment.house_id,
+        models.Payment.payment_method,
+        func.sum(models.Payment.amount_paid),
+        func.count(models.Payment.id),
+    ).group_by(models.Payment.month_paid_for, models.Payment.house_id, models.Payment.payment_method)
+    result = db.execute(
+        insert(_Rollup).from_select(
+            ["month", "house_id", "payment_method", "total_amount", "payment_count"],
+            source,
+        )
+    )
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,273 @@
+"""
+Bulk import of payments from M-Pesa / bank statement CSV exports.
+
+The whole statement is validated against tenant and house maps loaded with a
+single query, de-duplicated on reference_code (within the file and against the
+ledger), and inserted in batched transactions. Every input row gets a result
+line so the caller can reconcile what was imported and why anything was not.
+"""
+import csv
+import io
+import re
+from datetime import date, datetime
+from typing import Optional
+from sqlalchemy.orm import Session
+from services import revenue_rollup, email_outbox
+from utils.phone import normalize_phone
+import models
+
+BATCH_SIZE = 500
+_IN_CHUNK = 900  # stay under SQLite's bound-parameter limit
+
+# Accepted header spellings (lower-cased, stripped) for each field we need.
+# Covers M-Pesa paybill statements, common bank CSV exports and our own names.
+_HEADER_ALIASES = {
+    "reference_code": ("reference_code", "receipt no.", "receipt no", "receipt", "transaction id",
+                       "transaction ref", "reference", "ref", "code"),
+    "payment_date": ("payment_date", "completion time", "transaction date", "value date", "date"),
+    "amount": ("amount_paid", "paid in", "amount", "credit", "deposit"),
+    "phone": ("phone", "msisdn", "phone number", "mobile", "other party info"),
+    "account": ("account", "a/c no.", "a/c no", "account no", "account reference",
+                "bill ref number", "narrative", "details", "description"),
+    "month_paid_for": ("month_paid_for", "month"),
+    "status": ("transaction status", "status"),
+}
+
+_DATE_FORMATS = (
+    "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y/%m/%d",
+    "%d/%m/%Y", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d-%m-%Y", "%d.%m.%Y",
+)
+_MONTH_RE = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+_PHONE_IN_TEXT = re.compile(r"(?:\+?254|0)?[17]\d{8}")
+
+
+class StatementError(ValueError):
+    """The file cannot be read as a statement at all (bad encoding, missing columns)."""
+
+
+def _map_headers(fieldnames) -> dict:
+    normalized = {(name or "").strip().lower(): name for name in fieldnames or []}
+    mapping = {}
+    for field, aliases in _HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in normalized:
+                mapping[field] = normalized[alias]
+                break
+    missing = [f for f in ("reference_code", "payment_date", "amount") if f not in mapping]
+    if missing:
+        raise StatementError(f"Statement is missing required column(s): {', '.join(missing)}")
+    if "phone" not in mapping and "account" not in mapping:
+        raise StatementError("Statement needs a phone or account/reference column to match tenants")
+    return mapping
+
+
+def _parse_date(raw: str) -> Optional[date]:
+    raw = (raw or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(raw, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(raw: str) -> Optional[float]:
+    cleaned = re.sub(r"[^\d.\-]", "", (raw or "").replace(",", ""))
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def _key(text: Optional[str]) -> str:
+    return re.sub(r"[\s\-_]", "", (text or "")).lower()
+
+
+_AMBIGUOUS = object()  # a key shared by several active tenants
+
+
+def _index(index: dict, key: str, tenant):
+    current = index.get(key)
+    if current is None:
+        index[key] = tenant
+    elif current is not _AMBIGUOUS and current.id != tenant.id:
+        index[key] = _AMBIGUOUS
+
+
+class _Directory:
+    """Active tenants indexed every way a statement row can refer to them.
+
+    A phone, ID number or unit name shared by several active tenants (e.g.
+    two tenants in one unit) matches none of them, so money is never booked
+    to an arbitrary one.
+    """
+
+    def __init__(self, db: Session):
+        rows = (
+            db.query(
+                models.Tenant.id, models.Tenant.full_name, models.Tenant.phone,
+                models.Tenant.id_number, models.Tenant.email,
+                models.House.id.label("house_id"), models.House.name.label("house_name"),
+            )
+            .join(models.House, models.House.id == models.Tenant.house_id)
+            .filter(models.Tenant.is_active == True)
+            .all()
+        )
+        self.by_phone, self.by_account = {}, {}
+        for r in rows:
+            phone = normalize_phone(r.phone)
+            if phone:
+                _index(self.by_phone, phone, r)
+            if r.id_number:
+                _index(self.by_account, _key(r.id_number), r)
+            _index(self.by_account, _key(r.house_name), r)
+
+    def match(self, account: Optional[str], phone_text: Optional[str]):
+        """(tenant, "account" | "phone"), or (None, "ambiguous") when the only
+        keys that matched are shared, or (None, None)."""
+        candidates = []
+        if account:
+            candidates.append((self.by_account.get(_key(account)), "account"))
+        if phone_text:
+            found = _PHONE_IN_TEXT.search(phone_text.replace(" ", ""))
+            phone = normalize_phone(found.group(0) if found else phone_text)
+            candidates.append((self.by_phone.get(phone), "phone"))
+        for tenant, matched_by in candidates:
+            if tenant is not None and tenant is not _AMBIGUOUS:
+                return tenant, matched_by
+        if any(tenant is _AMBIGUOUS for tenant, _ in candidates):
+            return None, "ambiguous"
+        return None, None
+
+
+def _existing_references(db: Session, codes: list) -> set:
+    existing = set()
+    for i in range(0, len(codes), _IN_CHUNK):
+        chunk = codes[i:i + _IN_CHUNK]
+        existing.update(
+            code for (code,) in
+            db.query(models.Payment.reference_code).filter(models.Payment.reference_code.in_(chunk))
+        )
+    return existing
+
+
+def import_statement(
+    db: Session,
+    content: bytes,
+    payment_method: str = "mpesa",
+    month_paid_for: Optional[str] = None,
+    send_email: bool = True,
+    dry_run: bool = False,
+) -> dict:
+    """Import a statement file.
+
+    Returns a report dict with per-row results and status counts. Receipts are
+    queued in the email outbox inside each batch's transaction.
+    """
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise StatementError("Statement must be a UTF-8 encoded CSV file")
+    reader = csv.DictReader(io.StringIO(text))
+    columns = _map_headers(reader.fieldnames)
+
+    def cell(row, field):
+        col = columns.get(field)
+        return (row.get(col) or "").strip() if col else ""
+
+    raw_rows = list(reader)
+    directory = _Directory(db)
+    already_recorded = _existing_references(
+        db, sorted({cell(r, "reference_code") for r in raw_rows if cell(r, "reference_code")})
+    )
+
+    results, to_insert, seen_in_file = [], [], set()
+    for line_no, row in enumerate(raw_rows, start=2):  # line 1 is the header
+        ref = cell(row, "reference_code")
+        result = {"row": line_no, "reference_code": ref or None, "status": "invalid"}
+        results.append(result)
+
+        status_text = cell(row, "status").lower()
+        if status_text and status_text not in ("completed", "success", "successful"):
+            result.update(status="skipped", message=f"Transaction status '{cell(row, 'status')}'")
+            continue
+        amount = _parse_amount(cell(row, "amount"))
+        paid_on = _parse_date(cell(row, "payment_date"))
+        result["amount"] = amount
+        if not ref:
+            result["message"] = "Missing reference code"
+            continue
+        if amount is None or amount <= 0:
+            result.update(status="skipped", message="No incoming amount")
+            continue
+        if paid_on is None:
+            result["message"] = f"Unrecognised date '{cell(row, 'payment_date')}'"
+            continue
+        month = cell(row, "month_paid_for") or month_paid_for or paid_on.strftime("%Y-%m")
+        if not _MONTH_RE.match(month):
+            result["message"] = f"Invalid month '{month}', expected YYYY-MM"
+            continue
+        if ref in already_recorded:
+            result.update(status="duplicate", message="Reference code already recorded")
+            continue
+        if ref in seen_in_file:
+            result.update(status="duplicate", message="Reference code repeated earlier in this file")
+            continue
+        seen_in_file.add(ref)
+
+        tenant, matched_by = directory.match(cell(row, "account"), cell(row, "phone"))
+        if matched_by == "ambiguous":
+            result.update(status="unmatched",
+                          message="Ambiguous match: several active tenants share this phone or account")
+            continue
+        if tenant is None:
+            result.update(status="unmatched", message="No active tenant matches this phone or account")
+            continue
+
+        result.update(
+            status="imported" if not dry_run else "matched",
+            matched_by=matched_by,
+            tenant_id=tenant.id,
+            tenant_name=tenant.full_name,
+            house_name=tenant.house_name,
+            month_paid_for=month,
+        )
+        to_insert.append((result, tenant, models.Payment(
+            tenant_id=tenant.id,
+            house_id=tenant.house_id,
+            amount_paid=amount,
+            payment_date=paid_on,
+            month_paid_for=month,
+            payment_method=payment_method,
+            reference_code=ref,
+            notes="Imported from statement",
+            email_sent=False,
+        )))
+
+    emails_queued = 0
+    if not dry_run:
+        for i in range(0, len(to_insert), BATCH_SIZE):
+            batch = to_insert[i:i + BATCH_SIZE]
+            payments = [p for _, _, p in batch]
+            db.add_all(payments)
+            db.flush()  # one multi-row INSERT; ids are read before commit expires them
+            revenue_rollup.add_payments(db, payments)
+            for result, tenant, payment in batch:
+                result["payment_id"] = payment.id
+                if send_email and tenant.email:
+                    email_outbox.enqueue_payment_confirmation(
+                        db, payment, tenant.full_name, tenant.email, tenant.house_name
+                    )
+                    emails_queued += 1
+            db.commit()
+
+    counts = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {
+        "dry_run": dry_run,
+        "total_rows": len(results),
+        "counts": counts,
+        "emails_queued": emails_queued,
+        "rows": results,
+    }
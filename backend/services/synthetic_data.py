@@ -0,0 +1,192 @@
+"""
+Synthetic portfolio generator for local scale testing (manage.py generate-data).
+
+Builds houses, a turnover history of tenants per house (moved-out tenants
+followed by the current one, or a vacancy), and monthly rent payments for
+every tenancy month, split into M-Pesa style installments so the payment
+count reaches the requested total. A small share of months is underpaid,
+so the arrears report has something to find. Output is deterministic for a
+given seed and sizes.
+
+Rows go in with executemany Core inserts in chunks, bypassing the ORM, so
+the ORM hooks are done here instead: phone_normalized is filled in, and
+afterwards the revenue rollup is rebuilt, the table versions are bumped and
+the planner statistics refreshed. Ids continue after the current maximum, so
+the data can be added to an existing database.
+"""
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from services import revenue_rollup
+import models
+
+CHUNK_SIZE = 20000
+OCCUPANCY = 0.9          # share of houses whose latest tenancy is still running
+UNDERPAID_MONTHS = 0.05  # share of tenancy months paid short
+
+_FIRST_NAMES = [
+    "John", "Mary", "Peter", "Grace", "James", "Faith", "David", "Mercy", "Joseph", "Esther",
+    "Samuel", "Ann", "Daniel", "Jane", "Paul", "Lucy", "Stephen", "Ruth", "Brian", "Purity",
+    "Kevin", "Caroline", "Dennis", "Beatrice", "Collins", "Joyce", "Victor", "Winnie", "Eric", "Sharon",
+]
+_LAST_NAMES = [
+    "Kamau", "Wanjiku", "Otieno", "Achieng", "Mwangi", "Njeri", "Kiprop", "Chebet", "Ochieng", "Wambui",
+    "Kariuki", "Atieno", "Mutua", "Mueni", "Kiptoo", "Jepkosgei", "Odhiambo", "Nyambura", "Njoroge", "Akinyi",
+    "Maina", "Wairimu", "Omondi", "Awino", "Kimani", "Wangari", "Cheruiyot", "Moraa", "Onyango", "Nduta",
+]
+_OCCUPATIONS = ["Teacher", "Nurse", "Driver", "Trader", "Student", "Clerk", "Mechanic", "Tailor", None, None]
+_HOUSE_TYPES = [("bedsitter", (8000, 8500)), ("single_room", (5500, 6000))]
+_METHODS = ["mpesa"] * 14 + ["bank"] * 3 + ["cash"] * 3
+
+
+def _month(index: int) -> tuple:
+    return index // 12, index % 12 + 1
+
+
+def _max_id(conn, model) -> int:
+    return conn.execute(select(func.coalesce(func.max(model.id), 0))).scalar()
+
+
+def _tenancies(rnd: random.Random, count: int, months: int) -> list:
+    """Split `months` into `count` consecutive tenancies, as (first, last) month offsets."""
+    count = min(count, months)
+    starts = [0] + sorted(rnd.sample(range(1, months), count - 1))
+    return [(s, e - 1) for s, e in zip(starts, starts[1:] + [months])]
+
+
+def generate(
+    engine: Engine,
+    houses: int,
+    tenants: int,
+    payments: int,
+    years: int = 5,
+    seed: int = 42,
+    chunk_size: int = CHUNK_SIZE,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> dict:
+    """Insert a synthetic portfolio; returns the row counts and seconds taken."""
+    rnd = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    today = now.date()
+    months = years * 12
+    first_month = today.year * 12 + today.month - 1 - (months - 1)
+    report = progress or (lambda table, rows: None)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        house_base, tenant_base, payment_base = (
+            _max_id(conn, m) for m in (models.House, models.Tenant, models.Payment)
+        )
+
+        # Houses and their tenancy timelines
+        house_rows, tenancies = [], []  # tenancies: (house_id, rent, first, last, current)
+        per_house, extra = divmod(tenants, houses)
+        for h in range(houses):
+            house_id = house_base + h + 1
+            house_type, rents = rnd.choice(_HOUSE_TYPES)
+            rent = rnd.choice(rents)
+            count = per_house + (h < extra)
+            spans = _tenancies(rnd, count, months) if count else []
+            occupied = bool(spans) and rnd.random() < OCCUPANCY
+            for i, (first, last) in enumerate(spans):
+                current = occupied and i == len(spans) - 1
+                tenancies.append((house_id, rent, first, months - 1 if current else last, current))
+            house_rows.append({
+                "id": house_id, "name": f"Unit {house_id:06d}", "house_type": house_type,
+                "rent_amount": rent, "floor": rnd.choice(["Ground", "First", "Second", "Third"]),
+                "is_occupied": occupied, "is_active": True,
+            })
+        for i in range(0, len(house_rows), chunk_size):
+            conn.execute(insert(models.House), house_rows[i:i + chunk_size])
+        report("houses", len(house_rows))
+
+        tenant_rows = []
+        for n, (house_id, rent, first, last, current) in enumerate(tenancies):
+            tenant_id = tenant_base + n + 1
+            first_name, last_name = rnd.choice(_FIRST_NAMES), rnd.choice(_LAST_NAMES)
+            phone = f"07{rnd.randrange(10 ** 8):08d}"
+            move_out = None
+            if not current:
+                year, month = _month(first_month + last + 1)
+                move_out = date(year, month, 1) - timedelta(days=1)
+            tenant_rows.append({
+                "id": tenant_id, "full_name": f"{first_name} {last_name}",
+                "id_number": str(20000000 + tenant_id), "phone": phone, "phone_normalized": "254" + phone[1:],
+                "email": f"{first_name}.{last_name}{tenant_id}@example.com".lower() if rnd.random() < 0.6 else None,
+                "house_id": house_id, "move_in_date": date(*_month(first_month + first), rnd.randint(1, 28)),
+                "move_out_date": move_out, "occupation": rnd.choice(_OCCUPATIONS),
+                "deposit_paid": float(rent), "is_active": current,
+            })
+            if len(tenant_rows) == chunk_size:
+                conn.execute(insert(models.Tenant), tenant_rows)
+                tenant_rows = []
+        if tenant_rows:
+            conn.execute(insert(models.Tenant), tenant_rows)
+        report("tenants", len(tenancies))
+
+        # Payments: each tenancy month paid in installments, sized to hit the total
+        tenancy_months = sum(last - first + 1 for _, _, first, last, _ in tenancies)
+        rate = payments / tenancy_months if tenancy_months else 0
+        whole, fraction = int(rate), rate - int(rate)
+        payment_rows, payment_id = [], payment_base
+        for n, (house_id, rent, first, last, _) in enumerate(tenancies):
+            tenant_id = tenant_base + n + 1
+            for offset in range(first, last + 1):
+                installments = whole + (rnd.random() < fraction)
+                if not installments:
+                    continue
+                year, month = _month(first_month + offset)
+                due = rent * (rnd.uniform(0.3, 0.9) if rnd.random() < UNDERPAID_MONTHS else 1.0)
+                amount = round(due / installments, 2)
+                for k in range(installments):
+                    paid_on = min(date(year, month, min(1 + k * 28 // installments + rnd.randint(0, 2), 28)), today)
+                    method = rnd.choice(_METHODS)
+                    payment_id += 1
+                    payment_rows.append({
+                        "id": payment_id, "tenant_id": tenant_id, "house_id": house_id, "amount_paid": amount,
+                        "payment_date": paid_on, "month_paid_for": f"{year}-{month:02d}",
+                        "payment_method": method,
+                        "reference_code": f"SYN{payment_id:010d}" if method != "cash" else None,
+                        "email_sent": True,
+                        "created_at": min(now, datetime(paid_on.year, paid_on.month, paid_on.day,
+                                                        rnd.randint(7, 21), rnd.randint(0, 59), rnd.randint(0, 59))),
+                    })
+                if len(payment_rows) >= chunk_size:
+                    conn.execute(insert(models.Payment), payment_rows)
+                    report("payments", payment_id - payment_base)
+                    payment_rows = []
+        if payment_rows:
+            conn.execute(insert(models.Payment), payment_rows)
+        report("payments", payment_id - payment_base)
+
+        # What the ORM hooks would have done row by row
+        conn.execute(
+            models.TableVersion.__table__.update()
+            .where(models.TableVersion.table_name.in_(models.VERSIONED_TABLES))
+            .values(version=models.TableVersion.version + 1)
+        )
+
+        if conn.dialect.name == "postgresql":
+            # Rows went in with explicit ids, which leaves the serial sequences
+            # behind: the API's next insert would reuse a generated id
+            for table in ("houses", "tenants", "payments"):
+                conn.exec_driver_sql(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+                )
+
+    db = Session(bind=engine)
+    try:
+        rollup_rows = revenue_rollup.rebuild(db)
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    return {
+        "houses": len(house_rows), "tenants": len(tenancies), "payments": payment_id - payment_base,
+        "rollup_rows": rollup_rows, "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,106 @@
+"""
+Tenant search by name, phone or ID number.
+
+The query text is matched as a substring of the tenant's name and ID number,
+and, when it looks like a phone number, of the normalized phone (so 0712…,
++254712… and 712… all find 254712…). Candidates come from trigram indexes
+(see models.TENANT_SEARCH_DDL): pg_trgm GIN indexes on Postgres, an FTS5
+trigram table on SQLite. Queries shorter than a trigram match name prefixes
+(or an exact ID number) only. Results are ranked in SQL: exact ID/phone,
+exact name, prefix, start of a later word in the name, then anywhere.
+"""
+import re
+from typing import List, Optional
+from sqlalchemy import case, func, or_, select, text
+from sqlalchemy.orm import Session, joinedload
+import models
+
+DEFAULT_RESULTS = 20
+MAX_RESULTS = 50
+_TRIGRAM = 3
+_PHONE_TEXT = re.compile(r"^\+?[\d\s\-()]+$")
+
+
+def _phone_fragment(q: str) -> Optional[str]:
+    """The part of a normalized phone number that `q` should match, if it looks like one."""
+    if not _PHONE_TEXT.match(q):
+        return None
+    digits = re.sub(r"\D", "", q)
+    if digits.startswith("0"):
+        digits = "254" + digits[1:]
+    return digits if len(digits) >= _TRIGRAM else None
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fts_phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _candidates(dialect: str, q: str, phone: Optional[str]):
+    """Index-backed filter narrowing tenants to possible matches."""
+    T = models.Tenant
+    name = func.lower(T.full_name)
+    lowered = q.lower()
+
+    if len(q) < _TRIGRAM:
+        if dialect == "sqlite":
+            # Range scan on ix_tenants_name_lower; LIKE can't use an expression index
+            return or_(T.id_number == q, name.between(lowered, lowered + "\U0010ffff"))
+        return or_(T.id_number == q, name.like(_like_escape(lowered) + "%", escape="\\"))
+
+    if dialect == "sqlite":
+        match = "{full_name id_number} : " + _fts_phrase(q)
+        if phone:
+            match += " OR phone_normalized : " + _fts_phrase(phone)
+        return T.id.in_(
+            select(text("rowid")).select_from(text("tenant_search"))
+            .where(text("tenant_search MATCH :match").bindparams(match=match))
+        )
+
+    pattern = "%" + _like_escape(lowered) + "%"
+    conditions = [name.like(pattern, escape="\\"), T.id_number.ilike(pattern, escape="\\")]
+    if phone:
+        conditions.append(T.phone_normalized.like("%" + _like_escape(phone) + "%", escape="\\"))
+    return or_(*conditions)
+
+
+def _rank(q: str, phone: Optional[str]):
+    T = models.Tenant
+    name = func.lower(T.full_name)
+    lowered = _like_escape(q.lower())
+    exact = [T.id_number == q]
+    prefix = [name.like(lowered + "%", escape="\\"), T.id_number.like(_like_escape(q) + "%", escape="\\")]
+    if phone:
+        exact.append(T.phone_normalized == phone)
+        prefix.append(T.phone_normalized.like(_like_escape(phone) + "%", escape="\\"))
+    return case(
+        (or_(*exact), 0),
+        (name == q.lower(), 1),
+        (or_(*prefix), 2),
+        (name.like("% " + lowered + "%", escape="\\"), 3),
+        else_=4,
+    )
+
+
+def search(db: Session, q: str, limit: int = DEFAULT_RESULTS, active_only: bool = True) -> List[models.Tenant]:
+    """Best matches for `q`, best first, with their house loaded."""
+    q = q.strip()
+    if not q:
+        return []
+    phone = _phone_fragment(q)
+    query = (
+        db.query(models.Tenant)
+        .options(joinedload(models.Tenant.house))
+        .filter(_candidates(db.get_bind().dialect.name, q, phone))
+    )
+    if active_only:
+        query = query.filter(models.Tenant.is_active == True)
+    order = [func.lower(models.Tenant.full_name), models.Tenant.id]
+    if len(q) >= _TRIGRAM:
+        order.insert(0, _rank(q, phone))
+    # Short queries only match name prefixes, so name order already ranks
+    # them, and can be read straight off the index
+    return query.order_by(*order).limit(limit).all()
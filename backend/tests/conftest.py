@@ -0,0 +1,148 @@
+import os
+import threading
+
+# Before anything imports `database`: an in-memory database, and no admin
+# cache, so every request pays for its admin lookup the same way. Each test
+# builds its own schema, so the startup revision check is skipped.
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["ADMIN_CACHE_TTL_SECONDS"] = "0"
+os.environ["SCHEMA_CHECK"] = "off"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from services import synthetic_data  # noqa: E402
+from services.email_transport import EmailDeliveryError  # noqa: E402
+from utils.auth import create_access_token, hash_password  # noqa: E402
+from utils.response_cache import response_cache  # noqa: E402
+import models  # noqa: E402
+
+ADMIN_USERNAME, ADMIN_PASSWORD = "admin", "admin123"
+_ADMIN_HASH = hash_password(ADMIN_PASSWORD)  # bcrypt is slow; hash once
+
+# Portfolio sizes (houses, tenants including moved-out ones, payments); the
+# large one is ten times the small one
+SIZES = {
+    "small": (4, 8, 200),
+    "large": (40, 80, 2000),
+}
+
+
+class StatementCounter:
+    """Counts SQL statements sent to the engine while active."""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._on_execute)
+
+
+def seed(size) -> dict:
+    """Recreate the schema with a portfolio of the given size (a SIZES name or a
+    (houses, tenants, payments) tuple); returns ids to request.
+
+    The in-process caches are emptied too, so the next request's count is the
+    cold-cache worst case.
+    """
+    response_cache.clear()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    houses, tenants, payments = SIZES[size] if isinstance(size, str) else size
+    synthetic_data.generate(engine, houses, tenants, payments, years=2, seed=7)
+
+    db = SessionLocal()
+    try:
+        db.add(models.Admin(username=ADMIN_USERNAME, hashed_password=_ADMIN_HASH))
+        vacant = models.House(name="Vacant V1", house_type="bedsitter", rent_amount=8000, is_occupied=False)
+        db.add(vacant)
+        db.add(models.ReminderCampaign(month="2020-01"))
+        db.commit()
+        tenant = (
+            db.query(models.Tenant)
+            .filter(models.Tenant.is_active == True, models.Tenant.email.isnot(None))
+            .order_by(models.Tenant.id)
+            .first()
+        )
+        return {
+            "username": ADMIN_USERNAME,
+            "password": ADMIN_PASSWORD,
+            "house_id": tenant.house_id,
+            "house_name": tenant.house.name,
+            "vacant_house_id": vacant.id,
+            "tenant_id": tenant.id,
+            "tenant_id_number": tenant.id_number,
+            "surname": tenant.full_name.split()[-1],
+            "payment_id": db.query(models.Payment.id).filter(models.Payment.tenant_id == tenant.id).first()[0],
+            "campaign_id": db.query(models.ReminderCampaign.id).scalar(),
+        }
+    finally:
+        db.close()
+
+
+class FakeTransport:
+    """In-memory transport for tests: records messages, can fail on demand.
+
+    fail_for: addresses that always fail; fail_times: number of initial sends
+    (across all addresses) that fail before deliveries start succeeding.
+    """
+
+    def __init__(self, fail_for=(), fail_times: int = 0):
+        self.sent = []
+        self.fail_for = set(fail_for)
+        self.fail_times = fail_times
+        self._lock = threading.Lock()
+
+    def send(self, to_email: str, subject: str, html: str):
+        with self._lock:
+            if to_email in self.fail_for or self.fail_times > 0:
+                self.fail_times = max(self.fail_times - 1, 0)
+                raise EmailDeliveryError(f"fake failure for {to_email}")
+            self.sent.append({"to": to_email, "subject": subject, "html": html})
+
+
+# Tests take these as fixtures rather than importing conftest, which only
+# works while tests/ happens to be on sys.path
+@pytest.fixture(scope="session")
+def portfolio_sizes() -> tuple:
+    """Portfolio size names for seed_portfolio, smallest first."""
+    return tuple(SIZES)
+
+
+@pytest.fixture(scope="session")
+def seed_portfolio():
+    """seed(size) -> ids: rebuilds the in-memory database with that portfolio;
+    `size` is a portfolio_sizes name or a (houses, tenants, payments) tuple."""
+    return seed
+
+
+@pytest.fixture(scope="session")
+def statement_counter():
+    """The StatementCounter class: `with statement_counter() as counter: ...`."""
+    return StatementCounter
+
+
+@pytest.fixture(scope="session")
+def fake_transport():
+    """The FakeTransport class, to hand to the email worker: `fake_transport(fail_times=1)`."""
+    return FakeTransport
+
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+
+    with TestClient(main.app) as c:
+        c.headers["Authorization"] = f"Bearer {create_access_token({'sub': ADMIN_USERNAME})}"
+        yield c
+
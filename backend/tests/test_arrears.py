@@ -0,0 +1,34 @@
+from datetime import date
+from database import SessionLocal
+from services import arrears
+import models
+
+RENT = 10000
+
+
+def test_payments_after_move_out_count_nowhere(seed_portfolio):
+    seed_portfolio("small")
+    db = SessionLocal()
+    try:
+        house = models.House(name="Arrears A1", house_type="bedsitter", rent_amount=RENT, is_occupied=True)
+        db.add(house)
+        db.flush()
+        tenant = models.Tenant(full_name="Moved Out", phone="0712111222", house_id=house.id, is_active=True,
+                               move_in_date=date(2025, 1, 1), move_out_date=date(2025, 3, 15))
+        db.add(tenant)
+        db.flush()
+        for month in ("2025-01", "2025-02", "2025-04"):  # March unpaid, April after moving out
+            db.add(models.Payment(tenant_id=tenant.id, house_id=house.id, amount_paid=RENT,
+                                  payment_date=date(2025, 4, 1), month_paid_for=month, payment_method="cash"))
+        db.commit()
+
+        report = arrears.report(db, date(2025, 6, 30), limit=None, include_settled=True)
+        item = next(i for i in report["items"] if i["tenant_id"] == tenant.id)
+    finally:
+        db.close()
+
+    assert (item["months_billed"], item["expected"], item["paid"]) == (3, 3 * RENT, 2 * RENT)
+    assert item["balance"] == RENT
+    # The total and the per-month rows agree
+    assert [m["month"] for m in item["months"]] == ["2025-03"]
+    assert sum(m["outstanding"] for m in item["months"]) == item["balance"]
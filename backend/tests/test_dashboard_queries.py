@@ -0,0 +1,20 @@
+"""
+The dashboard reads the rollup and a few aggregates; its statement count
+must not depend on how many houses there are.
+"""
+
+HOUSES = (10, 1000)
+
+
+def _dashboard_statements(client, seed_portfolio, statement_counter, houses: int) -> list:
+    seed_portfolio((houses, houses * 2, houses * 10))  # cold caches
+    with statement_counter() as counter:
+        response = client.get("/api/payments/dashboard")
+    assert response.status_code == 200, response.text
+    assert response.json()["total_units"] >= houses
+    return counter.statements
+
+
+def test_dashboard_statements_do_not_grow_with_houses(client, seed_portfolio, statement_counter):
+    few, many = (_dashboard_statements(client, seed_portfolio, statement_counter, n) for n in HOUSES)
+    assert len(few) == len(many), "\n".join(many)
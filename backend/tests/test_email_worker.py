@@ -0,0 +1,121 @@
+"""
+The outbox worker against the in-memory database, delivering through the
+fake_transport fixture: success, retry with backoff, giving up, and
+reclaiming rows left in `sending` by a worker that died.
+"""
+import pytest
+from database import SessionLocal
+from services import email_outbox, email_worker
+import models
+
+TO = "jane@example.com"
+
+
+@pytest.fixture
+def message(seed_portfolio) -> int:
+    """Queue one payment receipt for a payment not yet emailed; returns the outbox id."""
+    ids = seed_portfolio("small")
+    db = SessionLocal()
+    try:
+        payment = db.get(models.Payment, ids["payment_id"])
+        payment.email_sent = False
+        queued = email_outbox.enqueue_payment_confirmation(db, payment, "Jane Doe", TO, ids["house_name"])
+        db.commit()
+        return queued.id
+    finally:
+        db.close()
+
+
+def _drain(transport) -> dict:
+    return email_worker.run(SessionLocal, transport, concurrency=2, once=True)
+
+
+def _row(message_id: int):
+    db = SessionLocal()
+    try:
+        row = db.get(models.EmailOutbox, message_id)
+        return row, db.get(models.Payment, row.payment_id).email_sent
+    finally:
+        db.close()
+
+
+def _update(message_id: int, **values):
+    db = SessionLocal()
+    db.query(models.EmailOutbox).filter(models.EmailOutbox.id == message_id).update(values)
+    db.commit()
+    db.close()
+
+
+def _make_due(message_id: int):
+    # Stands in for waiting out the backoff
+    _update(message_id, next_attempt_at=models.utcnow())
+
+
+def test_delivered_message_is_marked_sent(message, fake_transport):
+    transport = fake_transport()
+    assert _drain(transport)["sent"] == 1
+
+    row, email_sent = _row(message)
+    assert (row.status, row.attempts, row.locked_at) == ("sent", 0, None)
+    assert row.sent_at is not None
+    assert email_sent
+    assert [m["to"] for m in transport.sent] == [TO]
+
+
+def test_failed_send_is_retried_after_a_backoff(message, fake_transport):
+    transport = fake_transport(fail_times=1)
+    assert _drain(transport)["retrying"] == 1
+
+    row, email_sent = _row(message)
+    assert (row.status, row.attempts) == ("pending", 1)
+    assert "fake failure" in row.last_error
+    assert row.next_attempt_at.replace(tzinfo=None) > models.utcnow().replace(tzinfo=None)
+    assert not email_sent
+    assert _drain(transport)["claimed"] == 0  # not due yet
+
+    _make_due(message)
+    assert _drain(transport)["sent"] == 1
+    row, email_sent = _row(message)
+    assert (row.status, row.attempts, row.last_error) == ("sent", 1, None)
+    assert email_sent
+
+
+def test_permanent_failure_ends_dead(message, fake_transport):
+    transport = fake_transport(fail_for={TO})
+    for _ in range(email_worker.MAX_ATTEMPTS):
+        _make_due(message)
+        _drain(transport)
+
+    row, email_sent = _row(message)
+    assert (row.status, row.attempts) == ("dead", email_worker.MAX_ATTEMPTS)
+    assert transport.sent == []
+    assert not email_sent
+    _make_due(message)
+    assert _drain(transport)["claimed"] == 0
+
+
+def _stale(message_id: int, attempts: int):
+    """Leave the row as a worker that died mid-send would."""
+    _update(message_id, status="sending", attempts=attempts,
+            locked_at=models.utcnow() - email_worker.LOCK_TIMEOUT * 2)
+
+
+def test_stale_sending_row_is_reclaimed_as_an_attempt(message, fake_transport):
+    _stale(message, attempts=0)
+    transport = fake_transport()
+    assert _drain(transport)["sent"] == 1
+
+    row, email_sent = _row(message)
+    assert (row.status, row.attempts) == ("sent", 1)
+    assert email_sent
+
+
+def test_row_that_keeps_killing_the_worker_ends_dead(message, fake_transport):
+    _stale(message, attempts=email_worker.MAX_ATTEMPTS - 1)
+    transport = fake_transport()
+    assert _drain(transport)["claimed"] == 0
+
+    row, _ = _row(message)
+    assert (row.status, row.attempts, row.locked_at) == ("dead", email_worker.MAX_ATTEMPTS, None)
+    assert "lock timed out" in row.last_error
+    assert transport.sent == []
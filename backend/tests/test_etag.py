@@ -0,0 +1,26 @@
+from database import SessionLocal
+import models
+
+
+def _rename(house_id: int, name: str):
+    # Committed outside any request, as another worker or the outbox worker
+    # would: this process's response cache never hears of it
+    db = SessionLocal()
+    db.get(models.House, house_id).name = name
+    db.commit()
+    db.close()
+
+
+def test_cached_body_follows_writes_from_elsewhere(client, seed_portfolio):
+    ids = seed_portfolio("small")
+    first = client.get("/api/houses/with-tenants")
+    assert first.status_code == 200
+
+    _rename(ids["house_id"], "Renamed R1")
+    fresh = client.get("/api/houses/with-tenants", headers={"If-None-Match": first.headers["ETag"]})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != first.headers["ETag"]
+    assert "Renamed R1" in {house["name"] for house in fresh.json()}
+
+    again = client.get("/api/houses/with-tenants", headers={"If-None-Match": fresh.headers["ETag"]})
+    assert again.status_code == 304
@@ -0,0 +1,50 @@
+"""
+Listing payments and tenants loads their house and tenant with the rows
+(joinedload), so a page of 10,000 costs the same statements as a page of 10.
+"""
+from starlette.requests import Request
+from fastapi import Response
+from database import SessionLocal
+from routers import payments
+import models
+
+# (houses, tenants, payments): about 10 payments, then 10,000
+PORTFOLIOS = ((5, 10, 10), (500, 1000, 10_000))
+
+
+def _list_payments(seed_portfolio, statement_counter, portfolio) -> list:
+    seed_portfolio(portfolio)
+    # Called directly: the route caps `limit` at MAX_PAGE_SIZE, and one page
+    # has to hold every payment at both sizes
+    request = Request({"type": "http", "method": "GET", "path": "/api/payments/", "query_string": b"",
+                       "headers": []})
+    db = SessionLocal()
+    try:
+        total = db.query(models.Payment).count()
+        with statement_counter() as counter:
+            page = payments.list_payments(request, Response(), limit=portfolio[2], db=db, _=None)
+            rows = page.model_dump()["items"]
+    finally:
+        db.close()
+    assert len(rows) == total and page.next_cursor is None
+    assert all(row["tenant"] and row["house"] for row in rows)
+    return counter.statements
+
+
+def _list_tenants(client, seed_portfolio, statement_counter, portfolio) -> list:
+    seed_portfolio(portfolio)
+    with statement_counter() as counter:
+        response = client.get("/api/tenants/?active_only=false")
+    assert response.status_code == 200, response.text
+    assert len(response.json()) >= portfolio[1]
+    return counter.statements
+
+
+def test_payment_list_statements_do_not_grow_with_the_page(seed_portfolio, statement_counter):
+    few, many = (_list_payments(seed_portfolio, statement_counter, p) for p in PORTFOLIOS)
+    assert len(few) == len(many), "\n".join(many)
+
+
+def test_tenant_list_statements_do_not_grow_with_tenants(client, seed_portfolio, statement_counter):
+    few, many = (_list_tenants(client, seed_portfolio, statement_counter, p) for p in PORTFOLIOS)
+    assert len(few) == len(many), "\n".join(many)
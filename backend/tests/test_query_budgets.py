@@ -0,0 +1,150 @@
+"""
+Every API route runs against a small and a ten times larger portfolio. The
+statement count must stay within the route's @query_budget and must be the
+same at both sizes, so a per-row query fails even while under budget.
+"""
+from datetime import date
+import pytest
+from fastapi.routing import APIRoute
+from database import SessionLocal
+from utils.query_budget import budget_of
+import main
+import models
+
+THIS_MONTH = date.today().strftime("%Y-%m")
+
+
+def _no_admins():
+    db = SessionLocal()
+    db.query(models.Admin).delete()
+    db.commit()
+    db.close()
+
+
+# (method, route path) -> how to call it: a function of the seeded ids that
+# returns TestClient.request keyword arguments, plus the expected status
+# and any setup to run first
+CASES = {
+    ("POST", "/api/auth/register"): dict(
+        request=lambda ids: {"url": "/api/auth/register",
+                             "json": {"username": "owner", "password": "secret123"}},
+        setup=_no_admins,
+    ),
+    ("POST", "/api/auth/login"): dict(
+        request=lambda ids: {"url": "/api/auth/login",
+                             "data": {"username": ids["username"], "password": ids["password"]}},
+    ),
+    ("GET", "/api/auth/me"): dict(request=lambda ids: {"url": "/api/auth/me"}),
+
+    ("GET", "/api/houses/"): dict(request=lambda ids: {"url": "/api/houses/"}),
+    ("GET", "/api/houses/with-tenants"): dict(request=lambda ids: {"url": "/api/houses/with-tenants"}),
+    ("GET", "/api/houses/{house_id}"): dict(request=lambda ids: {"url": f"/api/houses/{ids['house_id']}"}),
+    ("POST", "/api/houses/"): dict(
+        request=lambda ids: {"url": "/api/houses/",
+                             "json": {"name": "New N1", "house_type": "bedsitter", "rent_amount": 8000}},
+        status=201,
+    ),
+    ("PUT", "/api/houses/{house_id}"): dict(
+        request=lambda ids: {"url": f"/api/houses/{ids['house_id']}", "json": {"rent_amount": 9000}},
+    ),
+    ("DELETE", "/api/houses/{house_id}"): dict(
+        request=lambda ids: {"url": f"/api/houses/{ids['vacant_house_id']}"},
+    ),
+
+    ("GET", "/api/tenants/"): dict(request=lambda ids: {"url": "/api/tenants/"}),
+    ("GET", "/api/tenants/search"): dict(
+        request=lambda ids: {"url": f"/api/tenants/search?q={ids['surname']}"},
+    ),
+    ("GET", "/api/tenants/{tenant_id}"): dict(request=lambda ids: {"url": f"/api/tenants/{ids['tenant_id']}"}),
+    ("POST", "/api/tenants/"): dict(
+        request=lambda ids: {"url": "/api/tenants/", "json": {
+            "full_name": "New Tenant", "phone": "0712000000", "email": "new.tenant@example.com",
+            "house_id": ids["vacant_house_id"], "move_in_date": date.today().isoformat(),
+        }},
+        status=201,
+    ),
+    ("PUT", "/api/tenants/{tenant_id}"): dict(
+        request=lambda ids: {"url": f"/api/tenants/{ids['tenant_id']}",
+                             "json": {"phone": "0712999999", "house_id": ids["vacant_house_id"]}},
+    ),
+    ("DELETE", "/api/tenants/{tenant_id}"): dict(
+        request=lambda ids: {"url": f"/api/tenants/{ids['tenant_id']}"},
+    ),
+    ("GET", "/api/tenants/{tenant_id}/payments"): dict(
+        request=lambda ids: {"url": f"/api/tenants/{ids['tenant_id']}/payments?limit=10"},
+    ),
+
+    ("GET", "/api/payments/dashboard"): dict(request=lambda ids: {"url": "/api/payments/dashboard"}),
+    ("GET", "/api/payments/"): dict(request=lambda ids: {"url": "/api/payments/?limit=20"}),
+    ("GET", "/api/payments/export"): dict(request=lambda ids: {"url": "/api/payments/export?format=csv"}),
+    ("GET", "/api/payments/arrears"): dict(request=lambda ids: {"url": "/api/payments/arrears?limit=10"}),
+    ("GET", "/api/payments/{payment_id}"): dict(
+        request=lambda ids: {"url": f"/api/payments/{ids['payment_id']}"},
+    ),
+    ("POST", "/api/payments/"): dict(
+        request=lambda ids: {"url": "/api/payments/", "json": {
+            "tenant_id": ids["tenant_id"], "house_id": ids["house_id"], "amount_paid": 5000,
+            "payment_date": date.today().isoformat(), "month_paid_for": THIS_MONTH, "payment_method": "mpesa",
+        }},
+        status=201,
+    ),
+    ("POST", "/api/payments/import"): dict(
+        request=lambda ids: {"url": "/api/payments/import", "data": {"month_paid_for": THIS_MONTH}, "files": {
+            "file": ("statement.csv",
+                     "Receipt No.,Completion Time,Paid In,Account\n"
+                     f"QA1,{date.today().isoformat()},5000,{ids['tenant_id_number']}\n"
+                     f"QA2,{date.today().isoformat()},3000,{ids['house_name']}\n"
+                     f"QA3,{date.today().isoformat()},2000,UNKNOWN\n",
+                     "text/csv"),
+        }},
+    ),
+    ("PUT", "/api/payments/{payment_id}"): dict(
+        request=lambda ids: {"url": f"/api/payments/{ids['payment_id']}", "json": {"amount_paid": 4500}},
+    ),
+    ("DELETE", "/api/payments/{payment_id}"): dict(
+        request=lambda ids: {"url": f"/api/payments/{ids['payment_id']}"},
+    ),
+    ("POST", "/api/payments/send-reminders"): dict(
+        request=lambda ids: {"url": f"/api/payments/send-reminders?month={THIS_MONTH}"},
+    ),
+    ("GET", "/api/payments/send-reminders/{campaign_id}"): dict(
+        request=lambda ids: {"url": f"/api/payments/send-reminders/{ids['campaign_id']}"},
+    ),
+}
+
+API_ROUTES = {
+    (method, route.path): route
+    for route in main.app.routes
+    if isinstance(route, APIRoute) and route.path.startswith("/api/")
+    for method in route.methods
+}
+
+
+def test_every_route_has_a_budget_and_a_case():
+    assert sorted(k for k, r in API_ROUTES.items() if budget_of(r.endpoint) is None) == []
+    assert sorted(set(API_ROUTES) - set(CASES)) == []
+    assert sorted(set(CASES) - set(API_ROUTES)) == []
+
+
+def _count(client, seed_portfolio, statement_counter, method: str, case: dict, size: str):
+    ids = seed_portfolio(size)
+    if "setup" in case:
+        case["setup"]()
+    with statement_counter() as counter:
+        response = client.request(method, **case["request"](ids))
+    assert response.status_code == case.get("status", 200), response.text
+    return counter
+
+
+@pytest.mark.parametrize("method, path", sorted(CASES), ids=[f"{m} {p}" for m, p in sorted(CASES)])
+def test_query_budget(client, seed_portfolio, statement_counter, portfolio_sizes, method, path):
+    budget = budget_of(API_ROUTES[method, path].endpoint)
+    case = CASES[method, path]
+    small, large = (
+        _count(client, seed_portfolio, statement_counter, method, case, size) for size in portfolio_sizes
+    )
+
+    assert small.count <= budget, f"{small.count} statements, budget {budget}:\n" + "\n".join(small.statements)
+    assert large.count == small.count, (
+        f"statement count grows with the data: {small.count} -> {large.count}\n" + "\n".join(large.statements)
+    )
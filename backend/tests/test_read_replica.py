@@ -0,0 +1,91 @@
+"""
+Read-replica routing against two local SQLite databases: the replica is
+"replicated" by copying the primary's table_versions rows across.
+"""
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, insert, update
+from sqlalchemy.orm import sessionmaker
+import database
+from database import get_read_db, is_replica
+from utils.read_replica import HEADER, ReadYourWritesMiddleware, ReplicaMonitor
+import models
+
+VERSIONS = models.TableVersion.__table__
+
+
+def _write(engine):
+    with engine.begin() as conn:
+        conn.execute(update(VERSIONS).where(VERSIONS.c.table_name == "payments")
+                     .values(version=VERSIONS.c.version + 1))
+
+
+def _replicate(primary, replica):
+    with primary.connect() as src, replica.begin() as dst:
+        rows = [row._asdict() for row in src.execute(VERSIONS.select())]
+        dst.execute(delete(VERSIONS))
+        dst.execute(insert(VERSIONS), rows)
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        VERSIONS.create(engine)  # with a row per versioned table
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def test_lagging_replica_is_skipped_until_it_catches_up(databases):
+    primary, replica = databases
+    # Check on every call and tolerate no lag at all
+    monitor = ReplicaMonitor(primary, replica, max_lag=0, interval=0)
+    assert monitor.usable()
+
+    _write(primary)
+    assert not monitor.usable()
+
+    _replicate(primary, replica)
+    assert monitor.usable()
+    assert monitor.lag == 0
+
+
+def test_unreachable_replica_is_skipped(databases, tmp_path):
+    primary, _ = databases
+    down = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monitor = ReplicaMonitor(primary, down, interval=0, retry=60)
+    assert not monitor.usable()
+    assert not monitor.due()  # not retried before `retry` seconds
+
+
+def test_reads_follow_the_replica_except_just_after_a_write(databases, monkeypatch):
+    primary, replica = databases
+    monkeypatch.setattr(database, "replica_monitor", ReplicaMonitor(primary, replica, interval=0))
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=replica, info={"replica": True}))
+
+    app = FastAPI()
+
+    @app.get("/read")
+    def read(db=Depends(get_read_db)):
+        return {"replica": is_replica(db)}
+
+    @app.post("/write")
+    def write():
+        return {}
+
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=60)
+    client = TestClient(app)
+
+    assert client.get("/read").json() == {"replica": True}
+
+    until = client.post("/write").headers[HEADER]
+    assert client.get("/read", headers={HEADER: until}).json() == {"replica": False}
+    # Other clients, and values too far ahead to be genuine, still use the replica
+    assert client.get("/read").json() == {"replica": True}
+    assert client.get("/read", headers={HEADER: str(float(until) + 3600)}).json() == {"replica": True}
+
+    database.replica_monitor.mark_down(RuntimeError("replica stopped"))
+    assert client.get("/read").json() == {"replica": False}
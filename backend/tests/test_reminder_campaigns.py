@@ -0,0 +1,41 @@
+from database import SessionLocal
+from services import reminder_campaigns
+import models
+
+MONTH = "2099-01"  # nobody has paid yet
+
+
+def _run():
+    db = SessionLocal()
+    try:
+        return reminder_campaigns.run(db, MONTH)["queued"]
+    finally:
+        db.close()
+
+
+def test_second_run_for_a_month_queues_nobody_again(seed_portfolio):
+    seed_portfolio("small")
+    assert _run() > 0
+    assert _run() == 0
+
+
+def test_overlapping_runs_do_not_queue_a_tenant_twice(seed_portfolio, monkeypatch):
+    seed_portfolio("small")
+    # The second run picks its recipients before the first one commits, as two
+    # overlapping POST /payments/send-reminders would
+    db = SessionLocal()
+    stale = reminder_campaigns._recipients(db, reminder_campaigns.get_or_create(db, MONTH))
+    db.commit()
+    db.close()
+    first = _run()
+
+    real, answers = reminder_campaigns._recipients, iter([stale])
+    monkeypatch.setattr(reminder_campaigns, "_recipients",
+                        lambda db, campaign: next(answers, None) or real(db, campaign))
+    assert _run() == 0
+
+    db = SessionLocal()
+    try:
+        assert db.query(models.EmailOutbox).filter(models.EmailOutbox.kind == "payment_reminder").count() == first
+    finally:
+        db.close()
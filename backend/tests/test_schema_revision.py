@@ -0,0 +1,50 @@
+from alembic import command
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from database import Base, SessionLocal, alembic_config, engine
+from services import revenue_rollup
+import models
+
+
+def test_schema_revision_is_the_latest_migration():
+    # The app refuses to start unless the database is at SCHEMA_REVISION;
+    # it must name the newest migration or a migrated database is rejected
+    head = ScriptDirectory.from_config(alembic_config()).get_current_head()
+    assert models.SCHEMA_REVISION == head
+
+
+def _empty_database():
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def test_migrations_match_the_models():
+    # `alembic check` on a migrated database: it must need no new
+    # operations, including none for the raw-DDL tenant search objects
+    _empty_database()
+    command.upgrade(alembic_config(), "head")
+    command.check(alembic_config())
+
+
+def test_upgrading_a_baseline_database_builds_the_rollup():
+    # A database from before migrations has only the baseline tables; it is
+    # stamped at 0001_baseline and upgraded, with its payments already in it
+    _empty_database()
+    command.upgrade(alembic_config(), "0001_baseline")
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO houses (id, name, house_type, rent_amount) VALUES (1, 'B1', 'bedsitter', 8000)"))
+        conn.execute(text("INSERT INTO tenants (id, full_name, phone, house_id) VALUES (1, 'Jane Doe', '0712000000', 1)"))
+        conn.execute(text(
+            "INSERT INTO payments (tenant_id, house_id, amount_paid, payment_date, month_paid_for, payment_method) "
+            "VALUES (1, 1, 5000, '2025-01-05', '2025-01', 'mpesa'), (1, 1, 3000, '2025-01-20', '2025-01', 'mpesa')"
+        ))
+    command.upgrade(alembic_config(), "head")
+
+    db = SessionLocal()
+    try:
+        assert revenue_rollup.verify(db) == []
+        rollup = db.query(models.RevenueRollup).one()
+        assert (rollup.total_amount, rollup.payment_count) == (8000, 2)
+    finally:
+        db.close()
@@ -0,0 +1,32 @@
+from datetime import date
+from database import SessionLocal
+from services import statement_import
+import models
+
+TODAY = date.today().isoformat()
+
+
+def test_keys_shared_by_several_tenants_match_nobody(seed_portfolio):
+    ids = seed_portfolio("small")
+    db = SessionLocal()
+    try:
+        # Two tenants sharing the vacant unit; the second also shares a phone
+        # with another tenant
+        for name, phone in (("Amina Roommate", "0799000001"), ("Brian Roommate", "0799000002"),
+                            ("Carol Sharedphone", "0799000002")):
+            db.add(models.Tenant(full_name=name, phone=phone, house_id=ids["vacant_house_id"], is_active=True))
+        db.commit()
+
+        report = statement_import.import_statement(db, (
+            "Receipt No.,Completion Time,Paid In,Account,Phone\n"
+            f"R1,{TODAY},5000,Vacant V1,\n"            # unit shared by three tenants
+            f"R2,{TODAY},5000,Vacant V1,0799000001\n"  # ...but the phone is Amina's alone
+            f"R3,{TODAY},5000,,0799000002\n"           # phone shared by two tenants
+        ).encode(), dry_run=True)
+    finally:
+        db.close()
+
+    r1, r2, r3 = report["rows"]
+    assert r1["status"] == r3["status"] == "unmatched"
+    assert r1["message"].startswith("Ambiguous match") and r3["message"].startswith("Ambiguous match")
+    assert (r2["status"], r2["matched_by"], r2["tenant_name"]) == ("matched", "phone", "Amina Roommate")
@@ -0,0 +1,33 @@
+from database import SessionLocal
+from utils.etag import table_versions
+import models
+
+
+def _payments_version() -> int:
+    db = SessionLocal()
+    try:
+        return table_versions(db, ("payments",))["payments"]
+    finally:
+        db.close()
+
+
+def test_versions_are_bumped_after_commit_only(seed_portfolio):
+    ids = seed_portfolio("small")
+    before = _payments_version()
+
+    db = SessionLocal()
+    try:
+        db.get(models.Payment, ids["payment_id"]).notes = "checked"
+        db.flush()
+        # No write to table_versions inside the payment's transaction, so no
+        # lock on the counter row that other writers would queue behind
+        assert table_versions(db, ("payments",))["payments"] == before
+        db.commit()
+        assert _payments_version() == before + 1
+
+        db.query(models.Payment).filter(models.Payment.id == ids["payment_id"]).update({"notes": "again"})
+        db.rollback()
+        db.commit()
+        assert _payments_version() == before + 1
+    finally:
+        db.close()
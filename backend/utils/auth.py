@@ -1,28 +1,44 @@
+from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, get_async_db
 import models
 import os
+import threading
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret-key-change-this")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "480"))
+# How long a resolved admin is trusted before re-reading the admins table.
+# Changes made through this process invalidate immediately; this bounds how
+# long other workers keep serving a deactivated admin. 0 disables the cache.
+ADMIN_CACHE_TTL_SECONDS = float(os.getenv("ADMIN_CACHE_TTL_SECONDS", "60"))
+
+
+@lru_cache(maxsize=None)
+def _pwd_context():
+    # passlib and its bcrypt backend are only needed to log in or register,
+    # so they load on first use instead of while every worker boots
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -32,24 +48,102 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_admin(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> models.Admin:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+@dataclass(frozen=True)
+class AdminIdentity:
+    """Detached snapshot of an Admin row, safe to share between requests."""
+    id: int
+    username: str
+    email: Optional[str]
+    full_name: Optional[str]
+    is_active: bool
+
+
+_admin_cache: dict = {}
+_admin_cache_lock = threading.Lock()
+
+
+def _cached_admin(username: str) -> Optional[AdminIdentity]:
+    entry = _admin_cache.get(username)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def invalidate_admin_cache():
+    with _admin_cache_lock:
+        _admin_cache.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_admin_changes(session, flush_context):
+    if any(isinstance(obj, models.Admin) for obj in (*session.dirty, *session.deleted)):
+        session.info["admins_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_cached_admins(session):
+    if session.info.pop("admins_changed", False):
+        invalidate_admin_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_admin_changes(session):
+    session.info.pop("admins_changed", None)
+
+
+_credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _username_from_token(token: str) -> str:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
+            raise _credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception
+    return username
 
+
+def _load_admin(db: Session, username: str) -> AdminIdentity:
     admin = db.query(models.Admin).filter(models.Admin.username == username).first()
     if admin is None or not admin.is_active:
-        raise credentials_exception
-    return admin
+        raise _credentials_exception
+    identity = AdminIdentity(
+        id=admin.id,
+        username=admin.username,
+        email=admin.email,
+        full_name=admin.full_name,
+        is_active=admin.is_active,
+    )
+    if ADMIN_CACHE_TTL_SECONDS > 0:
+        with _admin_cache_lock:
+            _admin_cache[username] = (time.monotonic() + ADMIN_CACHE_TTL_SECONDS, identity)
+    return identity
+
+
+def get_current_admin(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> AdminIdentity:
+    username = _username_from_token(token)
+    identity = _cached_admin(username)
+    if identity is not None:
+        return identity
+    return _load_admin(db, username)
+
+
+async def get_current_admin_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> AdminIdentity:
+    """get_current_admin for async routes: same cache, admins read on the AsyncSession."""
+    username = _username_from_token(token)
+    identity = _cached_admin(username)
+    if identity is not None:
+        return identity
+    return await db.run_sync(_load_admin, username)
@@ -0,0 +1,61 @@
+"""
+Conditional GET (ETag / If-None-Match) for the list endpoints.
+
+An endpoint's ETag is a hash of the request URL and the write versions of
+the tables its response is built from (models.TableVersion), read with one
+primary-key lookup. A request whose If-None-Match already names the current
+tag gets a 304 before the endpoint runs its query or serializes anything.
+
+Endpoints that also use the response cache pass it the same versions, so a
+cached body is never served under a tag for newer data:
+
+    versions = table_versions(db, ("houses", "tenants"))
+    not_modified = conditional_get(request, response, versions)
+    ...
+    return response_cache.get_or_compute(..., versions=versions)
+"""
+import hashlib
+from typing import Iterable, Optional
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+import models
+
+# Let the browser keep the body, but revalidate it on every use
+CACHE_CONTROL = "private, no-cache"
+
+
+def table_versions(db: Session, tables: Iterable[str]) -> Optional[dict]:
+    """Current version of each table, or None if any is untracked."""
+    tables = tuple(tables)
+    versions = dict(
+        db.query(models.TableVersion.table_name, models.TableVersion.version)
+        .filter(models.TableVersion.table_name.in_(tables))
+        .all()
+    )
+    return versions if len(versions) == len(tables) else None
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or tag in candidates or f"W/{tag}" in candidates
+
+
+def conditional_get(request: Request, response: Response, versions: Optional[dict],
+                    *extra: str) -> Optional[Response]:
+    """Tag the response from `versions` (see table_versions); return a 304 to
+    send instead if the client is up to date.
+
+    `extra` covers anything else the body depends on (e.g. today's date).
+    """
+    if versions is None:
+        return None
+    tables = (f"{t}:{v}" for t, v in sorted(versions.items()))
+    key = "|".join([request.url.path, request.url.query, *tables, *extra])
+    tag = '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+    headers = {"ETag": tag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, tag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,54 @@
+"""
+Keyset (cursor) pagination over (created_at DESC, id DESC).
+
+A cursor is an opaque URL-safe token holding the created_at and id of the
+last row on the previous page. The next page filters strictly after that
+position, so the database seeks straight to it instead of skipping rows as
+OFFSET would.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, created_col, id_col, cursor: Optional[str], limit: int) -> tuple:
+    """Apply keyset ordering/filtering to query and fetch one page.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if cursor:
+        after_created, after_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                created_col < after_created,
+                and_(created_col == after_created, id_col < after_id),
+            )
+        )
+    rows = query.order_by(created_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
@@ -0,0 +1,25 @@
+import re
+from typing import Optional
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(raw: Optional[str]) -> Optional[str]:
+    """Normalize a Kenyan mobile number to 2547XXXXXXXX / 2541XXXXXXXX form.
+
+    Accepts 07xx…, 01xx…, +2547xx…, 2547xx… and 7xx… with any spacing or
+    punctuation. Anything that is not recognisably Kenyan is returned as its
+    bare digits so it can still be compared exactly; empty input gives None.
+    """
+    if not raw:
+        return None
+    digits = _NON_DIGITS.sub("", raw)
+    if not digits:
+        return None
+    if len(digits) == 12 and digits.startswith("254"):
+        return digits
+    if len(digits) == 10 and digits.startswith("0"):
+        return "254" + digits[1:]
+    if len(digits) == 9 and digits[0] in "17":
+        return "254" + digits
+    return digits
@@ -0,0 +1,27 @@
+"""
+SQL statement budgets per route, enforced by tests/test_query_budgets.py.
+
+Declared under the route decorator so a change to a route's cost shows up in
+the same diff as the route:
+
+    @router.get("/{house_id}", ...)
+    @query_budget(2)
+    def get_house(...):
+
+The budget is the most statements one request may issue with cold caches,
+counting the admin lookup and the ETag version read. The test also requires
+the count to be the same at two data sizes, so per-row queries fail even
+while under budget.
+"""
+from typing import Callable, Optional
+
+
+def query_budget(statements: int) -> Callable:
+    def declare(endpoint: Callable) -> Callable:
+        endpoint.query_budget = statements
+        return endpoint
+    return declare
+
+
+def budget_of(endpoint: Callable) -> Optional[int]:
+    return getattr(endpoint, "query_budget", None)
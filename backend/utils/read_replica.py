@@ -0,0 +1,156 @@
+"""
+Read-replica routing for GET routes (DATABASE_REPLICA_URL, off by default).
+
+database.get_read_db hands a route a session on the replica unless:
+
+- the client wrote within the last REPLICA_STICKY_SECONDS. Every successful
+  write response carries an X-Primary-Until header; a client that sends it
+  back (the frontend does) reads its own writes from the primary until then.
+- the replica is more than REPLICA_MAX_LAG_SECONDS behind, or down.
+
+Lag is measured with the table_versions counters every write already bumps
+(models.TableVersion), so it works with any kind of replication, including
+two local databases copied by hand. About once a second the monitor reads the
+counters on both databases; the lag is the age of the newest primary reading
+the replica has caught up with. A replica that cannot be reached is skipped
+for REPLICA_RETRY_SECONDS.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from starlette.datastructures import Headers, MutableHeaders
+
+STICKY_SECONDS = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "5"))
+CHECK_INTERVAL_SECONDS = 1.0
+
+HEADER = "X-Primary-Until"
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+_VERSIONS = text("SELECT table_name, version FROM table_versions")
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock time until which this request's reads go to the primary
+_primary_until: ContextVar[float] = ContextVar("primary_until", default=0.0)
+
+
+def reads_pinned_to_primary() -> bool:
+    return _primary_until.get() > time.time()
+
+
+def _versions(engine) -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(_VERSIONS).all())
+
+
+class ReplicaMonitor:
+    """Tracks whether the replica is reachable and how far behind the primary it is."""
+
+    def __init__(self, primary, replica, max_lag: float = MAX_LAG_SECONDS,
+                 interval: float = CHECK_INTERVAL_SECONDS, retry: float = RETRY_SECONDS):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.interval = interval
+        self.retry = retry
+        self.lag: Optional[float] = None  # seconds; None while unknown, down or too far behind
+        self._readings = deque()  # (monotonic time, primary versions)
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def due(self) -> bool:
+        return time.monotonic() >= self._next_check
+
+    def usable(self) -> bool:
+        if self.due():
+            self.check()
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def check(self):
+        # One thread checks; the others use the previous result meanwhile
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            now = time.monotonic()
+            if now < self._next_check:
+                return
+            try:
+                primary = _versions(self.primary)
+            except DBAPIError:
+                # Nothing to compare against; keep the last result
+                self._next_check = now + self.interval
+                return
+            self._readings.append((now, primary))
+            try:
+                replica = _versions(self.replica)
+            except DBAPIError as e:
+                self.mark_down(e)
+                return
+            self.lag = next(
+                (now - seen_at for seen_at, reading in reversed(self._readings)
+                 if all(replica.get(table, -1) >= version for table, version in reading.items())),
+                None,
+            )
+            # Older readings only matter to a replica already too far behind
+            while now - self._readings[0][0] > self.max_lag + self.interval:
+                self._readings.popleft()
+            self._next_check = now + self.interval
+        finally:
+            self._lock.release()
+
+    def mark_down(self, error: Exception):
+        logger.warning("Read replica unavailable, reading from the primary: %s", error)
+        self.lag = None
+        self._next_check = time.monotonic() + self.retry
+
+    def stats(self) -> dict:
+        return {
+            "lag_seconds": None if self.lag is None else round(self.lag, 3),
+            "max_lag_seconds": self.max_lag,
+            "usable": self.lag is not None and self.lag <= self.max_lag,
+        }
+
+
+class ReadYourWritesMiddleware:
+    """Pins a client's reads to the primary for `sticky_seconds` after it writes.
+
+    Successful non-GET responses get an X-Primary-Until timestamp; requests
+    that send it back before then read from the primary.
+    """
+
+    def __init__(self, app, sticky_seconds: float = STICKY_SECONDS):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        until = 0.0
+        try:
+            until = float(Headers(scope=scope).get(HEADER, 0))
+        except ValueError:
+            pass
+        # A far-future value would pin the client to the primary for good
+        token = _primary_until.set(until if until <= time.time() + self.sticky_seconds else 0.0)
+        try:
+            if scope["method"] in _SAFE_METHODS:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_marked(message):
+                if message["type"] == "http.response.start" and message["status"] < 400:
+                    MutableHeaders(scope=message)[HEADER] = f"{time.time() + self.sticky_seconds:.3f}"
+                await send(message)
+
+            await self.app(scope, receive, send_marked)
+        finally:
+            _primary_until.reset(token)
@@ -0,0 +1,100 @@
+"""
+In-process read-through cache for expensive read endpoints.
+
+Every entry records the write version of each entity it was built from
+(houses, tenants, payments). Write routes call `bump()` after committing, which
+makes every entry that depends on that entity stale without scanning the cache.
+Routes that tag responses with ETags also pass the table_versions counters
+read for the tag (utils/etag.py), so writes this process never sees (other
+workers, the outbox worker, manual SQL) invalidate their entries as well, and
+a body is never served under a tag for newer data. For the rest, a TTL bounds
+that staleness. The cache is an LRU capped at `max_entries`. Values read from
+a lagging replica may predate a bumped write, so routes pass store=False for
+them: they are served but not kept.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+ENTITIES = ("houses", "tenants", "payments")
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._versions = {entity: 0 for entity in ENTITIES}
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _snapshot(self, depends_on: Iterable[str]) -> tuple:
+        return tuple(self._versions[entity] for entity in depends_on)
+
+    def get_or_compute(self, endpoint: str, params: dict, depends_on: tuple, compute: Callable,
+                       store: bool = True, versions: Optional[dict] = None):
+        """Return the cached value for endpoint+params, computing it on a miss.
+
+        `versions` are the database's table_versions for depends_on, if the
+        caller read them. The returned value is shared between requests and
+        must not be mutated.
+        """
+        key = (endpoint, tuple(sorted(params.items())))
+        db_versions = tuple(sorted(versions.items())) if versions else None
+        now = time.monotonic()
+        with self._lock:
+            versions = (self._snapshot(depends_on), db_versions)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # Compute outside the lock; versions were captured first, so a write
+        # that lands meanwhile leaves this entry stale rather than wrong.
+        value = compute()
+        if not store:
+            return value
+
+        with self._lock:
+            self._entries[key] = (versions, now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def bump(self, *entities: str):
+        """Invalidate every entry built from the given entities. Call after commit."""
+        with self._lock:
+            for entity in entities:
+                self._versions[entity] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "versions": dict(self._versions),
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60")),
+)
@@ -0,0 +1,154 @@
+"""
+Opt-in per-request SQL profiler: slow-request log and N+1 detection.
+
+Off unless SQL_PROFILE_SAMPLE_RATE is above 0; it is the fraction of requests
+profiled, so it can stay on under real load at e.g. 0.01. For a sampled
+request every statement is recorded with its duration by engine events, and
+grouped by its normalized text (placeholders, literals and IN lists
+collapsed), so the same query issued once per row shows up as one group.
+
+When the request ran for SQL_PROFILE_SLOW_MS or longer, or any group ran
+SQL_PROFILE_N_PLUS_ONE times or more, one JSON line is written to the
+"sql_profile" logger (stderr, or SQL_PROFILE_LOG if set):
+
+  {"event": "slow_request" | "n_plus_one", "method", "path", "route",
+   "status", "duration_ms", "sql_count", "sql_ms",
+   "n_plus_one": [{"statement", "count", "total_ms"}, ...],
+   "statements": [{"seq", "ms", "sql"}, ...]}     # slowest first
+"""
+import json
+import logging
+import os
+import random
+import re
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.metrics import route_template
+
+SAMPLE_RATE = float(os.getenv("SQL_PROFILE_SAMPLE_RATE", "0"))
+SLOW_MS = float(os.getenv("SQL_PROFILE_SLOW_MS", "500"))
+N_PLUS_ONE = int(os.getenv("SQL_PROFILE_N_PLUS_ONE", "5"))
+LOG_PATH = os.getenv("SQL_PROFILE_LOG")
+MAX_LOGGED_STATEMENTS = 50
+MAX_RECORDED_STATEMENTS = 2000  # per request; later ones are only counted in their group
+
+logger = logging.getLogger("sql_profile")
+
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|\$\d+|:\w+)"
+_IN_LIST = re.compile(rf"\bIN\s*\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize(statement: str) -> str:
+    """Statement text with values abstracted, so per-row repeats compare equal."""
+    statement = _SPACE.sub(" ", statement).strip()
+    statement = _STRING.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    return _IN_LIST.sub("IN (?, ...)", statement)
+
+
+class Profile:
+    __slots__ = ("statements", "groups", "count", "sql_seconds")
+
+    def __init__(self):
+        self.statements = []   # (seq, seconds, statement)
+        self.groups = {}       # normalized statement -> [count, seconds]
+        self.count = 0
+        self.sql_seconds = 0.0
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.sql_seconds += seconds
+        if len(self.statements) < MAX_RECORDED_STATEMENTS:
+            self.statements.append((self.count, seconds, statement))
+        group = self.groups.setdefault(normalize(statement), [0, 0.0])
+        group[0] += 1
+        group[1] += seconds
+
+    def n_plus_one(self, threshold: int = N_PLUS_ONE) -> list:
+        repeated = [
+            {"statement": sql, "count": count, "total_ms": round(seconds * 1000, 2)}
+            for sql, (count, seconds) in self.groups.items() if count >= threshold
+        ]
+        return sorted(repeated, key=lambda g: g["count"], reverse=True)
+
+
+_current: ContextVar[Optional[Profile]] = ContextVar("sql_profile", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._profile_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    start = getattr(context, "_profile_start", None)
+    if profile is not None and start is not None:
+        profile.record(statement, time.perf_counter() - start)
+
+
+def report(profile: Profile, duration_ms: float) -> Optional[dict]:
+    """The log record for a finished request, or None if it was fast and had no N+1."""
+    repeated = profile.n_plus_one()
+    if duration_ms < SLOW_MS and not repeated:
+        return None
+    slowest = sorted(profile.statements, key=lambda s: s[1], reverse=True)[:MAX_LOGGED_STATEMENTS]
+    return {
+        "event": "slow_request" if duration_ms >= SLOW_MS else "n_plus_one",
+        "duration_ms": round(duration_ms, 2),
+        "sql_count": profile.count,
+        "sql_ms": round(profile.sql_seconds * 1000, 2),
+        "n_plus_one": repeated,
+        "statements": [{"seq": seq, "ms": round(s * 1000, 2), "sql": sql} for seq, s, sql in slowest],
+    }
+
+
+class SQLProfilerMiddleware:
+    def __init__(self, app: ASGIApp, sample_rate: float = SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        profile = Profile()
+        token = _current.set(profile)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            _current.reset(token)
+            record = report(profile, duration_ms)
+            if record is not None:
+                request = {"method": scope["method"], "path": scope["path"],
+                           "route": route_template(scope), "status": status}
+                logger.warning(json.dumps({"event": record.pop("event"), **request, **record}))
+
+
+def install(app, *engines, sample_rate: float = SAMPLE_RATE):
+    """Profile a `sample_rate` fraction of `app`'s requests on the given engines."""
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if not logger.handlers:
+        handler = logging.FileHandler(LOG_PATH) if LOG_PATH else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    app.add_middleware(SQLProfilerMiddleware, sample_rate=sample_rate)
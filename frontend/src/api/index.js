@@ -5,18 +5,48 @@ const api = axios.create({
   headers: { 'Content-Type': 'application/json' },
 })
 
+// Conditional GETs: keep the last body of each GET that came with an ETag,
+// send If-None-Match next time, and answer a 304 from the kept body
+const ETAG_CACHE_SIZE = 50
+const etagCache = new Map()
+const isGet = (config) => (config.method || 'get').toLowerCase() === 'get'
+
+// Read-your-writes: write responses say until when our reads should go to
+// the primary database rather than a replica; send that back with every request
+let primaryUntil = null
+
 // Attach JWT token to every request
 api.interceptors.request.use((config) => {
   const token = localStorage.getItem('access_token')
   if (token) config.headers.Authorization = `Bearer ${token}`
+  if (primaryUntil) config.headers['X-Primary-Until'] = primaryUntil
+  if (isGet(config)) {
+    const cached = etagCache.get(api.getUri(config))
+    if (cached) config.headers['If-None-Match'] = cached.etag
+    config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304
+  }
   return config
 })
 
 // Redirect to login on 401
 api.interceptors.response.use(
-  (res) => res,
+  (res) => {
+    if (res.headers['x-primary-until']) primaryUntil = res.headers['x-primary-until']
+    if (!isGet(res.config)) return res
+    const key = api.getUri(res.config)
+    if (res.status === 304) {
+      const cached = etagCache.get(key)
+      if (cached) return { ...res, status: 200, data: cached.data }
+    } else if (res.headers.etag) {
+      etagCache.delete(key)
+      etagCache.set(key, { etag: res.headers.etag, data: res.data })
+      if (etagCache.size > ETAG_CACHE_SIZE) etagCache.delete(etagCache.keys().next().value)
+    }
+    return res
+  },
   (err) => {
     if (err.response?.status === 401) {
+      etagCache.clear()
       localStorage.removeItem('access_token')
       localStorage.removeItem('admin_name')
       window.location.href = '/login'
@@ -52,6 +82,7 @@ export const housesAPI = {
 // ─── Tenants ──────────────────────────────────────────────────────────
 export const tenantsAPI = {
   list: () => api.get('/tenants/'),
+  search: (q, limit = 20) => api.get('/tenants/search', { params: { q, limit } }),
   get: (id) => api.get(`/tenants/${id}`),
   create: (data) => api.post('/tenants/', data),
   update: (id, data) => api.put(`/tenants/${id}`, data),
@@ -68,6 +99,7 @@ export const paymentsAPI = {
   update: (id, data) => api.put(`/payments/${id}`, data),
   delete: (id) => api.delete(`/payments/${id}`),
   sendReminders: (month) => api.post('/payments/send-reminders', null, { params: { month } }),
+  reminderCampaign: (id) => api.get(`/payments/send-reminders/${id}`),
 }
 
 export default api
@@ -38,6 +38,8 @@ const defaultForm = {
 
 export default function PaymentsPage() {
   const [payments, setPayments] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [tenants, setTenants] = useState([])
   const [houses, setHouses] = useState([])
   const [loading, setLoading] = useState(true)
@@ -57,7 +59,8 @@ export default function PaymentsPage() {
         tenantsAPI.list(),
         housesAPI.list(),
       ])
-      setPayments(pRes.data)
+      setPayments(pRes.data.items)
+      setNextCursor(pRes.data.next_cursor)
       setTenants(tRes.data)
       setHouses(hRes.data)
     } catch { toast.error('Failed to load payments') }
@@ -66,6 +69,19 @@ export default function PaymentsPage() {
 
   useEffect(() => { load() }, [filterMonth])
 
+  const loadMore = async () => {
+    setLoadingMore(true)
+    try {
+      const res = await paymentsAPI.list({
+        ...(filterMonth ? { month: filterMonth } : {}),
+        cursor: nextCursor,
+      })
+      setPayments(p => [...p, ...res.data.items])
+      setNextCursor(res.data.next_cursor)
+    } catch { toast.error('Failed to load more payments') }
+    finally { setLoadingMore(false) }
+  }
+
   const set = (field) => (e) => {
     const val = field === 'send_email' ? e.target.checked : e.target.value
     setForm(f => {
@@ -96,7 +112,7 @@ export default function PaymentsPage() {
         amount_paid:  parseFloat(form.amount_paid),
         send_email:   form.send_email,
       })
-      toast.success('Payment recorded' + (form.send_email ? ' · Email receipt sent' : ''))
+      toast.success('Payment recorded' + (form.send_email ? ' · Email receipt queued' : ''))
       setShowModal(false)
       setForm(defaultForm)
       load()
@@ -120,7 +136,12 @@ export default function PaymentsPage() {
     setSendingReminders(true)
     try {
       const res = await paymentsAPI.sendReminders(month)
-      toast.success(`Reminders sent to ${res.data.sent} tenant(s)`)
+      const { queued, requeued, sent, total } = res.data
+      toast.success(
+        queued + requeued > 0
+          ? `Reminders queued for ${queued + requeued} tenant(s)`
+          : `No new reminders — ${sent} of ${total} already sent for ${month}`
+      )
     } catch { toast.error('Failed to send reminders') }
     finally { setSendingReminders(false) }
   }
@@ -240,6 +261,13 @@ export default function PaymentsPage() {
               </tbody>
             </table>
           </div>
+          {nextCursor && (
+            <div className="flex justify-center py-4 border-t border-estate-700">
+              <button onClick={loadMore} disabled={loadingMore} className="btn-outline text-sm disabled:opacity-60">
+                {loadingMore ? 'Loading…' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       )}
 
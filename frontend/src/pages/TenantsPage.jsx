@@ -21,6 +21,7 @@ export default function TenantsPage() {
   const [form, setForm] = useState(defaultForm)
   const [saving, setSaving] = useState(false)
   const [search, setSearch] = useState('')
+  const [results, setResults] = useState(null)
 
   const load = async () => {
     setLoading(true)
@@ -34,6 +35,20 @@ export default function TenantsPage() {
 
   useEffect(() => { load() }, [])
 
+  // Search runs on the server; wait for a pause in typing before asking
+  useEffect(() => {
+    const q = search.trim()
+    if (!q) { setResults(null); return }
+    let stale = false
+    const timer = setTimeout(async () => {
+      try {
+        const res = await tenantsAPI.search(q)
+        if (!stale) setResults(res.data)
+      } catch { if (!stale) toast.error('Search failed') }
+    }, 250)
+    return () => { stale = true; clearTimeout(timer) }
+  }, [search])
+
   const set = (field) => (e) => setForm(f => ({ ...f, [field]: e.target.value }))
 
   const vacantHouses = houses.filter(h => !h.is_occupied)
@@ -75,11 +90,7 @@ export default function TenantsPage() {
     return tenant.is_active ? 'active' : 'inactive'
   }
 
-  const filtered = tenants.filter(t =>
-    t.full_name.toLowerCase().includes(search.toLowerCase()) ||
-    t.phone.includes(search) ||
-    t.email?.toLowerCase().includes(search.toLowerCase())
-  )
+  const filtered = results ?? tenants
 
   return (
     <div>
@@ -98,7 +109,7 @@ export default function TenantsPage() {
       <div className="mb-6">
         <input
           type="text"
-          placeholder="Search by name, phone or email…"
+          placeholder="Search by name, phone or ID number…"
           value={search}
           onChange={e => setSearch(e.target.value)}
           className="input-base max-w-md"